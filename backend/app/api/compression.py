@@ -0,0 +1,154 @@
+import gzip
+
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.core.cache import TTLCache
+from app.core.config import settings
+
+try:
+    import brotli
+except ImportError:  # brotli is optional; without it only gzip is offered
+    brotli = None
+
+COMPRESSIBLE_TYPES = ("application/json", "text/", "application/javascript", "image/svg+xml")
+GZIP_LEVEL = 6
+BROTLI_QUALITY = 5
+
+# Compressed bodies of responses with a strong ETag, keyed by (etag, encoding).
+# Cacheable ETags are derived from the cache generation, so each body is
+# compressed once per generation and a refresh naturally retires old entries.
+compressed_bodies = TTLCache(maxsize=settings.COMPRESSION_CACHE_SIZE, ttl=24 * 3600)
+
+
+def supported_encodings() -> tuple[str, ...]:
+    """Encodings this process can produce, most preferred first."""
+    return ("br", "gzip") if brotli is not None else ("gzip",)
+
+
+def negotiate_encoding(accept_encoding: str) -> str | None:
+    """
+    Pick the best supported encoding for an Accept-Encoding header.
+
+    Honours q-values (q=0 refuses an encoding) and the "*" wildcard. Ties go
+    to the server's preference, brotli before gzip. Returns None for identity.
+    """
+    weights: dict[str, float] = {}
+    for item in accept_encoding.split(","):
+        coding, _, params = item.strip().partition(";")
+        coding = coding.strip().lower()
+        if not coding:
+            continue
+        quality = 1.0
+        name, _, value = params.strip().partition("=")
+        if name.strip().lower() == "q":
+            try:
+                quality = float(value)
+            except ValueError:
+                quality = 0.0
+        weights[coding] = quality
+
+    best, best_quality = None, 0.0
+    for encoding in supported_encodings():
+        quality = weights.get(encoding, weights.get("*", 0.0))
+        if quality > best_quality:
+            best, best_quality = encoding, quality
+    return best
+
+
+def compress(body: bytes, encoding: str) -> bytes:
+    if encoding == "br":
+        return brotli.compress(body, quality=BROTLI_QUALITY)
+    # mtime=0 keeps the output identical for identical bodies
+    return gzip.compress(body, compresslevel=GZIP_LEVEL, mtime=0)
+
+
+def weaken_etag(headers: MutableHeaders) -> None:
+    etag = headers.get("etag")
+    if etag and not etag.startswith("W/"):
+        headers["ETag"] = f"W/{etag}"
+
+
+class CompressionMiddleware:
+    """
+    Compresses response bodies of at least ``minimum_size`` bytes.
+
+    Responses with a strong ETag reuse a cached compressed body, and their ETag
+    is weakened on the way out since the bytes differ from the identity body;
+    If-None-Match uses weak comparison, so revalidation is unaffected. A 304
+    cannot tell whether its 200 would have been compressed, so it carries a
+    weak ETag whenever the client accepts an encoding we offer.
+    Streaming responses and responses that already have a Content-Encoding are
+    passed through untouched.
+    """
+
+    def __init__(
+        self,
+        app: ASGIApp,
+        minimum_size: int = settings.COMPRESSION_MIN_SIZE,
+        cache: TTLCache = compressed_bodies,
+    ):
+        self.app = app
+        self.minimum_size = minimum_size
+        self.cache = cache
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        encoding = negotiate_encoding(Headers(scope=scope).get("accept-encoding", ""))
+        start_message: Message | None = None
+
+        async def send_compressed(message: Message) -> None:
+            nonlocal start_message
+            if message["type"] == "http.response.start":
+                start_message = message
+                return
+            if message["type"] != "http.response.body" or start_message is None:
+                await send(message)
+                return
+
+            start, start_message = start_message, None
+            headers = MutableHeaders(raw=list(start.get("headers", [])))
+            body = message.get("body", b"")
+            if start["status"] == 304:
+                # A 304 has no content type or body to go on, so it gets the
+                # headers any compressed 200 for this request would have had
+                headers.add_vary_header("Accept-Encoding")
+                if encoding is not None:
+                    weaken_etag(headers)
+                await send({**start, "headers": headers.raw})
+                await send(message)
+                return
+            if message.get("more_body") or not self._compressible(headers):
+                await send(start)
+                await send(message)
+                return
+
+            headers.add_vary_header("Accept-Encoding")
+            if encoding is not None and len(body) >= self.minimum_size:
+                body = self._compress(body, encoding, headers.get("etag"))
+                headers["Content-Encoding"] = encoding
+                headers["Content-Length"] = str(len(body))
+                weaken_etag(headers)
+            await send({**start, "headers": headers.raw})
+            await send({"type": "http.response.body", "body": body})
+
+        await self.app(scope, receive, send_compressed)
+
+    @staticmethod
+    def _compressible(headers: MutableHeaders) -> bool:
+        if "content-encoding" in headers:
+            return False
+        return headers.get("content-type", "").startswith(COMPRESSIBLE_TYPES)
+
+    def _compress(self, body: bytes, encoding: str, etag: str | None) -> bytes:
+        if not etag or etag.startswith("W/"):
+            return compress(body, encoding)
+        key = (etag, encoding)
+        compressed = self.cache.get(key)
+        if compressed is None:
+            compressed = compress(body, encoding)
+            self.cache.set(key, compressed)
+        return compressed
@@ -1,16 +1,17 @@
-from collections.abc import Generator
+import secrets
+from collections.abc import AsyncGenerator, Generator
 from typing import Annotated
 
-import jwt
-from fastapi import Depends, HTTPException, Request, status
-from jwt.exceptions import InvalidTokenError
-from pydantic import ValidationError
+from fastapi import Depends, Header, HTTPException, Request, status
 from sqlmodel import Session
+from sqlmodel.ext.asyncio.session import AsyncSession
 
+from app import crud
 from app.core import security
 from app.core.config import settings
-from app.core.db import engine
-from app.models import TokenPayload, User
+from app.core.db import async_engine, engine
+from app.models import User
+from app.services.upstream import UpstreamClients
 
 
 def get_db() -> Generator[Session, None, None]:
@@ -21,6 +22,40 @@ def get_db() -> Generator[Session, None, None]:
 SessionDep = Annotated[Session, Depends(get_db)]
 
 
+async def get_async_db() -> AsyncGenerator[AsyncSession, None]:
+    async with AsyncSession(async_engine, expire_on_commit=False) as session:
+        yield session
+
+
+AsyncSessionDep = Annotated[AsyncSession, Depends(get_async_db)]
+
+
+def check_token(provided: str | None, expected: str | None) -> None:
+    """Reject the request unless a token is configured and ``provided`` matches it."""
+    if not expected or provided is None or not secrets.compare_digest(
+        provided.encode(), expected.encode()
+    ):
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Not authorized")
+
+
+def require_internal_token(x_internal_token: str | None = Header(default=None)) -> None:
+    """Guard for operational endpoints: X-Internal-Token must match INTERNAL_API_TOKEN."""
+    check_token(x_internal_token, settings.INTERNAL_API_TOKEN)
+
+
+def require_profile_token(x_profile_token: str | None = Header(default=None)) -> None:
+    """Guard for the profile endpoints: X-Profile-Token must match PROFILING_TOKEN."""
+    check_token(x_profile_token, settings.PROFILING_TOKEN)
+
+
+def get_upstream_clients(request: Request) -> UpstreamClients:
+    """The pooled upstream HTTP clients owned by the application lifespan."""
+    return request.app.state.upstream_clients
+
+
+UpstreamClientsDep = Annotated[UpstreamClients, Depends(get_upstream_clients)]
+
+
 def get_token_from_cookie(request: Request) -> str:
     """Extract access token from httpOnly cookie."""
     token = request.cookies.get("access_token")
@@ -35,25 +70,22 @@ def get_token_from_cookie(request: Request) -> str:
 TokenDep = Annotated[str, Depends(get_token_from_cookie)]
 
 
-def get_current_user(session: SessionDep, token: TokenDep) -> User:
-    try:
-        payload = jwt.decode(
-            token, settings.SECRET_KEY, algorithms=[security.ALGORITHM]
-        )
-        token_data = TokenPayload(**payload)
-    except (InvalidTokenError, ValidationError):
-        raise HTTPException(
-            status_code=status.HTTP_401_UNAUTHORIZED,
-            detail="Could not validate credentials",
-        )
+async def get_current_user(session: AsyncSessionDep, token: TokenDep) -> User:
+    """
+    Resolve the user for the request's access token.
 
-    if token_data.sub is None:
+    Token verification and the user lookup are both cached, so a repeat
+    request with the same cookie usually needs neither a signature check nor
+    a database query.
+    """
+    user_id = security.get_token_subject(token)
+    if user_id is None:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Could not validate credentials",
         )
 
-    user = session.get(User, token_data.sub)
+    user = await crud.get_user_by_id_cached(session=session, user_id=user_id)
     if not user:
         raise HTTPException(status_code=404, detail="User not found")
     if not user.is_active:
@@ -0,0 +1,40 @@
+import hashlib
+from datetime import datetime, timedelta
+
+from fastapi import Request
+
+
+def make_etag(*parts: object) -> str:
+    """Build a strong ETag from the values that fully determine a response body."""
+    digest = hashlib.sha256("\x1f".join(str(part) for part in parts).encode("utf-8"))
+    return f'"{digest.hexdigest()[:32]}"'
+
+
+def etag_matches(request: Request, etag: str) -> bool:
+    """Check If-None-Match against an ETag using weak comparison (RFC 9110)."""
+    header = request.headers.get("if-none-match")
+    if not header:
+        return False
+
+    candidates = [tag.strip() for tag in header.split(",")]
+    if "*" in candidates:
+        return True
+    return etag.removeprefix("W/") in (tag.removeprefix("W/") for tag in candidates)
+
+
+def cache_headers(etag: str, generation: datetime, max_age: timedelta) -> dict[str, str]:
+    """
+    Validator and Cache-Control headers for a response derived from a cache generation.
+
+    Clients may reuse the response until the generation expires, then keep
+    serving it while they revalidate for up to one more max_age.
+    """
+    remaining = max_age - (datetime.utcnow() - generation)
+    fresh_seconds = max(0, int(remaining.total_seconds()))
+    return {
+        "ETag": etag,
+        "Cache-Control": (
+            f"public, max-age={fresh_seconds}, "
+            f"stale-while-revalidate={int(max_age.total_seconds())}"
+        ),
+    }
@@ -1,7 +1,11 @@
 from fastapi import APIRouter
 
-from app.api.routes import auth, podcasts
+from app.api.routes import auth, internal, podcasts, profiles
+from app.core.config import settings
 
 api_router = APIRouter()
 api_router.include_router(auth.router)
 api_router.include_router(podcasts.router)
+api_router.include_router(internal.router)
+if settings.PROFILING_ENABLED:
+    api_router.include_router(profiles.router)
@@ -0,0 +1,40 @@
+import base64
+import binascii
+import json
+from collections.abc import Callable
+from typing import Any
+
+from fastapi import HTTPException, status
+
+
+def encode_cursor(*values: Any) -> str:
+    """Encode the keyset of the last row on a page as an opaque URL-safe cursor."""
+    raw = json.dumps(values, separators=(",", ":"), default=str).encode("utf-8")
+    return base64.urlsafe_b64encode(raw).rstrip(b"=").decode("ascii")
+
+
+def decode_cursor(cursor: str, *types: Callable[[Any], Any]) -> tuple[Any, ...]:
+    """
+    Decode a cursor made by encode_cursor, converting each value with ``types``.
+
+    Raises a 400 if the cursor is malformed, does not have one value per type,
+    or has a value that ``types`` cannot convert.
+    """
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        values = json.loads(raw)
+        if not isinstance(values, list) or len(values) != len(types):
+            raise ValueError("wrong number of values")
+        return tuple(convert(value) for convert, value in zip(types, values))
+    except (
+        AttributeError,
+        OverflowError,
+        binascii.Error,
+        UnicodeDecodeError,
+        TypeError,
+        ValueError,
+    ):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Invalid cursor",
+        )
@@ -3,7 +3,7 @@ from datetime import timedelta
 from fastapi import APIRouter, HTTPException, Response, status
 
 from app import crud
-from app.api.deps import CurrentUser, SessionDep
+from app.api.deps import AsyncSessionDep, CurrentUser
 from app.core.config import settings
 from app.core.security import create_access_token
 from app.models import LoginRequest, Message, UserCreate, UserPublic, UserRegister
@@ -12,15 +12,15 @@ router = APIRouter(prefix="/auth", tags=["auth"])
 
 
 @router.post("/login", response_model=UserPublic)
-def login(
+async def login(
     response: Response,
-    session: SessionDep,
+    session: AsyncSessionDep,
     credentials: LoginRequest,
 ) -> UserPublic:
     """
     Login with email and password. Sets httpOnly cookie with JWT.
     """
-    user = crud.authenticate(
+    user = await crud.authenticate(
         session=session,
         email=credentials.email,
         password=credentials.password,
@@ -57,15 +57,15 @@ def login(
 
 
 @router.post("/signup", response_model=UserPublic)
-def signup(
+async def signup(
     response: Response,
-    session: SessionDep,
+    session: AsyncSessionDep,
     user_in: UserRegister,
 ) -> UserPublic:
     """
     Create new user account. Auto-logs in by setting httpOnly cookie.
     """
-    user = crud.get_user_by_email(session=session, email=user_in.email)
+    user = await crud.get_user_by_email(session=session, email=user_in.email)
     if user:
         raise HTTPException(
             status_code=status.HTTP_409_CONFLICT,
@@ -73,7 +73,7 @@ def signup(
         )
 
     user_create = UserCreate.model_validate(user_in)
-    user = crud.create_user(session=session, user_create=user_create)
+    user = await crud.create_user(session=session, user_create=user_create)
 
     # Auto-login: create JWT and set cookie
     access_token_expires = timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES)
@@ -96,7 +96,7 @@ def signup(
 
 
 @router.post("/logout", response_model=Message)
-def logout(response: Response) -> Message:
+async def logout(response: Response) -> Message:
     """
     Logout by clearing the access token cookie.
     """
@@ -105,7 +105,7 @@ def logout(response: Response) -> Message:
 
 
 @router.get("/me", response_model=UserPublic)
-def get_current_user_info(current_user: CurrentUser) -> UserPublic:
+async def get_current_user_info(current_user: CurrentUser) -> UserPublic:
     """
     Get current authenticated user information.
     """
@@ -0,0 +1,24 @@
+from typing import Any
+
+from fastapi import APIRouter, Depends
+
+from app.api.deps import require_internal_token
+from app.core.db import async_engine, engine, pool_stats
+
+router = APIRouter(
+    prefix="/internal",
+    tags=["internal"],
+    include_in_schema=False,
+    dependencies=[Depends(require_internal_token)],
+)
+
+
+@router.get("/db-pool")
+async def get_db_pool_stats() -> dict[str, Any]:
+    """
+    Connection pool occupancy and checkout wait times for each engine.
+    """
+    return {
+        "async": pool_stats(async_engine.pool),
+        "sync": pool_stats(engine.pool),
+    }
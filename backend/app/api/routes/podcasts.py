@@ -1,209 +1,284 @@
-import asyncio
 import logging
+import uuid
 from datetime import datetime, timedelta
+from typing import Annotated
 
-from fastapi import APIRouter, HTTPException, Query, status
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response, status
+from sqlalchemy import cast, func, tuple_
+from sqlalchemy.dialects.postgresql import REGCONFIG
 from sqlmodel import select
 
-from app.api.deps import SessionDep
-from app.core.config import settings
-from app.models import CacheMetadata, Podcast, PodcastList, PodcastPublic
-from app.services.itunes import ITunesArtworkService
-from app.services.listenotes import ListenNotesService
+from app.api.deps import AsyncSessionDep
+from app.api.http_cache import cache_headers, etag_matches, make_etag
+from app.api.pagination import decode_cursor, encode_cursor
+from app.api.serialization import json_response, rows_to_dicts
+from app.core.metrics import cache_lookups
+from app.models import (
+    PODCAST_CARD_FIELDS,
+    PODCAST_POPULARITY,
+    PODCAST_PUBLIC_FIELDS,
+    PODCAST_SEARCH_CONFIG,
+    Podcast,
+    PodcastList,
+    PodcastPage,
+    PodcastPublic,
+    PodcastSuggestion,
+    PodcastSuggestions,
+    podcast_search_vector,
+)
+from app.services.podcast_cache import (
+    CACHE_KEY_BEST_PODCASTS,
+    CACHE_MAX_AGE_HOURS,
+    get_catalog_versions,
+    refresh_scheduler,
+)
+from app.services.typeahead import typeahead_index
 
 logger = logging.getLogger(__name__)
 
 router = APIRouter(prefix="/podcasts", tags=["podcasts"])
 
-CACHE_KEY_BEST_PODCASTS = "best_podcasts_overall"
-CACHE_MAX_AGE_HOURS = 24
-
-
-def is_cache_fresh(session: SessionDep, cache_key: str, max_age_hours: int = CACHE_MAX_AGE_HOURS) -> bool:
-    """Check if the cache for a given key is still fresh."""
-    metadata = session.exec(
-        select(CacheMetadata).where(CacheMetadata.cache_key == cache_key)
-    ).first()
-
-    if not metadata:
-        return False
+CACHE_MAX_AGE = timedelta(hours=CACHE_MAX_AGE_HOURS)
+
+
+def podcast_fields(
+    fields: str | None = Query(
+        default=None,
+        description=(
+            "Comma-separated podcast fields to return, or 'card' for the compact "
+            "card set (id, title, publisher, listen_score, cover_url, cover_url_md, "
+            "description_excerpt). id is always included. Defaults to every field."
+        ),
+    ),
+) -> tuple[str, ...]:
+    """Resolve a sparse fieldset to PodcastPublic field names, in schema order."""
+    if fields is None:
+        return PODCAST_PUBLIC_FIELDS
+    requested = {"id"}
+    for name in (name.strip() for name in fields.split(",")):
+        if name == "card":
+            requested.update(PODCAST_CARD_FIELDS)
+        elif name in PODCAST_PUBLIC_FIELDS:
+            requested.add(name)
+        elif name:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST, detail=f"Unknown field: {name}"
+            )
+    return tuple(name for name in PODCAST_PUBLIC_FIELDS if name in requested)
 
-    age = datetime.utcnow() - metadata.last_fetched_at
-    return age < timedelta(hours=max_age_hours)
 
+PodcastFields = Annotated[tuple[str, ...], Depends(podcast_fields)]
 
-def update_cache_timestamp(session: SessionDep, cache_key: str) -> None:
-    """Update or create cache metadata timestamp."""
-    metadata = session.exec(
-        select(CacheMetadata).where(CacheMetadata.cache_key == cache_key)
-    ).first()
 
-    if metadata:
-        metadata.last_fetched_at = datetime.utcnow()
-    else:
-        metadata = CacheMetadata(cache_key=cache_key, last_fetched_at=datetime.utcnow())
-        session.add(metadata)
+def podcast_columns(fields: tuple[str, ...]) -> list:
+    return [getattr(Podcast, name) for name in fields]
 
-    session.commit()
 
-
-def refresh_best_podcasts_cache(session: SessionDep) -> bool:
+@router.get("/popular", response_model=PodcastList)
+async def get_popular_podcasts(
+    request: Request,
+    session: AsyncSessionDep,
+    fields: PodcastFields,
+    limit: int = Query(default=6, ge=1, le=20),
+    genre: int | None = Query(default=None, ge=1, description="Listen Notes genre ID"),
+) -> Response:
     """
-    Fetch best podcasts from Listen Notes and update the database.
-    Returns True if successful, False otherwise.
+    Get popular/featured podcasts for the landing page, optionally in one genre.
+
+    Always serves the current database snapshot. If the cache is stale (>24h),
+    a background refresh is requested instead of calling the APIs inline.
+    Responses carry an ETag tied to the catalog data version, and a matching
+    If-None-Match is answered with 304 without querying podcasts.
     """
-    if not settings.LISTENOTES_API_KEY:
-        logger.warning("LISTENOTES_API_KEY not configured, skipping cache refresh")
-        return False
-
-    service = ListenNotesService(api_key=settings.LISTENOTES_API_KEY)
-    podcasts_data = service.fetch_best_podcasts(genre_id=0, page=1)
-
-    if podcasts_data is None:
-        logger.error("Failed to fetch podcasts from Listen Notes API")
-        return False
-
-    # Fetch iTunes artwork for each podcast
-    artwork_map = _fetch_itunes_artwork(podcasts_data)
-
-    # Upsert podcasts
-    for data in podcasts_data:
-        # Check if podcast already exists by listenotes_id
-        existing = session.exec(
-            select(Podcast).where(Podcast.listenotes_id == data.listenotes_id)
-        ).first()
-
-        artwork = artwork_map.get(data.listenotes_id)
-        cover_url_sm = artwork["sm"] if artwork else data.cover_url
-        cover_url_md = artwork["md"] if artwork else data.cover_url
-        cover_url_lg = artwork["lg"] if artwork else data.cover_url
-
-        if existing:
-            # Update existing podcast
-            existing.title = data.title
-            existing.publisher = data.publisher
-            existing.author = data.publisher  # Map publisher to author for compatibility
-            existing.description = data.description
-            existing.cover_url = data.cover_url
-            existing.feed_url = data.feed_url
-            existing.total_episodes = data.total_episodes
-            existing.listen_score = data.listen_score
-            existing.genre_ids = data.genre_ids
-            existing.listenotes_url = data.listenotes_url
-            existing.itunes_id = data.itunes_id
-            existing.cover_url_sm = cover_url_sm
-            existing.cover_url_md = cover_url_md
-            existing.cover_url_lg = cover_url_lg
-            existing.is_featured = True
-        else:
-            # Create new podcast
-            podcast = Podcast(
-                title=data.title,
-                publisher=data.publisher,
-                author=data.publisher,  # Map publisher to author for compatibility
-                description=data.description,
-                cover_url=data.cover_url,
-                feed_url=data.feed_url,
-                listenotes_id=data.listenotes_id,
-                total_episodes=data.total_episodes,
-                listen_score=data.listen_score,
-                genre_ids=data.genre_ids,
-                listenotes_url=data.listenotes_url,
-                itunes_id=data.itunes_id,
-                cover_url_sm=cover_url_sm,
-                cover_url_md=cover_url_md,
-                cover_url_lg=cover_url_lg,
-                is_featured=True,
-            )
-            session.add(podcast)
+    generation, version = await get_catalog_versions(session)
 
-    session.commit()
-    update_cache_timestamp(session, CACHE_KEY_BEST_PODCASTS)
-    logger.info(f"Successfully refreshed best podcasts cache with {len(podcasts_data)} podcasts")
-    return True
+    if generation is None or datetime.utcnow() - generation >= CACHE_MAX_AGE:
+        cache_lookups.labels(CACHE_KEY_BEST_PODCASTS, "miss" if generation is None else "stale").inc()
+        logger.info("Best podcasts cache is stale, requesting background refresh")
+        refresh_scheduler.request_refresh()
+    else:
+        cache_lookups.labels(CACHE_KEY_BEST_PODCASTS, "hit").inc()
 
+    headers = {}
+    if version is not None:
+        etag = make_etag(CACHE_KEY_BEST_PODCASTS, version.isoformat(), limit, genre, *fields)
+        headers = cache_headers(etag, generation or version, CACHE_MAX_AGE)
+        if etag_matches(request, etag):
+            return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
 
-def _fetch_itunes_artwork(
-    podcasts_data: list,
-) -> dict[str, dict[str, str]]:
-    """
-    Fetch iTunes artwork URLs for a list of podcasts.
-    Returns a dict mapping listenotes_id -> artwork URLs dict.
+    # Fetch podcasts from database, ordered by listen score
+    statement = (
+        select(*podcast_columns(fields))
+        .where(Podcast.is_featured == True)
+        .order_by(PODCAST_POPULARITY.desc(), Podcast.id.desc())
+        .limit(limit)
+    )
+    if genre is not None:
+        # Array containment is answered from the GIN index on genres
+        statement = statement.where(Podcast.genres.contains([genre]))
+    podcasts = rows_to_dicts((await session.exec(statement)).all(), fields)
+
+    return json_response({"podcasts": podcasts, "count": len(podcasts)}, headers)
+
+
+@router.get("", response_model=PodcastPage)
+async def browse_podcasts(
+    request: Request,
+    session: AsyncSessionDep,
+    fields: PodcastFields,
+    featured: bool | None = Query(
+        default=None, description="Only featured (true) or non-featured (false) podcasts"
+    ),
+    genre: int | None = Query(default=None, ge=1, description="Listen Notes genre ID"),
+    limit: int = Query(default=20, ge=1, le=100),
+    cursor: str | None = Query(default=None, description="next_cursor from the previous page"),
+) -> Response:
     """
-    async def _fetch_all():
-        itunes_service = ITunesArtworkService()
-        results = {}
-        try:
-            for data in podcasts_data:
-                artwork = await itunes_service.get_artwork_urls(
-                    itunes_id=data.itunes_id, title=data.title
-                )
-                if artwork:
-                    results[data.listenotes_id] = artwork
-                await asyncio.sleep(0.5)  # Rate limit protection
-        finally:
-            await itunes_service.close()
-        return results
-
-    return asyncio.run(_fetch_all())
+    Browse the podcast catalog by popularity, one page at a time.
 
+    The whole catalog is listed unless ``featured`` is given. Pages are
+    keyset-paginated on (popularity, id): the cursor holds the last row's sort
+    key and the next page starts strictly after it. Together with the
+    (popularity, id) and (is_featured, popularity, id) indexes every page is a
+    short index range scan, however deep it is.
+    """
+    generation, version = await get_catalog_versions(session)
+    headers = {}
+    if version is not None:
+        etag = make_etag("browse", version.isoformat(), featured, genre, limit, cursor, *fields)
+        headers = cache_headers(etag, generation or version, CACHE_MAX_AGE)
+        if etag_matches(request, etag):
+            return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
 
-@router.get("/popular", response_model=PodcastList)
-def get_popular_podcasts(
-    session: SessionDep,
-    limit: int = Query(default=6, ge=1, le=20),
-) -> PodcastList:
+    statement = (
+        select(*podcast_columns(fields), PODCAST_POPULARITY)
+        .order_by(PODCAST_POPULARITY.desc(), Podcast.id.desc())
+        .limit(limit + 1)
+    )
+    if featured is not None:
+        statement = statement.where(Podcast.is_featured == featured)
+    if genre is not None:
+        statement = statement.where(Podcast.genres.contains([genre]))
+    if cursor is not None:
+        popularity, last_id = decode_cursor(cursor, int, uuid.UUID)
+        statement = statement.where(tuple_(PODCAST_POPULARITY, Podcast.id) < (popularity, last_id))
+
+    rows = (await session.exec(statement)).all()
+
+    has_more = len(rows) > limit
+    rows = rows[:limit]
+    podcasts = rows_to_dicts(rows, fields)
+
+    next_cursor = None
+    if has_more:
+        # The popularity sort key is selected after the podcast columns
+        next_cursor = encode_cursor(rows[-1][-1], podcasts[-1]["id"])
+
+    return json_response({"podcasts": podcasts, "next_cursor": next_cursor}, headers)
+
+
+@router.get("/search", response_model=PodcastPage)
+async def search_podcasts(
+    request: Request,
+    session: AsyncSessionDep,
+    fields: PodcastFields,
+    q: str = Query(min_length=1, max_length=200, description="Search terms"),
+    limit: int = Query(default=20, ge=1, le=50),
+    cursor: str | None = Query(default=None, description="next_cursor from the previous page"),
+) -> Response:
     """
-    Get popular/featured podcasts for the landing page.
+    Search podcasts by title, publisher and description.
 
-    Uses cached data from Listen Notes API. If cache is stale (>24h),
-    attempts to refresh from API. Falls back to stale cache if API fails.
+    ``q`` accepts web search syntax ("quoted phrases", -exclusions, or).
+    Matches come from the GIN-indexed search vector and are ranked with
+    ts_rank, so title hits outrank publisher hits, which outrank description
+    hits. Pages are keyset-paginated on (rank, id).
     """
-    cache_fresh = is_cache_fresh(session, CACHE_KEY_BEST_PODCASTS)
+    generation, version = await get_catalog_versions(session)
+    headers = {}
+    if version is not None:
+        etag = make_etag("search", version.isoformat(), q, limit, cursor, *fields)
+        headers = cache_headers(etag, generation or version, CACHE_MAX_AGE)
+        if etag_matches(request, etag):
+            return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+
+    query = func.websearch_to_tsquery(cast(PODCAST_SEARCH_CONFIG, REGCONFIG), q)
+    rank = func.ts_rank(podcast_search_vector, query)
+    statement = (
+        select(*podcast_columns(fields), rank)
+        .where(podcast_search_vector.op("@@")(query))
+        .order_by(rank.desc(), Podcast.id.desc())
+        .limit(limit + 1)
+    )
+    if cursor is not None:
+        last_rank, last_id = decode_cursor(cursor, float, uuid.UUID)
+        statement = statement.where(tuple_(rank, Podcast.id) < (last_rank, last_id))
 
-    if not cache_fresh:
-        logger.info("Best podcasts cache is stale, attempting refresh")
-        refresh_success = refresh_best_podcasts_cache(session)
+    rows = (await session.exec(statement)).all()
 
-        if not refresh_success:
-            # Check if we have any cached data to fall back to
-            cache_metadata = session.exec(
-                select(CacheMetadata).where(CacheMetadata.cache_key == CACHE_KEY_BEST_PODCASTS)
-            ).first()
+    has_more = len(rows) > limit
+    rows = rows[:limit]
+    podcasts = rows_to_dicts(rows, fields)
 
-            if cache_metadata:
-                age_hours = (datetime.utcnow() - cache_metadata.last_fetched_at).total_seconds() / 3600
-                logger.warning(f"Listen Notes API failed, serving stale cache (age: {age_hours:.1f} hours)")
-            else:
-                logger.warning("No cached data available and API failed, returning empty list")
+    next_cursor = None
+    if has_more:
+        # The rank is selected after the podcast columns
+        next_cursor = encode_cursor(rows[-1][-1], podcasts[-1]["id"])
 
-    # Fetch podcasts from database, ordered by listen score
-    statement = (
-        select(Podcast)
-        .where(Podcast.is_featured == True)
-        .order_by(Podcast.listen_score.desc())
-        .limit(limit)
-    )
-    podcasts = session.exec(statement).all()
+    return json_response({"podcasts": podcasts, "next_cursor": next_cursor}, headers)
+
+
+@router.get("/suggest", response_model=PodcastSuggestions)
+async def suggest_podcasts(
+    session: AsyncSessionDep,
+    q: str = Query(min_length=1, max_length=100, description="Prefix typed so far"),
+    limit: int = Query(default=8, ge=1, le=20),
+) -> PodcastSuggestions:
+    """
+    Search-as-you-type suggestions from the in-memory typeahead index.
 
-    return PodcastList(
-        podcasts=[PodcastPublic.model_validate(p) for p in podcasts],
-        count=len(podcasts),
+    Matches podcasts with a title or publisher word starting with ``q``,
+    most popular first, without a database query.
+    """
+    _, version = await get_catalog_versions(session)
+    if version is not None:
+        typeahead_index.request_reload(version)
+
+    return PodcastSuggestions(
+        suggestions=[
+            PodcastSuggestion.model_validate(entry._asdict())
+            for entry in typeahead_index.suggest(q, limit)
+        ]
     )
 
 
 @router.get("/{podcast_id}", response_model=PodcastPublic)
-def get_podcast(
-    session: SessionDep,
+async def get_podcast(
+    request: Request,
+    response: Response,
+    session: AsyncSessionDep,
     podcast_id: str,
 ) -> PodcastPublic:
     """
     Get a specific podcast by ID.
+
+    Podcast rows only change when catalog pages are written, so the ETag is
+    derived from the catalog data version and revalidation skips the lookup.
     """
-    podcast = session.get(Podcast, podcast_id)
+    generation, version = await get_catalog_versions(session)
+    if version is not None:
+        etag = make_etag("podcast", podcast_id, version.isoformat())
+        headers = cache_headers(etag, generation or version, CACHE_MAX_AGE)
+        if etag_matches(request, etag):
+            return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+
+    podcast = await session.get(Podcast, podcast_id)
     if not podcast:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Podcast not found",
         )
+
+    if version is not None:
+        response.headers.update(headers)
     return PodcastPublic.model_validate(podcast)
@@ -0,0 +1,34 @@
+import asyncio
+from typing import Any
+
+from fastapi import APIRouter, Depends, HTTPException
+from fastapi.responses import PlainTextResponse
+
+from app.api.deps import require_profile_token
+from app.core.profiling import profile_store
+
+router = APIRouter(
+    prefix="/internal/profiles",
+    tags=["internal"],
+    include_in_schema=False,
+    dependencies=[Depends(require_profile_token)],
+)
+
+
+@router.get("")
+async def list_profiles() -> list[dict[str, Any]]:
+    """
+    Recent request profiles, newest first.
+    """
+    return await asyncio.to_thread(profile_store.index)
+
+
+@router.get("/{profile_id}", response_class=PlainTextResponse)
+async def get_profile(profile_id: str) -> str:
+    """
+    One profile as collapsed stacks, for flamegraph.pl or speedscope.
+    """
+    collapsed = await asyncio.to_thread(profile_store.load, profile_id)
+    if collapsed is None:
+        raise HTTPException(status_code=404, detail="Profile not found")
+    return collapsed
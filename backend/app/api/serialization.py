@@ -0,0 +1,25 @@
+from collections.abc import Iterable, Mapping, Sequence
+from typing import Any
+
+from fastapi import Response
+from pydantic_core import to_json
+
+
+def rows_to_dicts(rows: Iterable[Sequence[Any]], fields: Sequence[str]) -> list[dict[str, Any]]:
+    """
+    Map selected rows onto ``fields`` by position.
+
+    Columns beyond ``fields`` (such as a trailing sort key) are dropped.
+    """
+    return [dict(zip(fields, row)) for row in rows]
+
+
+def json_response(content: Any, headers: Mapping[str, str] | None = None) -> Response:
+    """
+    Serialize ``content`` once with pydantic-core's encoder.
+
+    Returning a Response skips FastAPI's response_model validation, so only use
+    this for content built straight from typed database columns. Keep
+    response_model on the route for the OpenAPI schema.
+    """
+    return Response(content=to_json(content), media_type="application/json", headers=headers)
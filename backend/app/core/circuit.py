@@ -0,0 +1,59 @@
+import time
+
+
+class CircuitOpenError(Exception):
+    """Raised instead of calling a dependency while its circuit is open."""
+
+
+class CircuitBreaker:
+    """
+    Consecutive-failure circuit breaker.
+
+    After ``failure_threshold`` failures in a row the circuit opens and calls
+    are rejected with CircuitOpenError for ``reset_timeout`` seconds. The next
+    call after that is let through as a trial: success closes the circuit,
+    failure opens it again for another ``reset_timeout``. Every call let
+    through must end in record_success or record_failure, or a trial stays
+    in flight and the circuit never closes.
+    """
+
+    def __init__(self, failure_threshold: int, reset_timeout: float):
+        if failure_threshold < 1:
+            raise ValueError("failure_threshold must be at least 1")
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self._failures = 0
+        self._opened_at: float | None = None
+        self._trial_in_flight = False
+
+    @property
+    def state(self) -> str:
+        if self._opened_at is None:
+            return "closed"
+        if time.monotonic() - self._opened_at >= self.reset_timeout:
+            return "half_open"
+        return "open"
+
+    def before_call(self) -> None:
+        """Raise CircuitOpenError unless a call may be made now."""
+        state = self.state
+        if state == "open":
+            raise CircuitOpenError("circuit is open")
+        if state == "half_open":
+            if self._trial_in_flight:
+                raise CircuitOpenError("circuit is half-open and a trial call is in flight")
+            self._trial_in_flight = True
+
+    def record_success(self) -> None:
+        self._failures = 0
+        self._opened_at = None
+        self._trial_in_flight = False
+
+    def record_failure(self) -> None:
+        self._failures += 1
+        if self._trial_in_flight or self._failures >= self.failure_threshold:
+            self._opened_at = time.monotonic()
+        self._trial_in_flight = False
+
+    def reset(self) -> None:
+        self.record_success()
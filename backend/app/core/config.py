@@ -21,6 +21,12 @@ def parse_cors(v: Any) -> list[str] | str:
     raise ValueError(v)
 
 
+def parse_int_list(v: Any) -> list[int] | Any:
+    if isinstance(v, str) and not v.startswith("["):
+        return [int(i) for i in v.split(",") if i.strip()]
+    return v
+
+
 class Settings(BaseSettings):
     model_config = SettingsConfigDict(
         env_file="../.env",
@@ -35,6 +41,16 @@ class Settings(BaseSettings):
     # Security
     SECRET_KEY: str = secrets.token_urlsafe(32)
     ACCESS_TOKEN_EXPIRE_MINUTES: int = 60 * 24 * 8  # 8 days
+    # bcrypt cost factor; existing hashes below it are upgraded on login
+    PASSWORD_HASH_ROUNDS: int = 12
+    # Threads dedicated to bcrypt, so logins cannot exhaust the shared threadpool
+    PASSWORD_HASH_WORKERS: int = 4
+    # Per-worker caches for authenticated requests. User changes reach every
+    # worker over Postgres NOTIFY; USER_CACHE_TTL_SECONDS bounds staleness
+    # if a notification is missed.
+    USER_CACHE_SIZE: int = 10000
+    USER_CACHE_TTL_SECONDS: float = 60.0
+    TOKEN_CACHE_SIZE: int = 10000
 
     # Environment
     ENVIRONMENT: Literal["local", "staging", "production"] = "local"
@@ -54,6 +70,35 @@ class Settings(BaseSettings):
 
     # Listen Notes API
     LISTENOTES_API_KEY: str | None = None
+    LISTENOTES_BASE_URL: str | None = None  # Overrides the API URL, e.g. for a local stand-in
+    LISTENOTES_TIMEOUT_SECONDS: float = 10.0
+    LISTENOTES_MAX_CONNECTIONS: int = 10
+    LISTENOTES_RETRY_ATTEMPTS: int = 4
+    LISTENOTES_RETRY_MAX_WAIT_SECONDS: float = 8.0
+    LISTENOTES_BREAKER_FAILURE_THRESHOLD: int = 5
+    LISTENOTES_BREAKER_RESET_SECONDS: float = 60.0
+
+    # Background cache refresh
+    CACHE_REFRESH_ENABLED: bool = True
+    CACHE_REFRESH_AHEAD_MINUTES: int = 60
+    CACHE_REFRESH_POLL_SECONDS: float = 300.0
+    CACHE_REFRESH_RETRY_SECONDS: float = 60.0
+    CACHE_GENERATION_TTL_SECONDS: float = 30.0
+
+    # Catalog ingestion: Listen Notes genres (0 = overall) and pages per genre
+    INGEST_GENRE_IDS: Annotated[list[int] | str, BeforeValidator(parse_int_list)] = [0]
+    INGEST_PAGES: int = 1
+    INGEST_CONCURRENCY: int = 4
+
+    # iTunes API
+    ITUNES_BASE_URL: str = "https://itunes.apple.com"
+    ITUNES_REQUESTS_PER_SECOND: float = 20.0
+    ITUNES_MAX_CONCURRENCY: int = 8
+    ARTWORK_CACHE_TTL_DAYS: int = 30
+    ARTWORK_CACHE_NEGATIVE_TTL_HOURS: int = 24
+
+    # Shared upstream HTTP clients; HTTP/2 needs the h2 package
+    UPSTREAM_HTTP2: bool = False
 
     # Database
     POSTGRES_SERVER: str = "localhost"
@@ -62,6 +107,41 @@ class Settings(BaseSettings):
     POSTGRES_PASSWORD: str = "postgres"
     POSTGRES_DB: str = "hearsay"
 
+    # Connection pool (applies to the sync and async engines separately)
+    DB_POOL_SIZE: int = 10
+    DB_MAX_OVERFLOW: int = 20
+    DB_POOL_TIMEOUT: float = 30.0
+    DB_POOL_RECYCLE: int = 1800
+    DB_STATEMENT_TIMEOUT_MS: int = 15000  # 0 disables
+
+    # Startup warm-up: open pooled connections and serve the landing page once
+    # before taking traffic
+    WARMUP_ENABLED: bool = True
+    WARMUP_DB_CONNECTIONS: int = 4  # per engine, capped at DB_POOL_SIZE
+    WARMUP_TIMEOUT_SECONDS: float = 10.0
+
+    # /internal endpoints answer only requests with a matching X-Internal-Token
+    # header; unset disables them
+    INTERNAL_API_TOKEN: str | None = None
+
+    # Prometheus metrics at /metrics; keep the path off the public ingress
+    METRICS_ENABLED: bool = True
+
+    # gzip/brotli response compression; turn off when a proxy already compresses
+    COMPRESSION_ENABLED: bool = True
+    COMPRESSION_MIN_SIZE: int = 1024
+    COMPRESSION_CACHE_SIZE: int = 256
+
+    # Sampling profiler for live requests. Profiles are taken for requests with
+    # an X-Profile-Token header matching PROFILING_TOKEN, and for a random
+    # PROFILING_SAMPLE_RATE fraction of all requests.
+    PROFILING_ENABLED: bool = False
+    PROFILING_TOKEN: str | None = None
+    PROFILING_SAMPLE_RATE: float = 0.0
+    PROFILING_INTERVAL_MS: float = 5.0
+    PROFILING_DIR: str = "/tmp/hearsay-profiles"
+    PROFILING_MAX_PROFILES: int = 100
+
     @computed_field
     @property
     def SQLALCHEMY_DATABASE_URI(self) -> PostgresDsn:
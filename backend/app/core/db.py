@@ -1,8 +1,168 @@
+import asyncio
+import time
+from collections.abc import Iterator
+from contextlib import AsyncExitStack, ExitStack
+from typing import Any
+
+from sqlalchemy import exc
+from sqlalchemy.ext.asyncio import create_async_engine
+from sqlalchemy.pool import AsyncAdaptedQueuePool, Pool, QueuePool
 from sqlmodel import Session, create_engine
 
 from app.core.config import settings
+from app.core.metrics import Histogram, registry
+from app.core.query_stats import instrument_engine
+
+pool_checkout_wait = registry.histogram(
+    "db_pool_checkout_wait_seconds",
+    "Time spent waiting for a database connection.",
+    ("engine",),
+)
+
+
+class PoolMetrics:
+    """
+    Connection checkout timings for one pool class.
+
+    With an ``engine`` name the wait histogram is exported on /metrics.
+    """
+
+    def __init__(self, engine: str | None = None):
+        self.checkout_wait = pool_checkout_wait.labels(engine) if engine else Histogram()
+        self.checkout_timeouts = 0
+
+
+class _InstrumentedPoolMixin:
+    """
+    Times every connection checkout.
+
+    The wait covers queueing for a free connection and, while the pool is
+    below capacity, opening a new one. Metrics live on the class so they
+    survive the pool being recreated by Engine.dispose().
+    """
+
+    metrics: PoolMetrics
+
+    def _do_get(self) -> Any:
+        start = time.perf_counter()
+        try:
+            return super()._do_get()
+        except exc.TimeoutError:
+            self.metrics.checkout_timeouts += 1
+            raise
+        finally:
+            self.metrics.checkout_wait.observe(time.perf_counter() - start)
+
+
+class InstrumentedQueuePool(_InstrumentedPoolMixin, QueuePool):
+    metrics = PoolMetrics("sync")
+
+
+class InstrumentedAsyncPool(_InstrumentedPoolMixin, AsyncAdaptedQueuePool):
+    metrics = PoolMetrics("async")
+
+
+def _engine_options() -> dict[str, Any]:
+    connect_args = {}
+    if settings.DB_STATEMENT_TIMEOUT_MS:
+        connect_args["options"] = f"-c statement_timeout={settings.DB_STATEMENT_TIMEOUT_MS}"
+    return {
+        "pool_size": settings.DB_POOL_SIZE,
+        "max_overflow": settings.DB_MAX_OVERFLOW,
+        "pool_timeout": settings.DB_POOL_TIMEOUT,
+        "pool_recycle": settings.DB_POOL_RECYCLE,
+        "pool_pre_ping": True,
+        "connect_args": connect_args,
+    }
+
+
+engine = create_engine(
+    str(settings.SQLALCHEMY_DATABASE_URI),
+    poolclass=InstrumentedQueuePool,
+    **_engine_options(),
+)
+
+# psycopg 3 serves both engines; create_async_engine selects its async driver
+async_engine = create_async_engine(
+    str(settings.SQLALCHEMY_DATABASE_URI),
+    poolclass=InstrumentedAsyncPool,
+    **_engine_options(),
+)
+
+instrument_engine(engine)
+instrument_engine(async_engine.sync_engine)
+
+
+def _warm_sync_pool(connections: int) -> None:
+    with ExitStack() as stack:
+        for _ in range(connections):
+            stack.enter_context(engine.connect())
+
+
+async def warm_pools(connections: int = settings.WARMUP_DB_CONNECTIONS) -> None:
+    """
+    Open ``connections`` connections in each engine's pool ahead of traffic.
+
+    The connections are held at the same time, so the pools keep that many
+    instead of reusing one. Capped at DB_POOL_SIZE, since overflow connections
+    are closed when returned.
+    """
+    connections = min(connections, settings.DB_POOL_SIZE)
+    if connections < 1:
+        return
+    async with AsyncExitStack() as stack:
+        async with asyncio.TaskGroup() as tasks:
+            tasks.create_task(asyncio.to_thread(_warm_sync_pool, connections))
+            for _ in range(connections):
+                tasks.create_task(stack.enter_async_context(async_engine.connect()))
+
+
+def pool_stats(pool: Pool) -> dict[str, Any]:
+    """Current occupancy and checkout timings for an instrumented pool."""
+    stats: dict[str, Any] = {
+        "size": pool.size(),
+        "checked_out": pool.checkedout(),
+        "checked_in": pool.checkedin(),
+        "overflow": max(0, pool.overflow()),
+    }
+    if isinstance(pool, _InstrumentedPoolMixin):
+        stats["checkout_timeouts"] = pool.metrics.checkout_timeouts
+        stats["checkout_wait_seconds"] = pool.metrics.checkout_wait.snapshot()
+    return stats
+
+
+def _engine_pools() -> Iterator[tuple[str, Pool]]:
+    # Read at scrape time: Engine.dispose() replaces the pool object
+    yield "async", async_engine.pool
+    yield "sync", engine.pool
+
+
+def _pool_connection_samples() -> Iterator[tuple[tuple[str, ...], float]]:
+    for name, pool in _engine_pools():
+        stats = pool_stats(pool)
+        for state in ("size", "checked_out", "checked_in", "overflow"):
+            yield (name, state), stats[state]
+
+
+def _pool_timeout_samples() -> Iterator[tuple[tuple[str, ...], float]]:
+    for name, pool in _engine_pools():
+        yield (name,), pool_stats(pool).get("checkout_timeouts", 0)
+
 
-engine = create_engine(str(settings.SQLALCHEMY_DATABASE_URI))
+registry.callback(
+    "db_pool_connections",
+    "Connections in each pool by state.",
+    "gauge",
+    ("engine", "state"),
+    _pool_connection_samples,
+)
+registry.callback(
+    "db_pool_checkout_timeouts_total",
+    "Connection checkouts that timed out waiting for a free connection.",
+    "counter",
+    ("engine",),
+    _pool_timeout_samples,
+)
 
 
 def init_db(session: Session) -> None:
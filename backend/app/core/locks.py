@@ -0,0 +1,46 @@
+import hashlib
+from collections.abc import AsyncIterator
+from contextlib import asynccontextmanager
+
+from sqlalchemy import text
+
+from app.core.db import async_engine
+
+
+def advisory_lock_key(name: str) -> int:
+    """Map a lock name to a stable signed 64-bit Postgres advisory lock key."""
+    digest = hashlib.blake2b(name.encode("utf-8"), digest_size=8).digest()
+    return int.from_bytes(digest, "big", signed=True)
+
+
+@asynccontextmanager
+async def advisory_lock(name: str, wait: bool = False) -> AsyncIterator[bool]:
+    """
+    Hold a cluster-wide Postgres advisory lock for the duration of the block.
+
+    Yields True if the lock was acquired. With ``wait=False`` the lock is only
+    tried and False is yielded immediately if another connection holds it.
+    The lock lives on a dedicated connection, so it is released even if the
+    holding worker dies mid-refresh. Waiting is not subject to the statement
+    timeout.
+    """
+    key = advisory_lock_key(name)
+    async with async_engine.connect() as conn:
+        if wait:
+            # Waiting out another worker's refresh can outlast DB_STATEMENT_TIMEOUT_MS.
+            # SET LOCAL lasts until this connection's transaction ends, so the
+            # pooled connection gets its default timeout back.
+            await conn.execute(text("SET LOCAL statement_timeout = 0"))
+            await conn.execute(text("SELECT pg_advisory_lock(:key)"), {"key": key})
+            acquired = True
+        else:
+            acquired = bool(
+                (
+                    await conn.execute(text("SELECT pg_try_advisory_lock(:key)"), {"key": key})
+                ).scalar()
+            )
+        try:
+            yield acquired
+        finally:
+            if acquired:
+                await conn.execute(text("SELECT pg_advisory_unlock(:key)"), {"key": key})
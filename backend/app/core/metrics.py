@@ -0,0 +1,286 @@
+import bisect
+import threading
+import time
+from collections.abc import Callable, Iterable, Iterator
+from contextlib import contextmanager
+from typing import Any
+
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+DEFAULT_LATENCY_BUCKETS = (
+    0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0,
+)
+
+
+class Histogram:
+    """
+    Thread-safe histogram with fixed bucket upper bounds.
+
+    Observations are counted in the first bucket whose bound is >= the value;
+    anything larger falls into the implicit +Inf bucket.
+    """
+
+    def __init__(self, buckets: tuple[float, ...] = DEFAULT_LATENCY_BUCKETS):
+        self.buckets = tuple(sorted(buckets))
+        self._counts = [0] * (len(self.buckets) + 1)
+        self._sum = 0.0
+        self._lock = threading.Lock()
+
+    def observe(self, value: float) -> None:
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            self._counts[index] += 1
+            self._sum += value
+
+    def snapshot(self) -> dict:
+        """Return cumulative bucket counts, total count and sum."""
+        with self._lock:
+            counts = list(self._counts)
+            total = self._sum
+
+        cumulative = {}
+        running = 0
+        for bound, count in zip([*map(str, self.buckets), "+Inf"], counts):
+            running += count
+            cumulative[bound] = running
+
+        return {"buckets": cumulative, "count": running, "sum": total}
+
+
+class Counter:
+    """Thread-safe monotonically increasing counter."""
+
+    def __init__(self):
+        self._value = 0.0
+        self._lock = threading.Lock()
+
+    def inc(self, amount: float = 1.0) -> None:
+        with self._lock:
+            self._value += amount
+
+    @property
+    def value(self) -> float:
+        return self._value
+
+
+class MetricFamily:
+    """
+    A named metric with one child per combination of label values.
+
+    Children are created on first use and cached, so the hot path of an
+    already seen label set is a single dict lookup.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        kind: str,
+        labelnames: tuple[str, ...],
+        factory: Callable[[], Counter | Histogram],
+    ):
+        self.name = name
+        self.documentation = documentation
+        self.kind = kind
+        self.labelnames = labelnames
+        self._factory = factory
+        self._children: dict[tuple[str, ...], Counter | Histogram] = {}
+        self._lock = threading.Lock()
+
+    def labels(self, *values: str) -> Any:
+        child = self._children.get(values)
+        if child is None:
+            if len(values) != len(self.labelnames):
+                raise ValueError(f"{self.name} expects labels {self.labelnames}, got {values}")
+            with self._lock:
+                child = self._children.setdefault(values, self._factory())
+        return child
+
+    def collect(self) -> Iterator[tuple[str, tuple[str, ...], float]]:
+        for values, child in list(self._children.items()):
+            if isinstance(child, Histogram):
+                snapshot = child.snapshot()
+                for bound, count in snapshot["buckets"].items():
+                    yield "_bucket", (*values, bound), count
+                yield "_sum", values, snapshot["sum"]
+                yield "_count", values, snapshot["count"]
+            else:
+                yield "", values, child.value
+
+
+class CallbackMetric:
+    """A metric whose samples are read from ``callback`` at scrape time."""
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        kind: str,
+        labelnames: tuple[str, ...],
+        callback: Callable[[], Iterable[tuple[tuple[str, ...], float]]],
+    ):
+        self.name = name
+        self.documentation = documentation
+        self.kind = kind
+        self.labelnames = labelnames
+        self._callback = callback
+
+    def collect(self) -> Iterator[tuple[str, tuple[str, ...], float]]:
+        for values, value in self._callback():
+            yield "", values, value
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+class MetricsRegistry:
+    """Metric families rendered together in the Prometheus text format."""
+
+    def __init__(self):
+        self._metrics: dict[str, MetricFamily | CallbackMetric] = {}
+
+    def _register(self, metric: MetricFamily | CallbackMetric) -> Any:
+        if metric.name in self._metrics:
+            raise ValueError(f"Metric {metric.name} is already registered")
+        self._metrics[metric.name] = metric
+        return metric
+
+    def counter(self, name: str, documentation: str, labelnames: tuple[str, ...] = ()) -> MetricFamily:
+        return self._register(MetricFamily(name, documentation, "counter", labelnames, Counter))
+
+    def histogram(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: tuple[str, ...] = (),
+        buckets: tuple[float, ...] = DEFAULT_LATENCY_BUCKETS,
+    ) -> MetricFamily:
+        return self._register(
+            MetricFamily(name, documentation, "histogram", labelnames, lambda: Histogram(buckets))
+        )
+
+    def callback(
+        self,
+        name: str,
+        documentation: str,
+        kind: str,
+        labelnames: tuple[str, ...],
+        callback: Callable[[], Iterable[tuple[tuple[str, ...], float]]],
+    ) -> CallbackMetric:
+        return self._register(CallbackMetric(name, documentation, kind, labelnames, callback))
+
+    def render(self) -> str:
+        lines = []
+        for metric in self._metrics.values():
+            lines.append(f"# HELP {metric.name} {metric.documentation}")
+            lines.append(f"# TYPE {metric.name} {metric.kind}")
+            for suffix, values, value in metric.collect():
+                names = metric.labelnames + (("le",) if suffix == "_bucket" else ())
+                labels = ",".join(f'{n}="{_escape(str(v))}"' for n, v in zip(names, values))
+                series = f"{metric.name}{suffix}{{{labels}}}" if labels else f"{metric.name}{suffix}"
+                lines.append(f"{series} {float(value)!r}")
+        return "\n".join(lines) + "\n"
+
+
+registry = MetricsRegistry()
+
+http_request_duration = registry.histogram(
+    "http_request_duration_seconds",
+    "HTTP request latency by route template and status code.",
+    ("method", "route", "status"),
+)
+upstream_request_duration = registry.histogram(
+    "upstream_request_duration_seconds",
+    "Latency of requests to external APIs.",
+    ("service", "endpoint"),
+)
+upstream_request_errors = registry.counter(
+    "upstream_request_errors_total",
+    "Failed requests to external APIs, by HTTP status or exception type.",
+    ("service", "endpoint", "reason"),
+)
+cache_lookups = registry.counter(
+    "cache_lookups_total",
+    "Cache freshness checks by CacheMetadata key and result (hit, stale or miss).",
+    ("key", "result"),
+)
+cache_refreshes = registry.counter(
+    "cache_refreshes_total",
+    "Cache refreshes by CacheMetadata key and outcome.",
+    ("key", "outcome"),
+)
+cache_refresh_duration = registry.histogram(
+    "cache_refresh_duration_seconds",
+    "Time taken to refresh a cache key.",
+    ("key",),
+    buckets=(0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0, 300.0),
+)
+
+
+def record_upstream_request(
+    service: str,
+    endpoint: str,
+    started: float,
+    status_code: int | None = None,
+    error: BaseException | None = None,
+) -> None:
+    """Record one upstream request that began at ``started`` (a perf_counter value)."""
+    upstream_request_duration.labels(service, endpoint).observe(time.perf_counter() - started)
+    if error is not None:
+        upstream_request_errors.labels(service, endpoint, type(error).__name__).inc()
+    elif status_code is not None and status_code >= 400:
+        upstream_request_errors.labels(service, endpoint, str(status_code)).inc()
+
+
+@contextmanager
+def track_refresh(cache_key: str) -> Iterator[dict[str, bool]]:
+    """
+    Time a cache refresh and count its outcome.
+
+    The block sets ``outcome["ok"]``; it is recorded as a failure if it stays
+    False or the block raises.
+    """
+    outcome = {"ok": False}
+    start = time.perf_counter()
+    try:
+        yield outcome
+    finally:
+        cache_refresh_duration.labels(cache_key).observe(time.perf_counter() - start)
+        cache_refreshes.labels(cache_key, "success" if outcome["ok"] else "failure").inc()
+
+
+class MetricsMiddleware:
+    """
+    Records request latency by route template, method and status code.
+
+    A plain ASGI middleware so it adds no per-request task or body buffering.
+    Requests that match no route share a single "unmatched" label to keep the
+    number of series bounded.
+    """
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        status_code = 500
+        start = time.perf_counter()
+
+        async def send_with_status(message: Message) -> None:
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            route = scope.get("route")
+            template = getattr(route, "path", None) or "unmatched"
+            http_request_duration.labels(scope["method"], template, str(status_code)).observe(
+                time.perf_counter() - start
+            )
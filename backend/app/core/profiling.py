@@ -0,0 +1,226 @@
+import asyncio
+import json
+import logging
+import os
+import random
+import re
+import secrets
+import sys
+import threading
+import time
+import uuid
+from collections import Counter
+from pathlib import Path
+from types import FrameType
+from typing import Any
+
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+PROFILE_HEADER = "x-profile-token"
+PROFILE_ID_PATTERN = re.compile(r"^[0-9]+-[0-9a-f]{8}$")
+
+# Frames that mean a worker thread is parked waiting for work
+_IDLE_LEAVES = {
+    ("thread.py", "_worker"),
+    ("threading.py", "wait"),
+    ("queue.py", "get"),
+    ("selectors.py", "select"),
+}
+
+
+def _frame_label(frame: FrameType) -> str:
+    code = frame.f_code
+    path = Path(code.co_filename)
+    return f"{code.co_qualname} ({path.parent.name}/{path.name})"
+
+
+class StackSampler:
+    """
+    Samples the Python stacks of every busy thread at a fixed interval.
+
+    Stacks are aggregated in collapsed form ("thread;outer;...;inner" -> count),
+    ready for flamegraph.pl or speedscope. Only threads that are doing work are
+    counted, so idle executor threads do not drown out the request. The event
+    loop thread is always counted: time it spends in select() is time spent
+    waiting on I/O.
+    """
+
+    def __init__(self, interval: float, loop_thread: int | None = None):
+        self.interval = interval
+        self.loop_thread = loop_thread if loop_thread is not None else threading.get_ident()
+        self.stacks: Counter[str] = Counter()
+        self.samples = 0
+        self._stop = threading.Event()
+        self._thread: threading.Thread | None = None
+
+    def start(self) -> None:
+        self._thread = threading.Thread(target=self._run, name="profile-sampler", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+
+    def _run(self) -> None:
+        own = threading.get_ident()
+        while not self._stop.wait(self.interval):
+            names = {thread.ident: thread.name for thread in threading.enumerate()}
+            for ident, frame in sys._current_frames().items():
+                if ident != own:
+                    self._record(names.get(ident, str(ident)), ident, frame)
+            self.samples += 1
+
+    def _record(self, thread_name: str, ident: int, frame: FrameType) -> None:
+        leaf = Path(frame.f_code.co_filename).name, frame.f_code.co_name
+        if ident != self.loop_thread and leaf in _IDLE_LEAVES:
+            return
+        labels = []
+        current: FrameType | None = frame
+        while current is not None:
+            labels.append(_frame_label(current))
+            current = current.f_back
+        labels.append(thread_name)
+        self.stacks[";".join(reversed(labels))] += 1
+
+    def collapsed(self) -> str:
+        return "".join(f"{stack} {count}\n" for stack, count in self.stacks.most_common())
+
+
+class ProfileStore:
+    """
+    A bounded directory of recent profiles.
+
+    Each profile is a collapsed-stack file plus a JSON metadata file. IDs start
+    with a nanosecond timestamp, so sorting by ID is sorting by age, and the
+    oldest profiles are deleted once there are more than ``max_profiles``.
+    """
+
+    def __init__(self, directory: str | Path, max_profiles: int):
+        self.directory = Path(directory)
+        self.max_profiles = max_profiles
+
+    @staticmethod
+    def new_id() -> str:
+        return f"{time.time_ns()}-{uuid.uuid4().hex[:8]}"
+
+    def save(self, profile_id: str, collapsed: str, metadata: dict[str, Any]) -> None:
+        self.directory.mkdir(parents=True, exist_ok=True)
+        (self.directory / f"{profile_id}.collapsed").write_text(collapsed)
+        # Metadata last: a profile is listed only once it is complete
+        (self.directory / f"{profile_id}.json").write_text(json.dumps({"id": profile_id, **metadata}))
+        self._trim()
+
+    def _trim(self) -> None:
+        profile_ids = sorted(path.stem for path in self.directory.glob("*.json"))
+        for profile_id in profile_ids[: max(0, len(profile_ids) - self.max_profiles)]:
+            for suffix in (".json", ".collapsed"):
+                (self.directory / f"{profile_id}{suffix}").unlink(missing_ok=True)
+
+    def index(self) -> list[dict[str, Any]]:
+        """Metadata of stored profiles, newest first."""
+        entries = []
+        for path in sorted(self.directory.glob("*.json"), reverse=True):
+            try:
+                entries.append(json.loads(path.read_text()))
+            except (OSError, ValueError):
+                # Deleted by another worker's trim, or still being written
+                continue
+        return entries
+
+    def load(self, profile_id: str) -> str | None:
+        if not PROFILE_ID_PATTERN.match(profile_id):
+            return None
+        try:
+            return (self.directory / f"{profile_id}.collapsed").read_text()
+        except FileNotFoundError:
+            return None
+
+
+profile_store = ProfileStore(settings.PROFILING_DIR, settings.PROFILING_MAX_PROFILES)
+
+
+class ProfilingMiddleware:
+    """
+    Profiles requests that carry the trusted token header, plus a random sample.
+
+    Only one request per process is profiled at a time: the sampler sees every
+    thread, so overlapping profiles would show each other's work. Concurrent
+    requests on the same event loop still appear in a profile; the route and
+    timings in its metadata say which request it was taken for. The profile ID
+    is returned in the X-Profile-Id header.
+
+    Only installed when PROFILING_ENABLED is set, so disabled profiling adds
+    nothing to the request path.
+    """
+
+    def __init__(
+        self,
+        app: ASGIApp,
+        store: ProfileStore = profile_store,
+        sample_rate: float = settings.PROFILING_SAMPLE_RATE,
+        token: str | None = settings.PROFILING_TOKEN,
+        interval: float = settings.PROFILING_INTERVAL_MS / 1000,
+    ):
+        self.app = app
+        self.store = store
+        self.sample_rate = sample_rate
+        self.token = token
+        self.interval = interval
+        self._busy = threading.Lock()
+
+    def _requested(self, scope: Scope) -> bool:
+        if self.token:
+            for name, value in scope["headers"]:
+                if name == PROFILE_HEADER.encode():
+                    return secrets.compare_digest(value, self.token.encode())
+        return self.sample_rate > 0 and random.random() < self.sample_rate
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or not self._requested(scope):
+            await self.app(scope, receive, send)
+            return
+        if not self._busy.acquire(blocking=False):
+            await self.app(scope, receive, send)
+            return
+
+        profile_id = self.store.new_id()
+        status_code = 500
+
+        async def send_with_profile_id(message: Message) -> None:
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+                headers = [*message.get("headers", []), (b"x-profile-id", profile_id.encode())]
+                message = {**message, "headers": headers}
+            await send(message)
+
+        sampler = StackSampler(self.interval)
+        started_at = time.time()
+        start = time.perf_counter()
+        sampler.start()
+        try:
+            await self.app(scope, receive, send_with_profile_id)
+        finally:
+            sampler.stop()
+            duration = time.perf_counter() - start
+            self._busy.release()
+            route = scope.get("route")
+            metadata = {
+                "method": scope["method"],
+                "path": scope["path"],
+                "route": getattr(route, "path", None),
+                "status": status_code,
+                "duration_ms": round(duration * 1000, 1),
+                "samples": sampler.samples,
+                "started_at": started_at,
+                "pid": os.getpid(),
+            }
+            try:
+                await asyncio.to_thread(self.store.save, profile_id, sampler.collapsed(), metadata)
+            except OSError as e:
+                logger.error(f"Failed to save profile {profile_id}: {e}")
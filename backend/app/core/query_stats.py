@@ -0,0 +1,104 @@
+import re
+import time
+from collections.abc import Iterator
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass
+from typing import Any
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+SERVER_TIMING_PATTERN = re.compile(r'db;dur=(?P<duration>[\d.]+);desc="(?P<count>\d+) queries"')
+
+
+@dataclass
+class QueryStats:
+    """SQL statements executed within one ``track_queries`` block."""
+
+    count: int = 0
+    duration: float = 0.0
+
+    def server_timing(self) -> str:
+        return f'db;dur={self.duration * 1000:.1f};desc="{self.count} queries"'
+
+
+_current: ContextVar[QueryStats | None] = ContextVar("query_stats", default=None)
+
+
+@contextmanager
+def track_queries() -> Iterator[QueryStats]:
+    """
+    Count statements and database time for the current task.
+
+    Statements run in tasks or threads spawned from the block count too, as
+    long as they copy the context (asyncio tasks and anyio threads do).
+    """
+    stats = QueryStats()
+    token = _current.set(stats)
+    try:
+        yield stats
+    finally:
+        _current.reset(token)
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany) -> None:
+    if _current.get() is not None:
+        conn.info.setdefault("query_start_time", []).append(time.perf_counter())
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany) -> None:
+    stats = _current.get()
+    starts = conn.info.get("query_start_time")
+    if stats is None or not starts:
+        return
+    stats.count += 1
+    stats.duration += time.perf_counter() - starts.pop()
+
+
+def instrument_engine(engine: Engine) -> None:
+    """
+    Report statements executed on ``engine`` to the active ``track_queries`` block.
+
+    For an AsyncEngine pass its ``sync_engine``. Outside a tracked block the
+    hooks only read a context variable.
+    """
+    event.listen(engine, "before_cursor_execute", _before_cursor_execute)
+    event.listen(engine, "after_cursor_execute", _after_cursor_execute)
+
+
+def parse_server_timing(header: str) -> QueryStats | None:
+    """Read the stats written by ``QueryTimingMiddleware`` back from a header."""
+    match = SERVER_TIMING_PATTERN.search(header)
+    if match is None:
+        return None
+    return QueryStats(count=int(match["count"]), duration=float(match["duration"]) / 1000)
+
+
+class QueryTimingMiddleware:
+    """
+    Adds the request's query count and database time as a Server-Timing header.
+
+    Only statements issued before the response starts are included; that covers
+    everything a handler does, but not work in background tasks.
+    """
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        with track_queries() as stats:
+
+            async def send_with_timing(message: Message) -> None:
+                if message["type"] == "http.response.start":
+                    headers: list[Any] = list(message.get("headers", []))
+                    headers.append((b"server-timing", stats.server_timing().encode()))
+                    message = {**message, "headers": headers}
+                await send(message)
+
+            await self.app(scope, receive, send_with_timing)
@@ -1,13 +1,28 @@
+import asyncio
+import time
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta, timezone
 from typing import Any
 
 import bcrypt
 import jwt
 
+from app.core.cache import TTLCache
 from app.core.config import settings
 
 ALGORITHM = "HS256"
 
+# bcrypt releases the GIL, so these threads hash in parallel with the event
+# loop. Bursts queue here instead of occupying the shared request threadpool.
+password_executor = ThreadPoolExecutor(
+    max_workers=settings.PASSWORD_HASH_WORKERS, thread_name_prefix="password-hash"
+)
+
+# Verified token -> subject, each entry kept until the token expires
+token_cache = TTLCache(
+    maxsize=settings.TOKEN_CACHE_SIZE, ttl=settings.ACCESS_TOKEN_EXPIRE_MINUTES * 60
+)
+
 
 def create_access_token(subject: str | Any, expires_delta: timedelta | None = None) -> str:
     if expires_delta:
@@ -30,6 +45,30 @@ def verify_token(token: str) -> str | None:
         return None
 
 
+def get_token_subject(token: str) -> str | None:
+    """
+    Verify JWT token and return its subject, memoized until the token expires.
+
+    Only tokens that verify are cached, so repeated requests with the same
+    cookie skip signature checks and invalid tokens are never remembered.
+    """
+    subject = token_cache.get(token)
+    if subject is not None:
+        return subject
+
+    try:
+        payload = jwt.decode(token, settings.SECRET_KEY, algorithms=[ALGORITHM])
+    except jwt.InvalidTokenError:
+        return None
+
+    subject = payload.get("sub")
+    if not isinstance(subject, str):
+        return None
+    if "exp" in payload:
+        token_cache.set(token, subject, ttl=payload["exp"] - time.time())
+    return subject
+
+
 def verify_password(plain_password: str, hashed_password: str) -> bool:
     """Verify a password against its hash."""
     password_bytes = plain_password.encode("utf-8")
@@ -37,9 +76,32 @@ def verify_password(plain_password: str, hashed_password: str) -> bool:
     return bcrypt.checkpw(password_bytes, hashed_bytes)
 
 
-def get_password_hash(password: str) -> str:
-    """Hash a password using bcrypt."""
+def get_password_hash(password: str, rounds: int | None = None) -> str:
+    """Hash a password using bcrypt with PASSWORD_HASH_ROUNDS unless ``rounds`` is given."""
     password_bytes = password.encode("utf-8")
-    salt = bcrypt.gensalt()
+    salt = bcrypt.gensalt(rounds=rounds or settings.PASSWORD_HASH_ROUNDS)
     hashed = bcrypt.hashpw(password_bytes, salt)
     return hashed.decode("utf-8")
+
+
+def password_needs_rehash(hashed_password: str) -> bool:
+    """Check whether a bcrypt hash uses a lower cost than PASSWORD_HASH_ROUNDS."""
+    try:
+        rounds = int(hashed_password.split("$")[2])
+    except (IndexError, ValueError):
+        return True
+    return rounds < settings.PASSWORD_HASH_ROUNDS
+
+
+async def hash_password(password: str) -> str:
+    """Hash a password on the dedicated password executor."""
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(password_executor, get_password_hash, password)
+
+
+async def check_password(plain_password: str, hashed_password: str) -> bool:
+    """Verify a password on the dedicated password executor."""
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(
+        password_executor, verify_password, plain_password, hashed_password
+    )
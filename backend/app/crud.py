@@ -1,34 +1,95 @@
-from sqlmodel import Session, select
+import logging
+from typing import Any
 
-from app.core.security import get_password_hash, verify_password
+from sqlalchemy.orm import make_transient_to_detached
+from sqlmodel import func, select
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from app.core.cache import TTLCache
+from app.core.config import settings
+from app.core.security import check_password, hash_password, password_needs_rehash
 from app.models import User, UserCreate
 
+logger = logging.getLogger(__name__)
+
+# Detached copies of recently authenticated users, keyed by user id
+user_cache = TTLCache(maxsize=settings.USER_CACHE_SIZE, ttl=settings.USER_CACHE_TTL_SECONDS)
+# Postgres NOTIFY channel carrying the ids of changed users to every worker
+USER_INVALIDATION_CHANNEL = "user_cache_invalidate"
 
-def create_user(*, session: Session, user_create: UserCreate) -> User:
+
+async def create_user(*, session: AsyncSession, user_create: UserCreate) -> User:
+    hashed_password = await hash_password(user_create.password)
     db_obj = User.model_validate(
-        user_create, update={"hashed_password": get_password_hash(user_create.password)}
+        user_create, update={"hashed_password": hashed_password}
     )
     session.add(db_obj)
-    session.commit()
-    session.refresh(db_obj)
+    await session.commit()
+    await session.refresh(db_obj)
     return db_obj
 
 
-def get_user_by_email(*, session: Session, email: str) -> User | None:
+async def get_user_by_email(*, session: AsyncSession, email: str) -> User | None:
     statement = select(User).where(User.email == email)
-    session_user = session.exec(statement).first()
+    session_user = (await session.exec(statement)).first()
     return session_user
 
 
-def get_user_by_id(*, session: Session, user_id: str) -> User | None:
+async def get_user_by_id(*, session: AsyncSession, user_id: str) -> User | None:
     statement = select(User).where(User.id == user_id)
-    return session.exec(statement).first()
+    return (await session.exec(statement)).first()
+
+
+async def get_user_by_id_cached(*, session: AsyncSession, user_id: str) -> User | None:
+    """
+    Get a user by id through the per-worker user cache.
+
+    A cache hit is merged into ``session`` without a query, so the caller gets
+    its own persistent instance that can be modified and committed as usual.
+    """
+    cached = user_cache.get(user_id)
+    if cached is not None:
+        return await session.merge(cached, load=False)
+
+    user = await session.get(User, user_id)
+    if user is not None:
+        copy = User.model_validate(user.model_dump())
+        make_transient_to_detached(copy)
+        user_cache.set(user_id, copy)
+    return user
+
+
+def invalidate_user(user_id: Any) -> None:
+    user_cache.pop(str(user_id))
+
+
+async def update_user(*, session: AsyncSession, db_user: User, user_in: dict[str, Any]) -> User:
+    """
+    Update and commit a user, dropping it from every worker's user cache.
+
+    The notification is part of the same transaction, so other workers only
+    hear about the change once it is committed.
+    """
+    db_user.sqlmodel_update(user_in)
+    session.add(db_user)
+    await session.exec(select(func.pg_notify(USER_INVALIDATION_CHANNEL, str(db_user.id))))
+    await session.commit()
+    invalidate_user(db_user.id)
+    return db_user
 
 
-def authenticate(*, session: Session, email: str, password: str) -> User | None:
-    db_user = get_user_by_email(session=session, email=email)
+async def authenticate(*, session: AsyncSession, email: str, password: str) -> User | None:
+    db_user = await get_user_by_email(session=session, email=email)
     if not db_user:
         return None
-    if not verify_password(password, db_user.hashed_password):
+    if not await check_password(password, db_user.hashed_password):
         return None
+    if password_needs_rehash(db_user.hashed_password):
+        # Upgrade to the current cost factor while the plaintext is available
+        await update_user(
+            session=session,
+            db_user=db_user,
+            user_in={"hashed_password": await hash_password(password)},
+        )
+        logger.info(f"Rehashed password for user {db_user.id}")
     return db_user
@@ -1,12 +1,83 @@
+import asyncio
+import logging
+from collections.abc import AsyncIterator, Iterable
+from contextlib import asynccontextmanager
+
+import httpx
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import PlainTextResponse
 
+from app.api.compression import CompressionMiddleware
 from app.api.main import api_router
 from app.core.config import settings
+from app.core.db import async_engine, warm_pools
+from app.core.metrics import MetricsMiddleware, registry
+from app.core.profiling import ProfilingMiddleware
+from app.core.query_stats import QueryTimingMiddleware
+from app.services.podcast_cache import refresh_scheduler
+from app.services.typeahead import typeahead_index
+from app.services.upstream import UpstreamClients
+from app.services.user_invalidation import user_cache_invalidator
+
+logger = logging.getLogger(__name__)
+
+# Requests the frontend makes on its landing page
+WARMUP_PATHS = (f"{settings.API_V1_STR}/podcasts/popular?limit=6",)
+
+
+async def warm_up(app: FastAPI, paths: Iterable[str] = WARMUP_PATHS) -> None:
+    """
+    Fill the connection pools and serve each of ``paths`` once in-process.
+
+    The requests go through the whole middleware stack, so the cache
+    generation, query, serializer and compressed body are all in place before
+    the first real request arrives.
+    """
+    await warm_pools()
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://warmup") as client:
+        for path in paths:
+            response = await client.get(path, headers={"Accept-Encoding": "gzip, br"})
+            logger.info(f"Warm-up GET {path}: {response.status_code}")
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI) -> AsyncIterator[None]:
+    """
+    Own the async engine and the upstream HTTP clients for the app's lifetime.
+
+    Warms the app before taking traffic, and runs the background cache refresh
+    and the user cache invalidation listener.
+    """
+    app.state.upstream_clients = UpstreamClients.create()
+    if settings.WARMUP_ENABLED:
+        try:
+            await asyncio.wait_for(warm_up(app), timeout=settings.WARMUP_TIMEOUT_SECONDS)
+        except Exception as e:
+            # A cold start is slower, not broken
+            logger.warning(f"Warm-up failed: {e!r}")
+    try:
+        await typeahead_index.load()
+    except Exception as e:
+        # Suggestions stay empty until a request triggers a background reload
+        logger.error(f"Failed to load typeahead index: {e}")
+    await user_cache_invalidator.start()
+    if settings.CACHE_REFRESH_ENABLED:
+        await refresh_scheduler.start(app.state.upstream_clients)
+    try:
+        yield
+    finally:
+        await refresh_scheduler.stop()
+        await user_cache_invalidator.stop()
+        await app.state.upstream_clients.aclose()
+        await async_engine.dispose()
+
 
 app = FastAPI(
     title=settings.PROJECT_NAME,
     openapi_url=f"{settings.API_V1_STR}/openapi.json",
+    lifespan=lifespan,
 )
 
 # Configure CORS for SvelteKit frontend
@@ -18,6 +89,19 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+if settings.COMPRESSION_ENABLED:
+    app.add_middleware(CompressionMiddleware)
+
+# Query counts and DB time per request, for spotting N+1 queries in development
+if settings.ENVIRONMENT != "production":
+    app.add_middleware(QueryTimingMiddleware)
+
+if settings.PROFILING_ENABLED:
+    app.add_middleware(ProfilingMiddleware)
+
+if settings.METRICS_ENABLED:
+    app.add_middleware(MetricsMiddleware)
+
 app.include_router(api_router, prefix=settings.API_V1_STR)
 
 
@@ -25,3 +109,11 @@ app.include_router(api_router, prefix=settings.API_V1_STR)
 def health_check():
     """Health check endpoint."""
     return {"status": "healthy"}
+
+
+if settings.METRICS_ENABLED:
+
+    @app.get("/metrics", include_in_schema=False)
+    async def metrics() -> PlainTextResponse:
+        """Prometheus scrape endpoint."""
+        return PlainTextResponse(registry.render(), media_type="text/plain; version=0.0.4")
@@ -2,6 +2,8 @@ import uuid
 from datetime import datetime
 
 from pydantic import EmailStr
+from sqlalchemy import Column, Computed, Index, Integer, func, literal_column
+from sqlalchemy.dialects.postgresql import ARRAY, TSVECTOR
 from sqlmodel import Field, SQLModel
 
 
@@ -52,10 +54,15 @@ class TokenPayload(SQLModel):
 
 
 # Podcast models
+DESCRIPTION_EXCERPT_LENGTH = 200
+
+
 class PodcastBase(SQLModel):
     title: str = Field(max_length=500)
     author: str | None = Field(default=None, max_length=255)
     description: str | None = Field(default=None)
+    # Plain-text start of the description for list views, set at ingestion
+    description_excerpt: str | None = Field(default=None, max_length=DESCRIPTION_EXCERPT_LENGTH)
     cover_url: str | None = Field(default=None, max_length=2000)
     feed_url: str | None = Field(default=None, unique=True, index=True, max_length=2000)
     is_featured: bool = Field(default=False, index=True)
@@ -74,20 +81,106 @@ class PodcastBase(SQLModel):
 
 
 class Podcast(PodcastBase, table=True):
+    __table_args__ = (Index("ix_podcast_genres", "genres", postgresql_using="gin"),)
+    __mapper_args__ = {"exclude_properties": ["search_vector"]}
+
     id: uuid.UUID = Field(default_factory=uuid.uuid4, primary_key=True)
+    # genre_ids as an integer array, GIN-indexed for genre filtering
+    genres: list[int] = Field(
+        default_factory=list,
+        sa_column=Column(ARRAY(Integer), nullable=False, server_default="{}"),
+    )
+
+
+# Weighted full-text search document (title > publisher > description),
+# generated by Postgres. It is left unmapped so loading podcasts never reads it.
+PODCAST_SEARCH_CONFIG = "english"
+podcast_search_vector = Column(
+    "search_vector",
+    TSVECTOR,
+    Computed(
+        f"setweight(to_tsvector('{PODCAST_SEARCH_CONFIG}', coalesce(title, '')), 'A') || "
+        f"setweight(to_tsvector('{PODCAST_SEARCH_CONFIG}', coalesce(publisher, '')), 'B') || "
+        f"setweight(to_tsvector('{PODCAST_SEARCH_CONFIG}', coalesce(description, '')), 'C')",
+        persisted=True,
+    ),
+)
+Podcast.__table__.append_column(podcast_search_vector)
+Index("ix_podcast_search_vector", podcast_search_vector, postgresql_using="gin")
+
+# Sort key for popularity listings. Unscored podcasts (listen_score is hidden
+# on the free API tier) sort last instead of first. The default is rendered
+# inline so queries match the expression index below.
+PODCAST_POPULARITY = func.coalesce(Podcast.listen_score, literal_column("-1"))
+
+# Serves popularity ordering and keyset pagination as a plain index range scan
+Index(
+    "ix_podcast_featured_popularity",
+    Podcast.is_featured,
+    PODCAST_POPULARITY.desc(),
+    Podcast.id.desc(),
+)
+# The same, across the whole catalog
+Index("ix_podcast_popularity", PODCAST_POPULARITY.desc(), Podcast.id.desc())
 
 
 class PodcastPublic(PodcastBase):
     id: uuid.UUID
 
 
+# PodcastPublic fields, in order; list queries select these columns directly
+PODCAST_PUBLIC_FIELDS = tuple(PodcastPublic.model_fields)
+
+
+# Compact representation for list views (fields=card)
+class PodcastCard(SQLModel):
+    id: uuid.UUID
+    title: str
+    publisher: str | None = None
+    listen_score: int | None = None
+    cover_url: str | None = None
+    cover_url_md: str | None = None
+    description_excerpt: str | None = None
+
+
+PODCAST_CARD_FIELDS = tuple(PodcastCard.model_fields)
+
+
 class PodcastList(SQLModel):
     podcasts: list[PodcastPublic]
     count: int
 
 
+class PodcastPage(SQLModel):
+    podcasts: list[PodcastPublic]
+    next_cursor: str | None = None
+
+
+class PodcastSuggestion(SQLModel):
+    id: uuid.UUID
+    title: str
+    publisher: str | None = None
+    cover_url_sm: str | None = None
+    listen_score: int | None = None
+
+
+class PodcastSuggestions(SQLModel):
+    suggestions: list[PodcastSuggestion]
+
+
 # Cache metadata for tracking API data freshness
 class CacheMetadata(SQLModel, table=True):
     id: uuid.UUID = Field(default_factory=uuid.uuid4, primary_key=True)
     cache_key: str = Field(unique=True, index=True, max_length=255)
     last_fetched_at: datetime = Field(default_factory=datetime.utcnow)
+
+
+# Cached iTunes artwork lookups, keyed by iTunes ID or normalized title.
+# Entries with no cover URLs record a "not found" result.
+class ArtworkCache(SQLModel, table=True):
+    id: uuid.UUID = Field(default_factory=uuid.uuid4, primary_key=True)
+    cache_key: str = Field(unique=True, index=True, max_length=1000)
+    cover_url_sm: str | None = Field(default=None, max_length=2000)
+    cover_url_md: str | None = Field(default=None, max_length=2000)
+    cover_url_lg: str | None = Field(default=None, max_length=2000)
+    expires_at: datetime = Field(index=True)
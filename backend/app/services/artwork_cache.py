@@ -0,0 +1,102 @@
+import uuid
+from collections.abc import Iterable
+from datetime import datetime, timedelta
+
+from sqlalchemy.dialects.postgresql import insert
+from sqlmodel import col, select
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from app.core.config import settings
+from app.core.db import async_engine
+from app.models import ArtworkCache
+
+
+def itunes_id_key(itunes_id: str) -> str:
+    return f"itunes:{itunes_id}"
+
+
+def title_key(title: str) -> str:
+    return f"title:{normalize_title(title)}"
+
+
+def normalize_title(title: str) -> str:
+    """Normalize a podcast title for cache lookups (case and whitespace insensitive)."""
+    return " ".join(title.casefold().split())
+
+
+class ArtworkCacheStore:
+    """
+    Database-backed cache of iTunes artwork lookups.
+
+    Maps cache keys to artwork URL dicts ('sm', 'md', 'lg'). A cached value of
+    None is a negative entry: the podcast was looked up and nothing was found.
+    Negative entries expire sooner so new iTunes listings are picked up.
+    Each call uses its own short-lived session, so one store can be shared by
+    concurrent ingestion tasks.
+    """
+
+    def __init__(
+        self,
+        ttl: timedelta = timedelta(days=settings.ARTWORK_CACHE_TTL_DAYS),
+        negative_ttl: timedelta = timedelta(hours=settings.ARTWORK_CACHE_NEGATIVE_TTL_HOURS),
+    ):
+        self.ttl = ttl
+        self.negative_ttl = negative_ttl
+
+    async def get_many(self, keys: Iterable[str]) -> dict[str, dict[str, str] | None]:
+        """Return unexpired entries for the given keys. Missing keys are omitted."""
+        keys = list(set(keys))
+        if not keys:
+            return {}
+
+        async with AsyncSession(async_engine) as session:
+            entries = (
+                await session.exec(
+                    select(ArtworkCache).where(
+                        col(ArtworkCache.cache_key).in_(keys),
+                        ArtworkCache.expires_at > datetime.utcnow(),
+                    )
+                )
+            ).all()
+
+        return {
+            entry.cache_key: (
+                {"sm": entry.cover_url_sm, "md": entry.cover_url_md, "lg": entry.cover_url_lg}
+                if entry.cover_url_sm
+                else None
+            )
+            for entry in entries
+        }
+
+    async def put_many(self, entries: dict[str, dict[str, str] | None]) -> None:
+        """Insert or replace cache entries in a single statement."""
+        if not entries:
+            return
+
+        now = datetime.utcnow()
+        # Concurrent refresh pages share cache keys; locking rows in cache_key
+        # order keeps their upserts from deadlocking on each other.
+        rows = [
+            {
+                "id": uuid.uuid4(),
+                "cache_key": key,
+                "cover_url_sm": artwork["sm"] if artwork else None,
+                "cover_url_md": artwork["md"] if artwork else None,
+                "cover_url_lg": artwork["lg"] if artwork else None,
+                "expires_at": now + (self.ttl if artwork else self.negative_ttl),
+            }
+            for key, artwork in sorted(entries.items())
+        ]
+        statement = insert(ArtworkCache).values(rows)
+        statement = statement.on_conflict_do_update(
+            index_elements=[ArtworkCache.cache_key],
+            set_={
+                "cover_url_sm": statement.excluded.cover_url_sm,
+                "cover_url_md": statement.excluded.cover_url_md,
+                "cover_url_lg": statement.excluded.cover_url_lg,
+                "expires_at": statement.excluded.expires_at,
+            },
+        )
+        async with AsyncSession(async_engine) as session:
+            await session.exec(statement)
+            await session.commit()
@@ -1,21 +1,63 @@
+import asyncio
 import logging
+import time
+from collections.abc import Iterable
+from typing import Any
 
 import httpx
 
+from app.core.config import settings
+from app.core.metrics import record_upstream_request
+from app.core.ratelimit import TokenBucket
+from app.services.artwork_cache import ArtworkCacheStore, itunes_id_key, title_key
+
 logger = logging.getLogger(__name__)
 
-ITUNES_LOOKUP_URL = "https://itunes.apple.com/lookup"
-ITUNES_SEARCH_URL = "https://itunes.apple.com/search"
+ITUNES_LOOKUP_URL = f"{settings.ITUNES_BASE_URL}/lookup"
+ITUNES_SEARCH_URL = f"{settings.ITUNES_BASE_URL}/search"
+ITUNES_LOOKUP_BATCH_SIZE = 50
+
+
+class ITunesRequestError(Exception):
+    """An iTunes request failed, as opposed to returning no results."""
+
+
+def create_client(http2: bool = False) -> httpx.AsyncClient:
+    """A pooled keep-alive client with a connection per concurrent lookup."""
+    return httpx.AsyncClient(
+        timeout=10.0,
+        limits=httpx.Limits(
+            max_connections=settings.ITUNES_MAX_CONCURRENCY,
+            max_keepalive_connections=settings.ITUNES_MAX_CONCURRENCY,
+        ),
+        http2=http2,
+    )
 
 
 class ITunesArtworkService:
-    """Service for fetching high-resolution podcast artwork from iTunes."""
+    """
+    Service for fetching high-resolution podcast artwork from iTunes.
+
+    Pass the application's long-lived ``client`` to reuse its connections;
+    without one the service opens its own and closes it in ``close``.
+    """
 
-    def __init__(self):
-        self.client = httpx.AsyncClient(timeout=10.0)
+    def __init__(
+        self,
+        requests_per_second: float = settings.ITUNES_REQUESTS_PER_SECOND,
+        max_concurrency: int = settings.ITUNES_MAX_CONCURRENCY,
+        cache: ArtworkCacheStore | None = None,
+        client: httpx.AsyncClient | None = None,
+    ):
+        self._owns_client = client is None
+        self.client = client or create_client()
+        self.cache = cache
+        self.rate_limiter = TokenBucket(rate=requests_per_second)
+        self._concurrency = asyncio.Semaphore(max_concurrency)
 
     async def close(self):
-        await self.client.aclose()
+        if self._owns_client:
+            await self.client.aclose()
 
     def _build_artwork_urls(self, artwork_url_100: str) -> dict[str, str] | None:
         """
@@ -38,12 +80,22 @@ class ITunesArtworkService:
             "lg": artwork_url_100.replace(f"100x100bb.{ext}", f"100000x100000-999.{ext}"),
         }
 
+    async def _get(self, url: str, endpoint: str, params: dict[str, Any]) -> httpx.Response:
+        """GET an iTunes endpoint, recording its latency and failures."""
+        started = time.perf_counter()
+        try:
+            response = await self.client.get(url, params=params)
+        except httpx.HTTPError as e:
+            record_upstream_request("itunes", endpoint, started, error=e)
+            raise
+        record_upstream_request("itunes", endpoint, started, status_code=response.status_code)
+        return response
+
     async def lookup_by_id(self, itunes_id: str) -> dict[str, str] | None:
         """Look up podcast artwork by iTunes ID."""
         try:
-            response = await self.client.get(
-                ITUNES_LOOKUP_URL, params={"id": itunes_id}
-            )
+            await self.rate_limiter.acquire()
+            response = await self._get(ITUNES_LOOKUP_URL, "/lookup", {"id": itunes_id})
             if response.status_code != 200:
                 logger.warning(f"iTunes lookup failed with status {response.status_code}")
                 return None
@@ -63,48 +115,165 @@ class ITunesArtworkService:
             logger.error(f"iTunes lookup error for id={itunes_id}: {e}")
             return None
 
-    async def search_podcast(self, name: str, country: str = "us") -> dict[str, str] | None:
-        """Search for podcast artwork by name."""
-        try:
-            response = await self.client.get(
-                ITUNES_SEARCH_URL,
-                params={
-                    "term": name,
-                    "entity": "podcast",
-                    "country": country,
-                    "limit": 5,
-                },
-            )
-            if response.status_code != 200:
-                logger.warning(f"iTunes search failed with status {response.status_code}")
-                return None
+    async def lookup_many(
+        self, itunes_ids: Iterable[str]
+    ) -> dict[str, dict[str, str] | None]:
+        """
+        Look up artwork for many iTunes IDs with batched lookup requests.
 
-            data = response.json()
-            results = data.get("results", [])
-            if not results:
-                return None
+        IDs are sent comma-separated, ITUNES_LOOKUP_BATCH_SIZE per request, and
+        results are mapped back by collectionId. IDs that iTunes has no artwork
+        for map to None; IDs whose batch request failed are omitted.
+        """
+        unique_ids = list(dict.fromkeys(itunes_ids))
+        batches = [
+            unique_ids[i : i + ITUNES_LOOKUP_BATCH_SIZE]
+            for i in range(0, len(unique_ids), ITUNES_LOOKUP_BATCH_SIZE)
+        ]
 
-            artwork_url = results[0].get("artworkUrl100")
-            if not artwork_url:
-                return None
+        async def lookup_batch(batch: list[str]) -> dict[str, dict[str, str] | None]:
+            async with self._concurrency:
+                try:
+                    return await self._lookup_batch(batch)
+                except Exception as e:
+                    logger.error(f"iTunes batch lookup error for {len(batch)} ids: {e}")
+                    return {}
 
-            return self._build_artwork_urls(artwork_url)
+        results: dict[str, dict[str, str] | None] = {}
+        for found in await asyncio.gather(*(lookup_batch(batch) for batch in batches)):
+            results.update(found)
+        return results
+
+    async def _lookup_batch(self, itunes_ids: list[str]) -> dict[str, dict[str, str] | None]:
+        """Look up a single batch of iTunes IDs in one request."""
+        await self.rate_limiter.acquire()
+        response = await self._get(ITUNES_LOOKUP_URL, "/lookup", {"id": ",".join(itunes_ids)})
+        if response.status_code != 200:
+            raise ITunesRequestError(f"iTunes batch lookup failed with status {response.status_code}")
+
+        results: dict[str, dict[str, str] | None] = dict.fromkeys(itunes_ids)
+        for result in response.json().get("results", []):
+            collection_id = result.get("collectionId")
+            artwork_url = result.get("artworkUrl100")
+            if collection_id is None or not artwork_url:
+                continue
 
+            artwork = self._build_artwork_urls(artwork_url)
+            if artwork:
+                results[str(collection_id)] = artwork
+
+        return results
+
+    async def search_podcast(self, name: str, country: str = "us") -> dict[str, str] | None:
+        """Search for podcast artwork by name."""
+        try:
+            return await self._search(name, country)
         except Exception as e:
             logger.error(f"iTunes search error for name={name}: {e}")
             return None
 
+    async def _search(self, name: str, country: str = "us") -> dict[str, str] | None:
+        """Search by name, raising on request failure rather than returning None."""
+        await self.rate_limiter.acquire()
+        response = await self._get(
+            ITUNES_SEARCH_URL,
+            "/search",
+            {
+                "term": name,
+                "entity": "podcast",
+                "country": country,
+                "limit": 5,
+            },
+        )
+        if response.status_code != 200:
+            raise ITunesRequestError(f"iTunes search failed with status {response.status_code}")
+
+        data = response.json()
+        results = data.get("results", [])
+        if not results:
+            return None
+
+        artwork_url = results[0].get("artworkUrl100")
+        if not artwork_url:
+            return None
+
+        return self._build_artwork_urls(artwork_url)
+
     async def get_artwork_urls(
         self, itunes_id: str | None, title: str
     ) -> dict[str, str] | None:
         """
         Get artwork URLs, trying lookup by ID first, then search by name.
 
+        When an artwork cache is configured it is consulted first.
         Returns dict with 'sm', 'md', 'lg' keys, or None if all methods fail.
         """
+        if self.cache is not None:
+            return (await self.get_artwork_urls_many([(itunes_id, title)]))[0]
+
         if itunes_id:
             result = await self.lookup_by_id(itunes_id)
             if result:
                 return result
 
         return await self.search_podcast(title)
+
+    async def get_artwork_urls_many(
+        self, podcasts: Iterable[tuple[str | None, str]]
+    ) -> list[dict[str, str] | None]:
+        """
+        Get artwork URLs for many podcasts.
+
+        Takes (itunes_id, title) pairs and returns results in the same order.
+        Cached results are used first. Remaining iTunes IDs are resolved with
+        batched lookups; only podcasts still missing artwork fall back to a
+        search by title. Searches run with bounded concurrency and every
+        upstream request is paced by the shared rate limiter. Successful
+        lookups, including "not found" answers, are written back to the cache.
+        """
+        podcasts = list(podcasts)
+        cached: dict[str, dict[str, str] | None] = {}
+        if self.cache is not None:
+            cached = await self.cache.get_many(
+                [itunes_id_key(i) for i, _ in podcasts if i] + [title_key(t) for _, t in podcasts]
+            )
+        resolved: dict[str, dict[str, str] | None] = {}
+
+        found = await self.lookup_many(
+            itunes_id
+            for itunes_id, _ in podcasts
+            if itunes_id and itunes_id_key(itunes_id) not in cached
+        )
+        resolved.update((itunes_id_key(i), artwork) for i, artwork in found.items())
+
+        def from_cache(key: str) -> dict[str, str] | None:
+            return cached[key] if key in cached else resolved.get(key)
+
+        results = [
+            from_cache(itunes_id_key(itunes_id)) if itunes_id else None
+            for itunes_id, _ in podcasts
+        ]
+
+        pending_titles = {
+            title_key(title): title
+            for index, (_, title) in enumerate(podcasts)
+            if results[index] is None and title_key(title) not in cached
+        }
+
+        async def search(key: str, title: str) -> None:
+            async with self._concurrency:
+                try:
+                    resolved[key] = await self._search(title)
+                except Exception as e:
+                    logger.error(f"iTunes search error for name={title}: {e}")
+
+        await asyncio.gather(*(search(key, title) for key, title in pending_titles.items()))
+
+        for index, (_, title) in enumerate(podcasts):
+            if results[index] is None:
+                results[index] = from_cache(title_key(title))
+
+        if self.cache is not None and resolved:
+            await self.cache.put_many(resolved)
+
+        return results
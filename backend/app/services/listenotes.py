@@ -1,10 +1,30 @@
 import logging
+import time
 from dataclasses import dataclass
+from typing import Any
 
-from listennotes import podcast_api
+import httpx
+from tenacity import (
+    AsyncRetrying,
+    retry_if_exception_type,
+    stop_after_attempt,
+    wait_random_exponential,
+)
+
+from app.core.circuit import CircuitBreaker, CircuitOpenError
+from app.core.config import settings
+from app.core.metrics import record_upstream_request
 
 logger = logging.getLogger(__name__)
 
+LISTENNOTES_API_URL = "https://listen-api.listennotes.com/api/v2"
+LISTENNOTES_TEST_API_URL = "https://listen-api-test.listennotes.com/api/v2"
+RETRYABLE_STATUS_CODES = {429, 500, 502, 503, 504}
+
+
+class ListenNotesRequestError(Exception):
+    """A Listen Notes request failed with a transient error worth retrying."""
+
 
 @dataclass
 class PodcastData:
@@ -23,14 +43,61 @@ class PodcastData:
     itunes_id: str | None
 
 
+# Shared by every service instance so an outage seen by one refresh is
+# respected by the next one instead of being rediscovered through timeouts.
+listennotes_breaker = CircuitBreaker(
+    failure_threshold=settings.LISTENOTES_BREAKER_FAILURE_THRESHOLD,
+    reset_timeout=settings.LISTENOTES_BREAKER_RESET_SECONDS,
+)
+
+
+def create_client(http2: bool = False) -> httpx.AsyncClient:
+    """A pooled keep-alive client sized to the Listen Notes connection limit."""
+    return httpx.AsyncClient(
+        timeout=settings.LISTENOTES_TIMEOUT_SECONDS,
+        limits=httpx.Limits(
+            max_connections=settings.LISTENOTES_MAX_CONNECTIONS,
+            max_keepalive_connections=settings.LISTENOTES_MAX_CONNECTIONS,
+        ),
+        http2=http2,
+    )
+
+
 class ListenNotesService:
-    """Service for interacting with the Listen Notes Podcast API."""
+    """
+    Async client for the Listen Notes Podcast API.
 
-    def __init__(self, api_key: str | None):
-        # None = connects to mock server for testing
-        self.client = podcast_api.Client(api_key=api_key)
+    Requests share one pooled keep-alive ``httpx.AsyncClient``; pass the
+    application's long-lived client to reuse its connections. Connection
+    errors, timeouts, 429s and 5xx responses are retried with jittered
+    exponential backoff, and every attempt is reported to a circuit breaker
+    that fails calls fast while Listen Notes is down.
+    """
 
-    def fetch_best_podcasts(
+    def __init__(
+        self,
+        api_key: str | None,
+        client: httpx.AsyncClient | None = None,
+        breaker: CircuitBreaker = listennotes_breaker,
+        retry_attempts: int = settings.LISTENOTES_RETRY_ATTEMPTS,
+        retry_max_wait: float = settings.LISTENOTES_RETRY_MAX_WAIT_SECONDS,
+    ):
+        # No API key = connects to mock server for testing
+        self.base_url = settings.LISTENOTES_BASE_URL or (
+            LISTENNOTES_API_URL if api_key else LISTENNOTES_TEST_API_URL
+        )
+        self.headers = {"X-ListenAPI-Key": api_key} if api_key else {}
+        self._owns_client = client is None
+        self.client = client or create_client()
+        self.breaker = breaker
+        self.retry_attempts = retry_attempts
+        self.retry_max_wait = retry_max_wait
+
+    async def close(self):
+        if self._owns_client:
+            await self.client.aclose()
+
+    async def fetch_best_podcasts(
         self,
         genre_id: int = 0,
         page: int = 1,
@@ -47,50 +114,89 @@ class ListenNotesService:
         """
         try:
             logger.info(f"Fetching best podcasts from Listen Notes (genre_id={genre_id}, page={page})")
-            response = self.client.fetch_best_podcasts(genre_id=genre_id, page=page)
-            data = response.json()
-
-            podcasts = []
-            for podcast in data.get("podcasts", []):
-                genre_ids = podcast.get("genre_ids", [])
-                genre_ids_str = ",".join(str(g) for g in genre_ids) if genre_ids else None
-
-                # Handle fields that may be upgrade messages on free tier
-                listen_score = podcast.get("listen_score")
-                if not isinstance(listen_score, int):
-                    listen_score = None
-
-                total_episodes = podcast.get("total_episodes")
-                if not isinstance(total_episodes, int):
-                    total_episodes = None
-
-                feed_url = podcast.get("rss")
-                if feed_url and not feed_url.startswith(("http://", "https://")):
-                    feed_url = None
-
-                itunes_id = podcast.get("itunes_id")
-                if itunes_id is not None:
-                    itunes_id = str(itunes_id)
-
-                podcasts.append(
-                    PodcastData(
-                        listenotes_id=podcast.get("id"),
-                        title=podcast.get("title", "Unknown"),
-                        publisher=podcast.get("publisher"),
-                        description=podcast.get("description"),
-                        cover_url=podcast.get("image"),
-                        feed_url=feed_url,
-                        total_episodes=total_episodes,
-                        listen_score=listen_score,
-                        genre_ids=genre_ids_str,
-                        listenotes_url=podcast.get("listennotes_url"),
-                        itunes_id=itunes_id,
-                    )
-                )
-
+            data = await self._get("/best_podcasts", {"genre_id": genre_id, "page": page})
+            podcasts = [self._parse_podcast(podcast) for podcast in data.get("podcasts", [])]
             logger.info(f"Fetched {len(podcasts)} podcasts from Listen Notes")
             return podcasts
 
+        except CircuitOpenError:
+            logger.warning("Listen Notes circuit is open, skipping request")
+            return None
         except Exception as e:
             logger.error(f"Listen Notes API error: {e}")
             return None
+
+    async def _get(self, path: str, params: dict[str, Any]) -> dict[str, Any]:
+        """GET a Listen Notes endpoint, retrying transient failures."""
+        async for attempt in AsyncRetrying(
+            stop=stop_after_attempt(self.retry_attempts),
+            wait=wait_random_exponential(multiplier=0.5, max=self.retry_max_wait),
+            retry=retry_if_exception_type((httpx.TransportError, ListenNotesRequestError)),
+            reraise=True,
+        ):
+            with attempt:
+                data = await self._request(path, params)
+        return data
+
+    async def _request(self, path: str, params: dict[str, Any]) -> dict[str, Any]:
+        """Make a single request, reporting the outcome to the circuit breaker."""
+        self.breaker.before_call()
+        started = time.perf_counter()
+        try:
+            response = await self.client.get(
+                f"{self.base_url}{path}", params=params, headers=self.headers
+            )
+        except BaseException as e:
+            # Whatever ends the call without a response counts as a failure,
+            # including decoding errors and cancellation, so a half-open trial
+            # is always released
+            record_upstream_request("listennotes", path, started, error=e)
+            self.breaker.record_failure()
+            raise
+        record_upstream_request("listennotes", path, started, status_code=response.status_code)
+
+        if response.status_code in RETRYABLE_STATUS_CODES:
+            self.breaker.record_failure()
+            raise ListenNotesRequestError(
+                f"Listen Notes request failed with status {response.status_code}"
+            )
+
+        # Other client errors mean the request is wrong, not that the API is down
+        self.breaker.record_success()
+        response.raise_for_status()
+        return response.json()
+
+    def _parse_podcast(self, podcast: dict[str, Any]) -> PodcastData:
+        genre_ids = podcast.get("genre_ids", [])
+        genre_ids_str = ",".join(str(g) for g in genre_ids) if genre_ids else None
+
+        # Handle fields that may be upgrade messages on free tier
+        listen_score = podcast.get("listen_score")
+        if not isinstance(listen_score, int):
+            listen_score = None
+
+        total_episodes = podcast.get("total_episodes")
+        if not isinstance(total_episodes, int):
+            total_episodes = None
+
+        feed_url = podcast.get("rss")
+        if feed_url and not feed_url.startswith(("http://", "https://")):
+            feed_url = None
+
+        itunes_id = podcast.get("itunes_id")
+        if itunes_id is not None:
+            itunes_id = str(itunes_id)
+
+        return PodcastData(
+            listenotes_id=podcast.get("id"),
+            title=podcast.get("title", "Unknown"),
+            publisher=podcast.get("publisher"),
+            description=podcast.get("description"),
+            cover_url=podcast.get("image"),
+            feed_url=feed_url,
+            total_episodes=total_episodes,
+            listen_score=listen_score,
+            genre_ids=genre_ids_str,
+            listenotes_url=podcast.get("listennotes_url"),
+            itunes_id=itunes_id,
+        )
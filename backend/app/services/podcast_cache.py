@@ -0,0 +1,549 @@
+import asyncio
+import html
+import logging
+import re
+import time
+import uuid
+from collections.abc import Awaitable, Callable, Iterable, Iterator
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from functools import partial
+
+from sqlalchemy.dialects.postgresql import insert
+from sqlmodel import func, select
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from app.core.config import settings
+from app.core.db import async_engine
+from app.core.locks import advisory_lock
+from app.core.metrics import cache_lookups, track_refresh
+from app.models import DESCRIPTION_EXCERPT_LENGTH, CacheMetadata, Podcast
+from app.services.artwork_cache import ArtworkCacheStore
+from app.services.itunes import ITunesArtworkService
+from app.services.listenotes import ListenNotesService, PodcastData
+from app.services.typeahead import TYPEAHEAD_COLUMNS, TypeaheadEntry, typeahead_index
+from app.services.upstream import UpstreamClients
+
+logger = logging.getLogger(__name__)
+
+CACHE_KEY_BEST_PODCASTS = "best_podcasts_overall"
+# Bumped in the same transaction as every page of podcasts written, so it
+# changes whenever podcast data does, even if the overall refresh fails
+CACHE_KEY_PODCAST_DATA = "podcast_data"
+CACHE_MAX_AGE_HOURS = 24
+PODCAST_UPSERT_BATCH_SIZE = 1000
+
+
+async def get_cache_age(session: AsyncSession, cache_key: str) -> timedelta | None:
+    """Return how long ago the cache for a given key was fetched, or None if never."""
+    metadata = (
+        await session.exec(select(CacheMetadata).where(CacheMetadata.cache_key == cache_key))
+    ).first()
+
+    if not metadata:
+        return None
+
+    return datetime.utcnow() - metadata.last_fetched_at
+
+
+async def is_cache_fresh(session: AsyncSession, cache_key: str, max_age_hours: int = CACHE_MAX_AGE_HOURS) -> bool:
+    """Check if the cache for a given key is still fresh."""
+    age = await get_cache_age(session, cache_key)
+    return age is not None and age < timedelta(hours=max_age_hours)
+
+
+# Smallest step a timestamp column can take
+TIMESTAMP_STEP = timedelta(microseconds=1)
+
+
+async def update_cache_timestamp(session: AsyncSession, cache_key: str) -> datetime:
+    """
+    Update or create cache metadata timestamp, returning the new timestamp.
+
+    Runs as a single upsert and does not commit, so the caller can make it part
+    of the same transaction as the data it describes. Each update moves the
+    timestamp strictly forward, even when transactions that took their clock
+    reading earlier commit later, so it can serve as a version.
+    """
+    statement = insert(CacheMetadata).values(
+        id=uuid.uuid4(), cache_key=cache_key, last_fetched_at=datetime.utcnow()
+    )
+    statement = statement.on_conflict_do_update(
+        index_elements=[CacheMetadata.cache_key],
+        set_={
+            "last_fetched_at": func.greatest(
+                CacheMetadata.last_fetched_at + TIMESTAMP_STEP,
+                statement.excluded.last_fetched_at,
+            )
+        },
+    ).returning(CacheMetadata.last_fetched_at)
+    return (await session.exec(statement)).scalar_one()
+
+
+class CacheGenerations:
+    """
+    Per-worker view of each cache key's generation (its last_fetched_at).
+
+    Lets request handlers build validators and check freshness without a
+    database query on every hit. A generation is re-read at most once per
+    ``ttl_seconds``, so refreshes made by other workers show up within that
+    window; refreshes made by this worker are recorded immediately. The
+    ``read_together`` keys are always re-read in one query, since request
+    handlers need all of them.
+    """
+
+    def __init__(
+        self,
+        ttl_seconds: float = settings.CACHE_GENERATION_TTL_SECONDS,
+        read_together: tuple[str, ...] = (),
+    ):
+        self.ttl_seconds = ttl_seconds
+        self.read_together = read_together
+        self._entries: dict[str, tuple[float, datetime | None]] = {}
+
+    async def get(self, session: AsyncSession, cache_key: str) -> datetime | None:
+        """Return the generation for a key, or None if it has never been fetched."""
+        entry = self._entries.get(cache_key)
+        now = time.monotonic()
+        if entry is not None and now - entry[0] < self.ttl_seconds:
+            return entry[1]
+
+        keys = {cache_key, *self.read_together} if cache_key in self.read_together else {cache_key}
+        generations = dict(
+            (
+                await session.exec(
+                    select(CacheMetadata.cache_key, CacheMetadata.last_fetched_at).where(
+                        CacheMetadata.cache_key.in_(keys)
+                    )
+                )
+            ).all()
+        )
+        for key in keys:
+            self._entries[key] = (now, generations.get(key))
+        return generations.get(cache_key)
+
+    def set(self, cache_key: str, generation: datetime) -> None:
+        self._entries[cache_key] = (time.monotonic(), generation)
+
+    def clear(self) -> None:
+        self._entries.clear()
+
+
+cache_generations = CacheGenerations(
+    read_together=(CACHE_KEY_BEST_PODCASTS, CACHE_KEY_PODCAST_DATA)
+)
+
+
+async def get_catalog_versions(session: AsyncSession) -> tuple[datetime | None, datetime | None]:
+    """
+    The catalog's refresh generation and its data version.
+
+    The generation is when every page was last refreshed together and decides
+    freshness. The data version changes with every committed page, so HTTP
+    validators must be derived from it. Before any page has recorded a data
+    version, the generation stands in for it.
+    """
+    generation = await cache_generations.get(session, CACHE_KEY_BEST_PODCASTS)
+    version = await cache_generations.get(session, CACHE_KEY_PODCAST_DATA)
+    return generation, version or generation
+
+
+def parse_genre_ids(genre_ids: str | None) -> list[int]:
+    """Convert a comma-separated genre_ids string to a list of ints."""
+    if not genre_ids:
+        return []
+    return [int(g) for g in genre_ids.split(",") if g.strip()]
+
+
+HTML_TAG_PATTERN = re.compile(r"<[^>]*>")
+
+
+def make_description_excerpt(
+    description: str | None, max_length: int = DESCRIPTION_EXCERPT_LENGTH
+) -> str | None:
+    """
+    Plain-text start of an HTML description, at most ``max_length`` characters.
+
+    Tags are dropped, entities unescaped and whitespace collapsed. Longer text
+    is cut at a word boundary where possible and ends with an ellipsis.
+    """
+    if not description:
+        return None
+    text = " ".join(html.unescape(HTML_TAG_PATTERN.sub(" ", description)).split())
+    if len(text) <= max_length:
+        return text or None
+    cut = text[: max_length - 1]
+    if " " in cut:
+        cut = cut.rsplit(" ", 1)[0]
+    return cut.rstrip(" ,.;:") + "…"
+
+
+async def upsert_podcasts(
+    session: AsyncSession,
+    podcasts_data: list[PodcastData],
+    artwork_map: dict[str, dict[str, str]],
+) -> list[TypeaheadEntry]:
+    """
+    Insert or update podcasts by listenotes_id with set-based upserts.
+
+    Sends one multi-row INSERT ... ON CONFLICT statement per
+    PODCAST_UPSERT_BATCH_SIZE podcasts, in listenotes_id order. Does not commit. Returns the stored
+    rows as typeahead entries.
+    """
+    rows = {}
+    for data in podcasts_data:
+        artwork = artwork_map.get(data.listenotes_id)
+        rows[data.listenotes_id] = {
+            "id": uuid.uuid4(),
+            "title": data.title,
+            "publisher": data.publisher,
+            "author": data.publisher,  # Map publisher to author for compatibility
+            "description": data.description,
+            "description_excerpt": make_description_excerpt(data.description),
+            "cover_url": data.cover_url,
+            "feed_url": data.feed_url,
+            "listenotes_id": data.listenotes_id,
+            "total_episodes": data.total_episodes,
+            "listen_score": data.listen_score,
+            "genre_ids": data.genre_ids,
+            "genres": parse_genre_ids(data.genre_ids),
+            "listenotes_url": data.listenotes_url,
+            "itunes_id": data.itunes_id,
+            "cover_url_sm": artwork["sm"] if artwork else data.cover_url,
+            "cover_url_md": artwork["md"] if artwork else data.cover_url,
+            "cover_url_lg": artwork["lg"] if artwork else data.cover_url,
+            "is_featured": True,
+        }
+
+    # A statement may only touch each conflicting row once, so rows are keyed
+    # by listenotes_id above and later duplicates win. Concurrent pages share
+    # podcasts; locking rows in listenotes_id order keeps their upserts from
+    # deadlocking on each other.
+    rows = [rows[listenotes_id] for listenotes_id in sorted(rows)]
+    entries = []
+    for start in range(0, len(rows), PODCAST_UPSERT_BATCH_SIZE):
+        statement = insert(Podcast).values(rows[start : start + PODCAST_UPSERT_BATCH_SIZE])
+        statement = statement.on_conflict_do_update(
+            index_elements=[Podcast.listenotes_id],
+            set_={
+                column: statement.excluded[column]
+                for column in rows[0]
+                if column not in ("id", "listenotes_id")
+            },
+        ).returning(*TYPEAHEAD_COLUMNS)
+        result = await session.exec(statement)
+        entries.extend(TypeaheadEntry(*row) for row in result.all())
+    return entries
+
+
+def page_cache_key(genre_id: int, page: int) -> str:
+    """CacheMetadata key tracking freshness of one Listen Notes best-podcasts page."""
+    return f"best_podcasts:genre={genre_id}:page={page}"
+
+
+def catalog_pages() -> Iterator[tuple[int, int]]:
+    """Yield the configured (genre_id, page) pairs to ingest."""
+    for genre_id in settings.INGEST_GENRE_IDS:
+        for page in range(1, settings.INGEST_PAGES + 1):
+            yield genre_id, page
+
+
+@dataclass
+class IngestionResult:
+    pages_ingested: int = 0
+    pages_skipped: int = 0
+    pages_failed: int = 0
+    podcasts: int = 0
+
+    @property
+    def ok(self) -> bool:
+        return self.pages_failed == 0
+
+
+async def ingest_page(
+    session: AsyncSession,
+    listen_notes: ListenNotesService,
+    itunes: ITunesArtworkService,
+    genre_id: int,
+    page: int,
+) -> int | None:
+    """
+    Fetch one best-podcasts page and write it to the database.
+
+    The podcasts, the page's freshness timestamp and the catalog data version
+    are committed together. The page is then applied to the typeahead index.
+    Returns the number of podcasts stored, or None if the fetch failed.
+    """
+    cache_key = page_cache_key(genre_id, page)
+    with track_refresh(cache_key) as outcome:
+        podcasts_data = await listen_notes.fetch_best_podcasts(genre_id=genre_id, page=page)
+        if podcasts_data is None:
+            logger.error(f"Failed to fetch genre={genre_id} page={page} from Listen Notes API")
+            return None
+
+        artwork_map = await _fetch_itunes_artwork(podcasts_data, itunes)
+        entries = await upsert_podcasts(session, podcasts_data, artwork_map)
+        await update_cache_timestamp(session, cache_key)
+        # Last, so concurrent pages hold the shared version row only briefly
+        version = await update_cache_timestamp(session, CACHE_KEY_PODCAST_DATA)
+        await session.commit()
+        outcome["ok"] = True
+    cache_generations.set(CACHE_KEY_PODCAST_DATA, version)
+    typeahead_index.update(entries)
+    return len(podcasts_data)
+
+
+async def ingest_catalog(
+    pages: Iterable[tuple[int, int]],
+    concurrency: int = settings.INGEST_CONCURRENCY,
+    stale_after: timedelta = timedelta(hours=CACHE_MAX_AGE_HOURS)
+    - timedelta(minutes=settings.CACHE_REFRESH_AHEAD_MINUTES),
+    clients: UpstreamClients | None = None,
+) -> IngestionResult:
+    """
+    Ingest (genre_id, page) pairs with at most ``concurrency`` pages in flight.
+
+    A fixed pool of workers pulls from ``pages`` lazily and each page is
+    committed in its own session as soon as it arrives, so memory use does not
+    grow with the number of pages. Pages refreshed within ``stale_after`` are
+    skipped, which lets a partially failed run resume where it stopped.
+
+    Upstream requests go through ``clients`` when given, otherwise through
+    clients opened for this run and closed at the end of it.
+    """
+    listen_notes = ListenNotesService(
+        api_key=settings.LISTENOTES_API_KEY,
+        client=clients.listen_notes if clients else None,
+    )
+    itunes = ITunesArtworkService(
+        cache=ArtworkCacheStore(),
+        client=clients.itunes if clients else None,
+    )
+    result = IngestionResult()
+    pages = iter(pages)
+
+    async def worker() -> None:
+        for genre_id, page in pages:
+            try:
+                async with AsyncSession(async_engine, expire_on_commit=False) as session:
+                    cache_key = page_cache_key(genre_id, page)
+                    age = await get_cache_age(session, cache_key)
+                    if age is not None and age < stale_after:
+                        cache_lookups.labels(cache_key, "hit").inc()
+                        result.pages_skipped += 1
+                        continue
+                    cache_lookups.labels(cache_key, "miss" if age is None else "stale").inc()
+                    count = await ingest_page(session, listen_notes, itunes, genre_id, page)
+            except Exception as e:
+                logger.error(f"Ingestion error for genre={genre_id} page={page}: {e}")
+                count = None
+
+            if count is None:
+                result.pages_failed += 1
+            else:
+                result.pages_ingested += 1
+                result.podcasts += count
+
+    try:
+        await asyncio.gather(*(worker() for _ in range(max(concurrency, 1))))
+    finally:
+        await asyncio.gather(listen_notes.close(), itunes.close())
+    return result
+
+
+async def refresh_best_podcasts_cache(
+    session: AsyncSession,
+    clients: UpstreamClients | None = None,
+) -> bool:
+    """
+    Ingest the configured genres and pages from Listen Notes.
+
+    The overall cache key is only marked fresh once every page succeeded.
+    Returns True if successful, False otherwise.
+    """
+    if not settings.LISTENOTES_API_KEY:
+        logger.warning("LISTENOTES_API_KEY not configured, skipping cache refresh")
+        return False
+
+    with track_refresh(CACHE_KEY_BEST_PODCASTS) as outcome:
+        result = await ingest_catalog(catalog_pages(), clients=clients)
+        if not result.ok:
+            logger.error(
+                f"Catalog ingestion failed for {result.pages_failed} pages "
+                f"({result.pages_ingested} ingested, {result.pages_skipped} fresh)"
+            )
+            return False
+
+        generation = await update_cache_timestamp(session, CACHE_KEY_BEST_PODCASTS)
+        await session.commit()
+        outcome["ok"] = True
+    cache_generations.set(CACHE_KEY_BEST_PODCASTS, generation)
+    if not result.pages_skipped:
+        # Every page went through this worker's index, so it needs no reload
+        typeahead_index.mark_current(generation)
+    logger.info(
+        f"Successfully refreshed best podcasts cache with {result.podcasts} podcasts "
+        f"from {result.pages_ingested} pages ({result.pages_skipped} already fresh)"
+    )
+    return True
+
+
+async def _fetch_itunes_artwork(
+    podcasts_data: list,
+    itunes_service: ITunesArtworkService,
+) -> dict[str, dict[str, str]]:
+    """
+    Fetch iTunes artwork URLs for a list of podcasts.
+    Returns a dict mapping listenotes_id -> artwork URLs dict.
+    """
+    artworks = await itunes_service.get_artwork_urls_many(
+        (data.itunes_id, data.title) for data in podcasts_data
+    )
+    return {
+        data.listenotes_id: artwork
+        for data, artwork in zip(podcasts_data, artworks)
+        if artwork
+    }
+
+
+async def refresh_if_stale(
+    cache_key: str,
+    refresh: Callable[[AsyncSession], Awaitable[bool]],
+    stale_after: timedelta,
+    wait: bool = False,
+) -> bool | None:
+    """
+    Refresh a cache entry with at most one refresh in flight across all workers.
+
+    The refresh runs under a Postgres advisory lock keyed by ``cache_key``.
+    Callers that lose the race return None straight away and keep serving stale
+    data, or with ``wait=True`` block until the winner finishes. Staleness is
+    re-checked once the lock is held, so a finished refresh is never repeated.
+
+    Returns None when no refresh was run, otherwise the refresh result.
+    """
+
+    async def is_due(session: AsyncSession) -> bool:
+        age = await get_cache_age(session, cache_key)
+        return age is None or age >= stale_after
+
+    async with AsyncSession(async_engine, expire_on_commit=False) as session:
+        if not await is_due(session):
+            return None
+
+    async with advisory_lock(cache_key, wait=wait) as acquired:
+        if not acquired:
+            logger.info(f"Cache '{cache_key}' is already being refreshed by another worker")
+            return None
+
+        async with AsyncSession(async_engine, expire_on_commit=False) as session:
+            if not await is_due(session):
+                return None
+
+        # A fresh session, so no connection sits idle in a transaction
+        # through the upstream fan-out
+        logger.info(f"Cache '{cache_key}' is due for refresh, revalidating")
+        async with AsyncSession(async_engine, expire_on_commit=False) as session:
+            return await refresh(session)
+
+
+class CacheRefreshScheduler:
+    """
+    Keeps the best podcasts cache warm from a background task.
+
+    Runs inside the application lifespan. Every poll it checks the cache age and
+    refreshes once the entry is within ``refresh_ahead`` of expiry, so readers
+    never have to wait on the upstream APIs. Readers that notice stale data call
+    ``request_refresh`` to wake the loop early instead of refreshing inline.
+    Refreshes use the upstream clients handed to ``start``.
+    """
+
+    def __init__(
+        self,
+        cache_key: str = CACHE_KEY_BEST_PODCASTS,
+        max_age: timedelta = timedelta(hours=CACHE_MAX_AGE_HOURS),
+        refresh_ahead: timedelta = timedelta(minutes=settings.CACHE_REFRESH_AHEAD_MINUTES),
+        poll_interval: float = settings.CACHE_REFRESH_POLL_SECONDS,
+        retry_interval: float = settings.CACHE_REFRESH_RETRY_SECONDS,
+    ):
+        self.cache_key = cache_key
+        self.max_age = max_age
+        self.refresh_ahead = refresh_ahead
+        self.poll_interval = poll_interval
+        self.retry_interval = retry_interval
+        self._loop: asyncio.AbstractEventLoop | None = None
+        self._wakeup: asyncio.Event | None = None
+        self._task: asyncio.Task | None = None
+        self.clients: UpstreamClients | None = None
+
+    @property
+    def running(self) -> bool:
+        return self._task is not None and not self._task.done()
+
+    async def start(self, clients: UpstreamClients | None = None) -> None:
+        if self.running:
+            return
+        self.clients = clients
+        self._loop = asyncio.get_running_loop()
+        self._wakeup = asyncio.Event()
+        self._task = asyncio.create_task(self._run())
+        logger.info(f"Started background refresh for cache key '{self.cache_key}'")
+
+    async def stop(self) -> None:
+        if self._task is None:
+            return
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+        self._wakeup = None
+        self._loop = None
+        self.clients = None
+
+    def request_refresh(self) -> None:
+        """
+        Ask the background task to revalidate the cache as soon as possible.
+
+        Never blocks and is safe to call from any thread.
+        Repeated calls while a refresh is pending or running are coalesced.
+        """
+        if not self.running or self._loop is None or self._wakeup is None:
+            logger.debug("Cache refresh scheduler is not running, ignoring refresh request")
+            return
+        self._loop.call_soon_threadsafe(self._wakeup.set)
+
+    async def _run(self) -> None:
+        while True:
+            self._wakeup.clear()
+            try:
+                refreshed = await self._refresh_if_due()
+            except Exception as e:
+                logger.error(f"Background cache refresh error: {e}")
+                refreshed = False
+
+            if refreshed is False:
+                # Back off after a failure rather than retrying on every stale read
+                await asyncio.sleep(self.retry_interval)
+                continue
+
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=self.poll_interval)
+            except TimeoutError:
+                pass
+
+    async def _refresh_if_due(self) -> bool | None:
+        """
+        Refresh the cache if it is missing or about to expire.
+
+        Returns None when no refresh was needed, otherwise the refresh result.
+        """
+        return await refresh_if_stale(
+            self.cache_key,
+            partial(refresh_best_podcasts_cache, clients=self.clients),
+            stale_after=self.max_age - self.refresh_ahead,
+        )
+
+
+refresh_scheduler = CacheRefreshScheduler()
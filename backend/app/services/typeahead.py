@@ -0,0 +1,209 @@
+import asyncio
+import bisect
+import heapq
+import logging
+import re
+import unicodedata
+import uuid
+from collections.abc import Iterable
+from datetime import datetime
+from typing import NamedTuple
+
+from sqlmodel import select
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from app.core.db import async_engine
+from app.models import Podcast
+
+logger = logging.getLogger(__name__)
+
+# Prefixes up to this length keep a precomputed popularity-ordered bucket, so
+# the first few keystrokes never scan a large slice of the index.
+SHORT_PREFIX_LENGTH = 3
+# Words per title or publisher that can start a match, e.g. "crime" in
+# "True Crime Daily".
+MAX_WORDS_PER_FIELD = 8
+
+_NON_ALNUM = re.compile(r"[^0-9a-z]+")
+
+
+class TypeaheadEntry(NamedTuple):
+    id: uuid.UUID
+    title: str
+    publisher: str | None
+    cover_url_sm: str | None
+    listen_score: int | None
+
+
+# Columns loaded into the index, in TypeaheadEntry order
+TYPEAHEAD_COLUMNS = (
+    Podcast.id,
+    Podcast.title,
+    Podcast.publisher,
+    Podcast.cover_url_sm,
+    Podcast.listen_score,
+)
+
+
+def normalize_text(text: str) -> str:
+    """Fold case and accents and reduce punctuation to single spaces."""
+    decomposed = unicodedata.normalize("NFKD", text.casefold())
+    stripped = "".join(c for c in decomposed if not unicodedata.combining(c))
+    return _NON_ALNUM.sub(" ", stripped).strip()
+
+
+def index_terms(entry: TypeaheadEntry) -> set[str]:
+    """Terms a podcast is findable by: each word-suffix of its title and publisher."""
+    terms = set()
+    for field in (entry.title, entry.publisher):
+        words = normalize_text(field or "").split()
+        for start in range(min(len(words), MAX_WORDS_PER_FIELD)):
+            terms.add(" ".join(words[start:]))
+    return terms
+
+
+def _rank(entry: TypeaheadEntry) -> tuple[int, uuid.UUID]:
+    """Sort key putting the most popular podcasts first; unscored ones last."""
+    score = entry.listen_score if entry.listen_score is not None else -1
+    return -score, entry.id
+
+
+class TypeaheadIndex:
+    """
+    In-process prefix index over podcast titles and publishers.
+
+    Keys are (term, podcast id) pairs in a sorted list, so the keys matching a
+    prefix are one bisected range. Results are ordered by listen_score. Updates
+    are applied per podcast without rebuilding the index.
+
+    ``generation`` is the newest cache generation the index is known to
+    include; request handlers reload it in the background once the cache
+    moves past it (for refreshes run by another worker).
+    """
+
+    def __init__(self):
+        self.generation: datetime | None = None
+        self._entries: dict[uuid.UUID, TypeaheadEntry] = {}
+        self._terms: dict[uuid.UUID, set[str]] = {}
+        self._ranks: dict[uuid.UUID, tuple[int, uuid.UUID]] = {}
+        self._keys: list[tuple[str, uuid.UUID]] = []
+        self._buckets: dict[str, list[tuple[int, uuid.UUID]]] = {}
+        self._reload_task: asyncio.Task | None = None
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def replace(self, entries: Iterable[TypeaheadEntry]) -> None:
+        """Rebuild the index from scratch with the given entries."""
+        self._entries = {entry.id: entry for entry in entries}
+        self._terms = {id: index_terms(entry) for id, entry in self._entries.items()}
+        self._ranks = {id: _rank(entry) for id, entry in self._entries.items()}
+        self._keys = sorted((term, id) for id, terms in self._terms.items() for term in terms)
+        self._buckets = {}
+        for id, terms in self._terms.items():
+            for prefix in self._short_prefixes(terms):
+                self._buckets.setdefault(prefix, []).append(self._ranks[id])
+        for bucket in self._buckets.values():
+            bucket.sort()
+
+    def update(self, entries: Iterable[TypeaheadEntry]) -> None:
+        """Insert or replace entries in place."""
+        for entry in entries:
+            self._remove(entry.id)
+            terms = index_terms(entry)
+            self._entries[entry.id] = entry
+            self._terms[entry.id] = terms
+            self._ranks[entry.id] = rank = _rank(entry)
+            for term in terms:
+                bisect.insort(self._keys, (term, entry.id))
+            for prefix in self._short_prefixes(terms):
+                bisect.insort(self._buckets.setdefault(prefix, []), rank)
+
+    def _remove(self, id: uuid.UUID) -> None:
+        if self._entries.pop(id, None) is None:
+            return
+        terms = self._terms.pop(id)
+        rank = self._ranks.pop(id)
+        for term in terms:
+            self._discard(self._keys, (term, id))
+        for prefix in self._short_prefixes(terms):
+            self._discard(self._buckets[prefix], rank)
+
+    @staticmethod
+    def _discard(keys: list, key: tuple) -> None:
+        i = bisect.bisect_left(keys, key)
+        if i < len(keys) and keys[i] == key:
+            del keys[i]
+
+    @staticmethod
+    def _short_prefixes(terms: set[str]) -> set[str]:
+        return {
+            term[:length]
+            for term in terms
+            for length in range(1, SHORT_PREFIX_LENGTH + 1)
+            if len(term) >= length
+        }
+
+    def suggest(self, query: str, limit: int = 8) -> list[TypeaheadEntry]:
+        """Return up to ``limit`` podcasts with a title or publisher word starting with ``query``."""
+        prefix = normalize_text(query)
+        if not prefix:
+            return []
+
+        if len(prefix) <= SHORT_PREFIX_LENGTH:
+            bucket = self._buckets.get(prefix, [])
+            return [self._entries[id] for _, id in bucket[:limit]]
+
+        # Every key starting with prefix sorts between (prefix,) and (prefix + U+FFFF,)
+        start = bisect.bisect_left(self._keys, (prefix,))
+        end = bisect.bisect_left(self._keys, (prefix + "\uffff",), start)
+        bucket = self._buckets.get(prefix[:SHORT_PREFIX_LENGTH], [])
+
+        # Ranking the whole range costs one step per matching key. Walking the
+        # popularity-ordered bucket of the first characters and stopping at
+        # ``limit`` matches costs about limit * len(bucket) / matches steps
+        # when matches are spread evenly by popularity, and up to the whole
+        # bucket when they are all unpopular. Both give the exact top results;
+        # take whichever is expected to be cheaper.
+        if (end - start) ** 2 <= limit * len(bucket):
+            ranks = {self._ranks[id] for _, id in self._keys[start:end]}
+            return [self._entries[id] for _, id in heapq.nsmallest(limit, ranks)]
+
+        matches = []
+        for _, id in bucket:
+            if any(term.startswith(prefix) for term in self._terms[id]):
+                matches.append(self._entries[id])
+                if len(matches) == limit:
+                    break
+        return matches
+
+    async def load(self) -> None:
+        """Build the index from every podcast in the database."""
+        generation = datetime.utcnow()
+        async with AsyncSession(async_engine) as session:
+            rows = (await session.exec(select(*TYPEAHEAD_COLUMNS))).all()
+        self.replace(TypeaheadEntry(*row) for row in rows)
+        self.generation = generation
+        logger.info(f"Loaded typeahead index with {len(self)} podcasts")
+
+    def mark_current(self, generation: datetime) -> None:
+        """Record that the index already includes a cache generation."""
+        if self.generation is None or generation > self.generation:
+            self.generation = generation
+
+    def request_reload(self, generation: datetime) -> None:
+        """Reload in the background if ``generation`` is newer than the index."""
+        if self.generation is not None and generation <= self.generation:
+            return
+        if self._reload_task is not None and not self._reload_task.done():
+            return
+        self._reload_task = asyncio.create_task(self._reload())
+
+    async def _reload(self) -> None:
+        try:
+            await self.load()
+        except Exception as e:
+            logger.error(f"Typeahead index reload failed: {e}")
+
+
+typeahead_index = TypeaheadIndex()
@@ -0,0 +1,42 @@
+import asyncio
+import logging
+from dataclasses import dataclass
+
+import httpx
+
+from app.core.config import settings
+from app.services import itunes, listenotes
+
+try:
+    import h2
+except ImportError:  # httpx needs the h2 package to speak HTTP/2
+    h2 = None
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class UpstreamClients:
+    """
+    Long-lived pooled HTTP clients for the upstream APIs.
+
+    Created once by the application lifespan and kept on ``app.state``, so
+    keep-alive connections and TLS sessions survive from one cache refresh to
+    the next instead of being re-established for every run.
+    """
+
+    listen_notes: httpx.AsyncClient
+    itunes: httpx.AsyncClient
+
+    @classmethod
+    def create(cls, http2: bool = settings.UPSTREAM_HTTP2) -> "UpstreamClients":
+        if http2 and h2 is None:
+            logger.warning("UPSTREAM_HTTP2 is set but the h2 package is not installed, using HTTP/1.1")
+            http2 = False
+        return cls(
+            listen_notes=listenotes.create_client(http2=http2),
+            itunes=itunes.create_client(http2=http2),
+        )
+
+    async def aclose(self) -> None:
+        await asyncio.gather(self.listen_notes.aclose(), self.itunes.aclose())
@@ -0,0 +1,78 @@
+import asyncio
+import logging
+from collections.abc import Awaitable, Callable
+
+import psycopg
+from sqlalchemy.engine import make_url
+
+from app import crud
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+
+def _conninfo() -> str:
+    # psycopg takes a plain postgresql:// URL, without SQLAlchemy's driver name
+    url = make_url(str(settings.SQLALCHEMY_DATABASE_URI)).set(drivername="postgresql")
+    return url.render_as_string(hide_password=False)
+
+
+async def _connect() -> psycopg.AsyncConnection:
+    return await psycopg.AsyncConnection.connect(_conninfo(), autocommit=True)
+
+
+class UserCacheInvalidator:
+    """
+    Drops users from this worker's user cache when any worker changes them.
+
+    update_user sends the user id on USER_INVALIDATION_CHANNEL; every worker
+    LISTENs on a dedicated connection, outside the pool. Notifications sent
+    while the connection is down are lost, so the whole cache is cleared
+    each time it (re)connects.
+    """
+
+    def __init__(
+        self,
+        connect: Callable[[], Awaitable[psycopg.AsyncConnection]] = _connect,
+        retry_interval: float = 5.0,
+    ):
+        self.connect = connect
+        self.retry_interval = retry_interval
+        self._task: asyncio.Task | None = None
+
+    @property
+    def running(self) -> bool:
+        return self._task is not None and not self._task.done()
+
+    async def start(self) -> None:
+        if self.running:
+            return
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task is None:
+            return
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+
+    async def _run(self) -> None:
+        while True:
+            try:
+                await self._listen()
+            except Exception as e:
+                logger.error(f"User cache invalidation listener failed: {e}")
+            await asyncio.sleep(self.retry_interval)
+
+    async def _listen(self) -> None:
+        async with await self.connect() as conn:
+            await conn.execute(f"LISTEN {crud.USER_INVALIDATION_CHANNEL}")
+            crud.user_cache.clear()
+            async for notify in conn.notifies():
+                crud.invalidate_user(notify.payload)
+
+
+user_cache_invalidator = UserCacheInvalidator()
@@ -0,0 +1,137 @@
+import asyncio
+import random
+import socket
+import threading
+import time
+from collections.abc import Iterator
+from contextlib import contextmanager
+from dataclasses import dataclass
+
+import uvicorn
+from fastapi import FastAPI, Query, Response
+
+ARTWORK_URL = "https://is1-ssl.mzstatic.com/image/thumb/Podcasts/v4/{id}/100x100bb.jpg"
+
+
+@dataclass
+class UpstreamProfile:
+    """How a fake upstream behaves: per-request latency and failure rate."""
+
+    latency_ms: float = 50.0
+    jitter_ms: float = 10.0
+    error_rate: float = 0.0
+    seed: int = 0
+
+    def make_random(self) -> random.Random:
+        return random.Random(self.seed)
+
+
+async def _behave(profile: UpstreamProfile, rng: random.Random) -> Response | None:
+    """Sleep for the profile's latency and return an error response if this call should fail."""
+    delay = max(0.0, rng.gauss(profile.latency_ms, profile.jitter_ms)) / 1000
+    await asyncio.sleep(delay)
+    if rng.random() < profile.error_rate:
+        return Response(status_code=503)
+    return None
+
+
+def itunes_id_for(genre_id: int, page: int, index: int) -> int:
+    return 1_000_000 + genre_id * 10_000 + page * 100 + index
+
+
+def create_listen_notes_app(
+    profile: UpstreamProfile, podcasts_per_page: int = 20
+) -> FastAPI:
+    """A stand-in for the Listen Notes best_podcasts endpoint with deterministic data."""
+    app = FastAPI()
+    rng = profile.make_random()
+
+    @app.get("/api/v2/best_podcasts")
+    async def best_podcasts(genre_id: int = 0, page: int = 1):
+        if (error := await _behave(profile, rng)) is not None:
+            return error
+        podcasts = []
+        for index in range(podcasts_per_page):
+            podcast_id = f"bench-{genre_id}-{page}-{index}"
+            podcasts.append(
+                {
+                    "id": podcast_id,
+                    "title": f"Benchmark Podcast {genre_id}-{page}-{index}",
+                    "publisher": f"Publisher {index % 7}",
+                    "description": "A podcast served by the local Listen Notes stand-in. "
+                    * 8,
+                    "image": f"https://cdn.example.com/{podcast_id}.jpg",
+                    "rss": f"https://feeds.example.com/{podcast_id}.xml",
+                    "total_episodes": 10 + index,
+                    "listen_score": 100 - index,
+                    "genre_ids": [genre_id or 67, 144],
+                    "listennotes_url": f"https://www.listennotes.com/podcasts/{podcast_id}",
+                    # Every fifth podcast has no iTunes ID, exercising the search fallback
+                    "itunes_id": None
+                    if index % 5 == 0
+                    else itunes_id_for(genre_id, page, index),
+                }
+            )
+        return {"podcasts": podcasts, "page_number": page, "has_next": True}
+
+    return app
+
+
+def create_itunes_app(profile: UpstreamProfile) -> FastAPI:
+    """A stand-in for the iTunes lookup and search endpoints."""
+    app = FastAPI()
+    rng = profile.make_random()
+
+    @app.get("/lookup")
+    async def lookup(id: str = Query()):
+        if (error := await _behave(profile, rng)) is not None:
+            return error
+        results = [
+            {
+                "collectionId": int(itunes_id),
+                "artworkUrl100": ARTWORK_URL.format(id=itunes_id),
+            }
+            for itunes_id in id.split(",")
+        ]
+        return {"resultCount": len(results), "results": results}
+
+    @app.get("/search")
+    async def search(term: str = Query()):
+        if (error := await _behave(profile, rng)) is not None:
+            return error
+        artwork_id = abs(hash(term)) % 10_000_000
+        return {
+            "resultCount": 1,
+            "results": [{"artworkUrl100": ARTWORK_URL.format(id=artwork_id)}],
+        }
+
+    return app
+
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+@contextmanager
+def serve(app: FastAPI) -> Iterator[str]:
+    """Run an app with uvicorn on a background thread and yield its base URL."""
+    port = _free_port()
+    server = uvicorn.Server(
+        uvicorn.Config(
+            app, host="127.0.0.1", port=port, log_level="warning", lifespan="off"
+        )
+    )
+    thread = threading.Thread(target=server.run, daemon=True)
+    thread.start()
+    deadline = time.monotonic() + 10
+    while not server.started:
+        if time.monotonic() > deadline or not thread.is_alive():
+            raise RuntimeError("Fake upstream server failed to start")
+        time.sleep(0.01)
+    try:
+        yield f"http://127.0.0.1:{port}"
+    finally:
+        server.should_exit = True
+        thread.join(timeout=10)
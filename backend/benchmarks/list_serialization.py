@@ -0,0 +1,110 @@
+import argparse
+import json
+import time
+import uuid
+from collections.abc import Callable
+
+from fastapi.encoders import jsonable_encoder
+from pydantic import TypeAdapter
+from pydantic_core import to_json
+
+from app.api.serialization import rows_to_dicts
+from app.models import (
+    PODCAST_CARD_FIELDS,
+    PODCAST_PUBLIC_FIELDS,
+    Podcast,
+    PodcastList,
+    PodcastPublic,
+)
+from app.services.podcast_cache import make_description_excerpt
+
+DESCRIPTION = "<p>" + "An episode-by-episode look at the week's stories. " * 30 + "</p>"
+PODCAST_LIST = TypeAdapter(PodcastList)
+
+
+def make_podcast(index: int) -> Podcast:
+    return Podcast(
+        id=uuid.uuid4(),
+        title=f"Podcast {index}",
+        publisher=f"Publisher {index % 13}",
+        description=DESCRIPTION,
+        description_excerpt=make_description_excerpt(DESCRIPTION),
+        cover_url=f"https://cdn.example.com/{index}.jpg",
+        feed_url=f"https://feeds.example.com/{index}.xml",
+        is_featured=True,
+        listenotes_id=f"ln-{index}",
+        total_episodes=100 + index,
+        listen_score=90 - index % 40,
+        genre_ids="67,144",
+        genres=[67, 144],
+        listenotes_url=f"https://www.listennotes.com/podcasts/ln-{index}",
+        itunes_id=str(1_000_000 + index),
+        cover_url_sm=f"https://is1.example.com/{index}/300x300bb.jpg",
+        cover_url_md=f"https://is1.example.com/{index}/600x600bb.jpg",
+        cover_url_lg=f"https://is1.example.com/{index}/100000x100000-999.jpg",
+    )
+
+
+def orm_path(podcasts: list[Podcast]) -> bytes:
+    """What the list routes used to do: validate each ORM row, then let FastAPI validate and encode again."""
+    content = PodcastList(
+        podcasts=[PodcastPublic.model_validate(p) for p in podcasts],
+        count=len(podcasts),
+    )
+    # FastAPI's response_model handling: dump, re-validate, serialize, json.dumps
+    validated = PODCAST_LIST.validate_python(content.model_dump())
+    encoded = jsonable_encoder(PODCAST_LIST.dump_python(validated, mode="json"))
+    return json.dumps(encoded, ensure_ascii=False, separators=(",", ":")).encode()
+
+
+def row_path(
+    rows: list[tuple], fields: tuple[str, ...] = PODCAST_PUBLIC_FIELDS
+) -> bytes:
+    """Selected columns mapped to dicts and encoded once."""
+    podcasts = rows_to_dicts(rows, fields)
+    return to_json({"podcasts": podcasts, "count": len(podcasts)})
+
+
+def time_per_row(func: Callable[[], bytes], rows: int, repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - start)
+    return best / rows * 1e6
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description="Per-row cost of serializing podcast list responses, ORM path vs selected rows."
+    )
+    parser.add_argument("--rows", type=int, nargs="+", default=[6, 20, 100])
+    parser.add_argument("--repeat", type=int, default=200)
+    args = parser.parse_args()
+
+    card_fields = tuple(
+        name for name in PODCAST_PUBLIC_FIELDS if name in PODCAST_CARD_FIELDS
+    )
+    print(
+        f"{'rows':>6} {'orm us/row':>11} {'rows us/row':>12} {'card us/row':>12} "
+        f"{'speedup':>8} {'bytes/row':>10} {'card bytes/row':>15}"
+    )
+    for count in args.rows:
+        podcasts = [make_podcast(i) for i in range(count)]
+        rows = [
+            tuple(getattr(p, name) for name in PODCAST_PUBLIC_FIELDS) for p in podcasts
+        ]
+        cards = [tuple(getattr(p, name) for name in card_fields) for p in podcasts]
+        assert json.loads(orm_path(podcasts)) == json.loads(row_path(rows))
+
+        orm = time_per_row(lambda: orm_path(podcasts), count, args.repeat)
+        fast = time_per_row(lambda: row_path(rows), count, args.repeat)
+        card = time_per_row(lambda: row_path(cards, card_fields), count, args.repeat)
+        print(
+            f"{count:>6} {orm:>11.2f} {fast:>12.2f} {card:>12.2f} {orm / fast:>7.1f}x "
+            f"{len(row_path(rows)) // count:>10} {len(row_path(cards, card_fields)) // count:>15}"
+        )
+
+
+if __name__ == "__main__":
+    main()
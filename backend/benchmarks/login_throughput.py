@@ -0,0 +1,118 @@
+import argparse
+import asyncio
+import statistics
+import time
+from unittest.mock import patch
+
+import httpx
+
+from app.api.deps import get_async_db
+from app.core.config import settings
+from app.core.security import get_password_hash, verify_password
+from app.main import app
+from app.models import User
+
+LOGIN_URL = f"{settings.API_V1_STR}/auth/login"
+EMAIL = "bench@example.com"
+PASSWORD = "benchmark-password"
+
+
+class InMemorySession:
+    """Just enough of AsyncSession for the login handler, without a database."""
+
+    def __init__(self, user: User):
+        self.user = user
+
+    async def exec(self, statement):
+        return self
+
+    def first(self) -> User:
+        return self.user
+
+    def add(self, obj) -> None:
+        pass
+
+    async def commit(self) -> None:
+        pass
+
+
+async def check_password_inline(plain_password: str, hashed_password: str) -> bool:
+    """The pre-executor behaviour: bcrypt runs on the event loop thread."""
+    return verify_password(plain_password, hashed_password)
+
+
+async def monitor_loop_lag(stop: asyncio.Event, interval: float = 0.005) -> float:
+    """Return the longest time the event loop was blocked past ``interval``."""
+    worst = 0.0
+    while not stop.is_set():
+        start = time.perf_counter()
+        await asyncio.sleep(interval)
+        worst = max(worst, time.perf_counter() - start - interval)
+    return worst
+
+
+async def run(requests: int, concurrency: int) -> dict[str, float]:
+    gate = asyncio.Semaphore(concurrency)
+    latencies: list[float] = []
+
+    async def login(client: httpx.AsyncClient) -> None:
+        async with gate:
+            start = time.perf_counter()
+            response = await client.post(
+                LOGIN_URL, json={"email": EMAIL, "password": PASSWORD}
+            )
+            latencies.append(time.perf_counter() - start)
+            response.raise_for_status()
+
+    stop = asyncio.Event()
+    lag = asyncio.create_task(monitor_loop_lag(stop))
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(
+        transport=transport, base_url="http://bench"
+    ) as client:
+        start = time.perf_counter()
+        await asyncio.gather(*(login(client) for _ in range(requests)))
+        elapsed = time.perf_counter() - start
+    stop.set()
+
+    latencies.sort()
+    return {
+        "logins_per_second": requests / elapsed,
+        "p50_ms": statistics.median(latencies) * 1000,
+        "p95_ms": latencies[int(len(latencies) * 0.95) - 1] * 1000,
+        "max_loop_stall_ms": await lag * 1000,
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description="Measure /auth/login throughput with bcrypt on the executor vs inline."
+    )
+    parser.add_argument("--requests", type=int, default=64)
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--rounds", type=int, default=settings.PASSWORD_HASH_ROUNDS)
+    args = parser.parse_args()
+
+    user = User(
+        email=EMAIL, hashed_password=get_password_hash(PASSWORD, rounds=args.rounds)
+    )
+    app.dependency_overrides[get_async_db] = lambda: InMemorySession(user)
+
+    print(
+        f"bcrypt cost {args.rounds}, {args.requests} logins, concurrency {args.concurrency}"
+    )
+    with patch("app.core.security.settings.PASSWORD_HASH_ROUNDS", args.rounds):
+        with patch("app.crud.check_password", check_password_inline):
+            inline = asyncio.run(run(args.requests, args.concurrency))
+        executor = asyncio.run(run(args.requests, args.concurrency))
+
+    print(f"{'':>10} {'logins/s':>10} {'p50 ms':>9} {'p95 ms':>9} {'max stall ms':>13}")
+    for name, result in (("inline", inline), ("executor", executor)):
+        print(
+            f"{name:>10} {result['logins_per_second']:>10.1f} {result['p50_ms']:>9.1f} "
+            f"{result['p95_ms']:>9.1f} {result['max_loop_stall_ms']:>13.1f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,83 @@
+import json
+import math
+from pathlib import Path
+
+# Metrics compared against a baseline, and whether higher values are better
+COMPARED_METRICS = {
+    "throughput_per_second": True,
+    "p50_ms": False,
+    "p95_ms": False,
+    "p99_ms": False,
+}
+
+
+def percentile(sorted_values: list[float], fraction: float) -> float:
+    """Nearest-rank percentile of an already sorted list."""
+    if not sorted_values:
+        return 0.0
+    rank = max(1, math.ceil(fraction * len(sorted_values)))
+    return sorted_values[rank - 1]
+
+
+def summarize(
+    latencies: list[float], elapsed: float, errors: int = 0
+) -> dict[str, float]:
+    """Summarize per-operation latencies (seconds) from a run lasting ``elapsed`` seconds."""
+    ordered = sorted(latencies)
+    return {
+        "operations": len(ordered),
+        "errors": errors,
+        "throughput_per_second": len(ordered) / elapsed if elapsed > 0 else 0.0,
+        "p50_ms": percentile(ordered, 0.50) * 1000,
+        "p95_ms": percentile(ordered, 0.95) * 1000,
+        "p99_ms": percentile(ordered, 0.99) * 1000,
+    }
+
+
+def compare(
+    results: dict[str, dict[str, float]],
+    baseline: dict[str, dict[str, float]],
+    tolerance: float,
+) -> list[str]:
+    """
+    Return a description of every metric that regressed beyond ``tolerance``.
+
+    ``tolerance`` is relative, e.g. 0.2 allows p95 to grow by 20% or
+    throughput to drop by 20%. Scenarios missing from either side are skipped.
+    """
+    regressions = []
+    for scenario, current in results.items():
+        previous = baseline.get(scenario)
+        if previous is None:
+            continue
+        for metric, higher_is_better in COMPARED_METRICS.items():
+            before, after = previous.get(metric), current.get(metric)
+            if not before or after is None:
+                continue
+            change = (after - before) / before
+            if (-change if higher_is_better else change) > tolerance:
+                regressions.append(
+                    f"{scenario}.{metric}: {before:.2f} -> {after:.2f} ({change:+.0%})"
+                )
+    return regressions
+
+
+def format_table(results: dict[str, dict[str, float]]) -> str:
+    lines = [
+        f"{'scenario':<18} {'ops':>6} {'errors':>6} {'ops/s':>9} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8}"
+    ]
+    for scenario, result in results.items():
+        lines.append(
+            f"{scenario:<18} {result['operations']:>6} {result['errors']:>6} "
+            f"{result['throughput_per_second']:>9.1f} {result['p50_ms']:>8.1f} "
+            f"{result['p95_ms']:>8.1f} {result['p99_ms']:>8.1f}"
+        )
+    return "\n".join(lines)
+
+
+def load_results(path: Path) -> dict[str, dict[str, float]]:
+    return json.loads(path.read_text())
+
+
+def save_results(path: Path, results: dict[str, dict[str, float]]) -> None:
+    path.write_text(json.dumps(results, indent=2, sort_keys=True) + "\n")
@@ -0,0 +1,264 @@
+import argparse
+import asyncio
+import os
+import random
+import sys
+import time
+import uuid
+from collections.abc import Awaitable, Callable
+from datetime import datetime, timedelta
+from pathlib import Path
+
+import httpx
+
+from benchmarks.fake_upstreams import (
+    UpstreamProfile,
+    create_itunes_app,
+    create_listen_notes_app,
+    serve,
+)
+from benchmarks.stats import (
+    compare,
+    format_table,
+    load_results,
+    save_results,
+    summarize,
+)
+
+SCENARIOS = (
+    "refresh",
+    "popular_fresh",
+    "popular_stale",
+    "podcast_detail",
+    "signup",
+    "login",
+)
+BENCH_PASSWORD = "benchmark-password"
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(
+        description=(
+            "End-to-end benchmarks against the configured Postgres database, with local "
+            "stand-ins for Listen Notes and iTunes. Use a scratch database: the refresh "
+            "scenario rewrites podcast cache metadata."
+        )
+    )
+    parser.add_argument(
+        "--scenarios", default=",".join(SCENARIOS), help="Comma-separated subset to run"
+    )
+    parser.add_argument(
+        "--requests", type=int, default=500, help="Requests per read scenario"
+    )
+    parser.add_argument(
+        "--auth-requests",
+        type=int,
+        default=50,
+        help="Requests per signup/login scenario",
+    )
+    parser.add_argument("--concurrency", type=int, default=32)
+    parser.add_argument("--refresh-runs", type=int, default=3)
+    parser.add_argument(
+        "--genres", default="0,67,144", help="INGEST_GENRE_IDS for the refresh scenario"
+    )
+    parser.add_argument(
+        "--pages", type=int, default=2, help="INGEST_PAGES for the refresh scenario"
+    )
+    parser.add_argument("--upstream-latency-ms", type=float, default=50.0)
+    parser.add_argument("--upstream-jitter-ms", type=float, default=10.0)
+    parser.add_argument("--upstream-error-rate", type=float, default=0.0)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", type=Path, help="Write results as JSON")
+    parser.add_argument(
+        "--baseline", type=Path, help="Fail if results regress against this JSON file"
+    )
+    parser.add_argument(
+        "--tolerance", type=float, default=0.2, help="Allowed relative regression"
+    )
+    return parser.parse_args()
+
+
+async def drive(
+    operation: Callable[[int], Awaitable[bool]],
+    total: int,
+    concurrency: int,
+) -> dict[str, float]:
+    """Run ``operation(i)`` for i in range(total) with bounded concurrency."""
+    gate = asyncio.Semaphore(concurrency)
+    latencies: list[float] = []
+    errors = 0
+
+    async def one(i: int) -> None:
+        nonlocal errors
+        async with gate:
+            start = time.perf_counter()
+            try:
+                ok = await operation(i)
+            except Exception:
+                ok = False
+            latencies.append(time.perf_counter() - start)
+            errors += not ok
+
+    start = time.perf_counter()
+    await asyncio.gather(*(one(i) for i in range(total)))
+    return summarize(latencies, time.perf_counter() - start, errors)
+
+
+async def run_suite(args: argparse.Namespace) -> dict[str, dict[str, float]]:
+    # Imported here so settings pick up the fake upstream URLs set by main()
+    from sqlmodel import col, delete, select, update
+    from sqlmodel.ext.asyncio.session import AsyncSession
+
+    from app.core.config import settings
+    from app.core.db import async_engine
+    from app.main import app
+    from app.models import CacheMetadata, Podcast, User
+    from app.services.podcast_cache import (
+        CACHE_KEY_BEST_PODCASTS,
+        cache_generations,
+        refresh_best_podcasts_cache,
+    )
+
+    scenarios = [s.strip() for s in args.scenarios.split(",") if s.strip()]
+    api = settings.API_V1_STR
+    run_id = uuid.uuid4().hex[:8]
+    emails = [f"bench-{run_id}-{i}@example.com" for i in range(args.auth_requests)]
+    rng = random.Random(args.seed)
+    results: dict[str, dict[str, float]] = {}
+
+    async def refresh(_: int) -> bool:
+        async with AsyncSession(async_engine, expire_on_commit=False) as session:
+            # Make every page stale so the whole catalog is ingested again
+            await session.exec(
+                delete(CacheMetadata).where(
+                    col(CacheMetadata.cache_key).startswith("best_podcasts:")
+                )
+            )
+            await session.commit()
+            return await refresh_best_podcasts_cache(
+                session, clients=app.state.upstream_clients
+            )
+
+    async def set_generation_age(hours: float) -> None:
+        # Backdating the overall key makes /popular serve stale data and trigger refreshes
+        async with AsyncSession(async_engine) as session:
+            await session.exec(
+                update(CacheMetadata)
+                .where(CacheMetadata.cache_key == CACHE_KEY_BEST_PODCASTS)
+                .values(last_fetched_at=datetime.utcnow() - timedelta(hours=hours))
+            )
+            await session.commit()
+        cache_generations.clear()
+
+    async with app.router.lifespan_context(app):
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(
+            transport=transport, base_url="http://bench"
+        ) as client:
+
+            async def get_ok(url: str, **params) -> bool:
+                return (await client.get(url, params=params)).status_code == 200
+
+            if "refresh" in scenarios:
+                results["refresh"] = await drive(refresh, args.refresh_runs, 1)
+
+            if "popular_fresh" in scenarios:
+                await set_generation_age(0)
+                results["popular_fresh"] = await drive(
+                    lambda _: get_ok(f"{api}/podcasts/popular", limit=20),
+                    args.requests,
+                    args.concurrency,
+                )
+
+            if "popular_stale" in scenarios:
+                await set_generation_age(25)
+                try:
+                    results["popular_stale"] = await drive(
+                        lambda _: get_ok(f"{api}/podcasts/popular", limit=20),
+                        args.requests,
+                        args.concurrency,
+                    )
+                finally:
+                    await set_generation_age(0)
+
+            if "podcast_detail" in scenarios:
+                async with AsyncSession(async_engine) as session:
+                    ids = (await session.exec(select(Podcast.id).limit(500))).all()
+                if ids:
+                    results["podcast_detail"] = await drive(
+                        lambda _: get_ok(f"{api}/podcasts/{rng.choice(ids)}"),
+                        args.requests,
+                        args.concurrency,
+                    )
+
+            if "signup" in scenarios or "login" in scenarios:
+
+                async def signup(i: int) -> bool:
+                    response = await client.post(
+                        f"{api}/auth/signup",
+                        json={"email": emails[i], "password": BENCH_PASSWORD},
+                    )
+                    return response.status_code == 200
+
+                results_signup = await drive(signup, len(emails), args.concurrency)
+                if "signup" in scenarios:
+                    results["signup"] = results_signup
+
+            if "login" in scenarios:
+
+                async def login(i: int) -> bool:
+                    response = await client.post(
+                        f"{api}/auth/login",
+                        json={"email": emails[i], "password": BENCH_PASSWORD},
+                    )
+                    return response.status_code == 200
+
+                results["login"] = await drive(login, len(emails), args.concurrency)
+
+        async with AsyncSession(async_engine) as session:
+            await session.exec(
+                delete(User).where(col(User.email).startswith(f"bench-{run_id}-"))
+            )
+            await session.commit()
+
+    return results
+
+
+def main() -> None:
+    args = parse_args()
+    profile = UpstreamProfile(
+        latency_ms=args.upstream_latency_ms,
+        jitter_ms=args.upstream_jitter_ms,
+        error_rate=args.upstream_error_rate,
+        seed=args.seed,
+    )
+    with (
+        serve(create_listen_notes_app(profile)) as listen_notes_url,
+        serve(create_itunes_app(profile)) as itunes_url,
+    ):
+        os.environ.update(
+            {
+                "LISTENOTES_API_KEY": "benchmark",
+                "LISTENOTES_BASE_URL": f"{listen_notes_url}/api/v2",
+                "ITUNES_BASE_URL": itunes_url,
+                "INGEST_GENRE_IDS": args.genres,
+                "INGEST_PAGES": str(args.pages),
+                # The suite drives refreshes itself
+                "CACHE_REFRESH_ENABLED": "false",
+            }
+        )
+        results = asyncio.run(run_suite(args))
+
+    print(format_table(results))
+    if args.output:
+        save_results(args.output, results)
+    if args.baseline:
+        regressions = compare(results, load_results(args.baseline), args.tolerance)
+        for regression in regressions:
+            print(f"REGRESSION {regression}")
+        if regressions:
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,243 @@
+import asyncio
+import uuid
+from datetime import timedelta
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+from fastapi import HTTPException
+
+from app import crud
+from app.api.deps import get_current_user
+from app.core import security
+from app.core.security import (
+    check_password,
+    create_access_token,
+    get_password_hash,
+    get_token_subject,
+    hash_password,
+    password_needs_rehash,
+)
+from app.models import User
+from app.services.user_invalidation import UserCacheInvalidator
+
+
+def make_session(user: User | None) -> AsyncMock:
+    session = AsyncMock()
+    session.add = MagicMock()
+    session.exec.return_value = MagicMock(first=MagicMock(return_value=user))
+    return session
+
+
+@pytest.fixture(autouse=True)
+def fast_rounds():
+    # Keep bcrypt cheap in tests; the target cost is 5, "old" hashes use 4
+    with patch("app.core.security.settings.PASSWORD_HASH_ROUNDS", 5):
+        yield
+
+
+@pytest.fixture(autouse=True)
+def clear_caches():
+    security.token_cache.clear()
+    crud.user_cache.clear()
+    yield
+    security.token_cache.clear()
+    crud.user_cache.clear()
+
+
+class TestPasswordHashing:
+    @pytest.mark.asyncio
+    async def test_hashes_with_configured_cost(self):
+        hashed = await hash_password("correct horse")
+
+        assert hashed.startswith("$2b$05$")
+        assert await check_password("correct horse", hashed)
+        assert not await check_password("wrong horse", hashed)
+
+    def test_needs_rehash_below_target_cost(self):
+        assert password_needs_rehash(get_password_hash("pw", rounds=4))
+        assert not password_needs_rehash(get_password_hash("pw", rounds=5))
+        assert not password_needs_rehash(get_password_hash("pw", rounds=6))
+
+    def test_unparseable_hash_needs_rehash(self):
+        assert password_needs_rehash("not-a-bcrypt-hash")
+
+
+class TestAuthenticate:
+    @pytest.mark.asyncio
+    async def test_rehashes_outdated_hash_on_login(self):
+        user = User(email="a@example.com", hashed_password=get_password_hash("password1", rounds=4))
+        session = make_session(user)
+
+        result = await crud.authenticate(session=session, email=user.email, password="password1")
+
+        assert result is user
+        assert user.hashed_password.startswith("$2b$05$")
+        assert await check_password("password1", user.hashed_password)
+        session.add.assert_called_once_with(user)
+        session.commit.assert_awaited_once()
+
+    @pytest.mark.asyncio
+    async def test_keeps_current_hash(self):
+        hashed = get_password_hash("password1")
+        user = User(email="a@example.com", hashed_password=hashed)
+        session = make_session(user)
+
+        assert await crud.authenticate(session=session, email=user.email, password="password1") is user
+        assert user.hashed_password == hashed
+        session.commit.assert_not_called()
+
+    @pytest.mark.asyncio
+    async def test_wrong_password_is_not_rehashed(self):
+        hashed = get_password_hash("password1", rounds=4)
+        user = User(email="a@example.com", hashed_password=hashed)
+        session = make_session(user)
+
+        assert await crud.authenticate(session=session, email=user.email, password="nope") is None
+        assert user.hashed_password == hashed
+        session.commit.assert_not_called()
+
+
+class TestGetTokenSubject:
+    def test_memoizes_verified_tokens(self):
+        user_id = str(uuid.uuid4())
+        token = create_access_token(user_id)
+
+        with patch("app.core.security.jwt.decode", wraps=security.jwt.decode) as mock_decode:
+            assert get_token_subject(token) == user_id
+            assert get_token_subject(token) == user_id
+
+        mock_decode.assert_called_once()
+
+    def test_invalid_tokens_are_not_cached(self):
+        assert get_token_subject("not.a.token") is None
+        assert len(security.token_cache) == 0
+
+    def test_expired_tokens_are_rejected(self):
+        token = create_access_token("someone", expires_delta=timedelta(seconds=-1))
+
+        assert get_token_subject(token) is None
+
+
+class TestGetCurrentUser:
+    @pytest.mark.asyncio
+    async def test_second_request_skips_database(self):
+        user = User(id=uuid.uuid4(), email="a@example.com", hashed_password="x")
+        token = create_access_token(str(user.id))
+        session = AsyncMock()
+        session.get.return_value = user
+        session.merge.return_value = user
+
+        assert await get_current_user(session, token) is user
+        assert await get_current_user(session, token) is user
+
+        session.get.assert_awaited_once()
+        merged = session.merge.call_args
+        assert merged.args[0] is not user
+        assert merged.args[0].id == user.id
+        assert merged.kwargs == {"load": False}
+
+    @pytest.mark.asyncio
+    async def test_update_invalidates_cached_user(self):
+        user = User(id=uuid.uuid4(), email="a@example.com", hashed_password="x")
+        token = create_access_token(str(user.id))
+        session = AsyncMock()
+        session.add = MagicMock()
+        session.get.return_value = user
+        await get_current_user(session, token)
+
+        await crud.update_user(session=session, db_user=user, user_in={"is_active": False})
+        with pytest.raises(HTTPException) as exc_info:
+            await get_current_user(session, token)
+
+        assert exc_info.value.detail == "Inactive user"
+        assert session.get.await_count == 2
+        session.merge.assert_not_called()
+        notify = str(session.exec.call_args.args[0])
+        assert "pg_notify" in notify
+        session.commit.assert_awaited_once()
+
+    @pytest.mark.asyncio
+    async def test_rejects_invalid_token(self):
+        with pytest.raises(HTTPException) as exc_info:
+            await get_current_user(AsyncMock(), "garbage")
+
+        assert exc_info.value.status_code == 401
+
+
+class FakeNotify:
+    def __init__(self, payload: str):
+        self.payload = payload
+
+
+class FakeListenConnection:
+    def __init__(self, payloads: list[str]):
+        self.payloads = payloads
+        self.executed: list[str] = []
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        return False
+
+    async def execute(self, query: str):
+        self.executed.append(query)
+
+    async def notifies(self):
+        for payload in self.payloads:
+            yield FakeNotify(payload)
+        # Keep listening, like a live connection
+        await asyncio.Event().wait()
+
+
+def cached_user() -> User:
+    user = User(id=uuid.uuid4(), email=f"{uuid.uuid4()}@example.com", hashed_password="x")
+    crud.user_cache.set(str(user.id), user)
+    return user
+
+
+class TestUserCacheInvalidator:
+    @pytest.mark.asyncio
+    async def test_drops_users_changed_by_other_workers(self):
+        changed, other = cached_user(), cached_user()
+        conn = FakeListenConnection([])
+
+        async def connect():
+            # Anything cached before listening could have missed a notification
+            assert crud.user_cache.get(str(changed.id)) is changed
+            conn.payloads.append(str(changed.id))
+            return conn
+
+        invalidator = UserCacheInvalidator(connect=connect)
+        crud.user_cache.set(str(other.id), other)
+        await invalidator.start()
+        await asyncio.sleep(0.01)
+        crud.user_cache.set(str(other.id), other)
+        await asyncio.sleep(0.01)
+        await invalidator.stop()
+
+        assert conn.executed == [f"LISTEN {crud.USER_INVALIDATION_CHANNEL}"]
+        assert crud.user_cache.get(str(changed.id)) is None
+        assert crud.user_cache.get(str(other.id)) is other
+
+    @pytest.mark.asyncio
+    async def test_reconnects_and_clears_cache_after_failure(self):
+        attempts = 0
+        conn = FakeListenConnection([])
+
+        async def connect():
+            nonlocal attempts
+            attempts += 1
+            if attempts == 1:
+                raise OSError("connection refused")
+            return conn
+
+        invalidator = UserCacheInvalidator(connect=connect, retry_interval=0)
+        await invalidator.start()
+        user = cached_user()
+        await asyncio.sleep(0.01)
+        await invalidator.stop()
+
+        assert attempts == 2
+        assert crud.user_cache.get(str(user.id)) is None
+        assert not invalidator.running
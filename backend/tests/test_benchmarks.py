@@ -0,0 +1,128 @@
+import httpx
+import pytest
+
+from app.core.circuit import CircuitBreaker
+from app.services.itunes import ITunesArtworkService
+from app.services.listenotes import ListenNotesService
+from benchmarks.fake_upstreams import (
+    UpstreamProfile,
+    create_itunes_app,
+    create_listen_notes_app,
+    itunes_id_for,
+    serve,
+)
+from benchmarks.stats import compare, percentile, summarize
+
+INSTANT = UpstreamProfile(latency_ms=0, jitter_ms=0)
+
+
+def asgi_client(app) -> httpx.AsyncClient:
+    return httpx.AsyncClient(transport=httpx.ASGITransport(app=app))
+
+
+class TestFakeUpstreams:
+    @pytest.mark.asyncio
+    async def test_listen_notes_stand_in_parses_with_real_service(self):
+        service = ListenNotesService(
+            api_key="bench",
+            client=asgi_client(create_listen_notes_app(INSTANT, podcasts_per_page=10)),
+            breaker=CircuitBreaker(failure_threshold=10, reset_timeout=60),
+        )
+
+        podcasts = await service.fetch_best_podcasts(genre_id=67, page=2)
+        await service.close()
+
+        assert len(podcasts) == 10
+        assert podcasts[0].itunes_id is None
+        assert podcasts[1].itunes_id == str(itunes_id_for(67, 2, 1))
+        assert podcasts[1].genre_ids == "67,144"
+
+    @pytest.mark.asyncio
+    async def test_itunes_stand_in_parses_with_real_service(self):
+        service = ITunesArtworkService(requests_per_second=1000)
+        await service.client.aclose()
+        service.client = asgi_client(create_itunes_app(INSTANT))
+
+        by_id = await service.lookup_many(["1000101", "1000102"])
+        by_name = await service.search_podcast("Benchmark Podcast")
+        await service.close()
+
+        assert set(by_id) == {"1000101", "1000102"}
+        assert "1000101" in by_id["1000101"]["sm"]
+        assert by_name is not None
+
+    @pytest.mark.asyncio
+    async def test_error_rate_returns_service_unavailable(self):
+        app = create_listen_notes_app(
+            UpstreamProfile(latency_ms=0, jitter_ms=0, error_rate=1)
+        )
+        async with asgi_client(app) as client:
+            response = await client.get("http://upstream/api/v2/best_podcasts")
+
+        assert response.status_code == 503
+
+    def test_serve_runs_app_on_local_port(self):
+        with serve(create_itunes_app(INSTANT)) as base_url:
+            response = httpx.get(f"{base_url}/lookup", params={"id": "42"})
+
+        assert response.json()["results"][0]["collectionId"] == 42
+
+
+class TestStats:
+    def test_percentile_uses_nearest_rank(self):
+        values = [float(i) for i in range(1, 101)]
+
+        assert percentile(values, 0.5) == 50
+        assert percentile(values, 0.99) == 99
+        assert percentile([], 0.5) == 0
+
+    def test_summarize(self):
+        result = summarize([0.01, 0.02, 0.03, 0.04], elapsed=2.0, errors=1)
+
+        assert result["operations"] == 4
+        assert result["errors"] == 1
+        assert result["throughput_per_second"] == 2.0
+        assert result["p50_ms"] == pytest.approx(20)
+        assert result["p99_ms"] == pytest.approx(40)
+
+    def test_compare_flags_regressions_beyond_tolerance(self):
+        baseline = {
+            "popular": {
+                "throughput_per_second": 100,
+                "p50_ms": 10,
+                "p95_ms": 20,
+                "p99_ms": 30,
+            },
+            "login": {
+                "throughput_per_second": 10,
+                "p50_ms": 100,
+                "p95_ms": 200,
+                "p99_ms": 300,
+            },
+        }
+        results = {
+            "popular": {
+                "throughput_per_second": 70,
+                "p50_ms": 11,
+                "p95_ms": 30,
+                "p99_ms": 30,
+            },
+            "login": {
+                "throughput_per_second": 20,
+                "p50_ms": 50,
+                "p95_ms": 100,
+                "p99_ms": 150,
+            },
+            "signup": {
+                "throughput_per_second": 1,
+                "p50_ms": 1,
+                "p95_ms": 1,
+                "p99_ms": 1,
+            },
+        }
+
+        regressions = compare(results, baseline, tolerance=0.2)
+
+        assert len(regressions) == 2
+        assert regressions[0].startswith("popular.throughput_per_second")
+        assert regressions[1].startswith("popular.p95_ms")
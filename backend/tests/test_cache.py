@@ -0,0 +1,71 @@
+from unittest.mock import patch
+
+import pytest
+
+from app.core.cache import TTLCache
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+@pytest.fixture
+def clock():
+    clock = FakeClock()
+    with patch("app.core.cache.time.monotonic", clock):
+        yield clock
+
+
+class TestTTLCache:
+    def test_entries_expire_after_ttl(self, clock):
+        cache = TTLCache(maxsize=10, ttl=60)
+        cache.set("a", 1)
+
+        clock.now += 59
+        assert cache.get("a") == 1
+        clock.now += 1
+        assert cache.get("a") is None
+        assert len(cache) == 0
+
+    def test_per_entry_ttl_is_capped_by_default(self, clock):
+        cache = TTLCache(maxsize=10, ttl=60)
+        cache.set("short", 1, ttl=5)
+        cache.set("long", 2, ttl=600)
+
+        clock.now += 5
+        assert cache.get("short") is None
+        clock.now += 55
+        assert cache.get("long") is None
+
+    def test_non_positive_ttl_is_not_stored(self, clock):
+        cache = TTLCache(maxsize=10, ttl=60)
+        cache.set("a", 1)
+        cache.set("a", 2, ttl=-1)
+
+        assert cache.get("a") is None
+
+    def test_evicts_least_recently_used(self, clock):
+        cache = TTLCache(maxsize=2, ttl=60)
+        cache.set("a", 1)
+        cache.set("b", 2)
+        cache.get("a")
+        cache.set("c", 3)
+
+        assert cache.get("a") == 1
+        assert cache.get("b") is None
+        assert cache.get("c") == 3
+
+    def test_pop_and_clear(self, clock):
+        cache = TTLCache(maxsize=10, ttl=60)
+        cache.set("a", 1)
+        cache.set("b", 2)
+
+        cache.pop("a")
+        cache.pop("missing")
+        assert cache.get("a") is None
+        cache.clear()
+        assert len(cache) == 0
@@ -0,0 +1,52 @@
+import pytest
+
+from app.core.circuit import CircuitBreaker, CircuitOpenError
+
+
+class TestCircuitBreaker:
+    def test_opens_after_consecutive_failures(self):
+        breaker = CircuitBreaker(failure_threshold=3, reset_timeout=60)
+        for _ in range(3):
+            breaker.before_call()
+            breaker.record_failure()
+
+        assert breaker.state == "open"
+        with pytest.raises(CircuitOpenError):
+            breaker.before_call()
+
+    def test_success_resets_failure_count(self):
+        breaker = CircuitBreaker(failure_threshold=2, reset_timeout=60)
+        breaker.record_failure()
+        breaker.record_success()
+        breaker.record_failure()
+
+        assert breaker.state == "closed"
+
+    def test_allows_single_trial_after_reset_timeout(self):
+        breaker = CircuitBreaker(failure_threshold=1, reset_timeout=0)
+        breaker.record_failure()
+        assert breaker.state == "half_open"
+
+        breaker.before_call()
+        with pytest.raises(CircuitOpenError):
+            breaker.before_call()
+
+        breaker.record_success()
+        assert breaker.state == "closed"
+        breaker.before_call()
+
+    def test_failed_trial_reopens(self):
+        breaker = CircuitBreaker(failure_threshold=5, reset_timeout=60)
+        for _ in range(5):
+            breaker.record_failure()
+        breaker.reset_timeout = 0
+        breaker.before_call()
+
+        breaker.reset_timeout = 60
+        breaker.record_failure()
+
+        assert breaker.state == "open"
+
+    def test_rejects_invalid_threshold(self):
+        with pytest.raises(ValueError):
+            CircuitBreaker(failure_threshold=0, reset_timeout=1)
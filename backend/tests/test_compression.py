@@ -0,0 +1,154 @@
+import gzip
+from unittest.mock import patch
+
+import pytest
+from fastapi import FastAPI, Response
+from fastapi.responses import StreamingResponse
+from fastapi.testclient import TestClient
+
+from app.api import compression
+from app.api.compression import CompressionMiddleware, negotiate_encoding
+from app.core.cache import TTLCache
+from app.core.config import settings
+from app.main import app
+
+BODY = b'{"items": "' + b"podcast " * 500 + b'"}'
+
+
+class FakeBrotli:
+    @staticmethod
+    def compress(body: bytes, quality: int) -> bytes:
+        return b"br:" + body[:10]
+
+
+@pytest.fixture
+def cache():
+    return TTLCache(maxsize=8, ttl=60)
+
+
+@pytest.fixture
+def client(cache):
+    test_app = FastAPI()
+    test_app.add_middleware(CompressionMiddleware, minimum_size=100, cache=cache)
+
+    @test_app.get("/large")
+    def large():
+        return Response(BODY, media_type="application/json", headers={"ETag": '"gen-1"'})
+
+    @test_app.get("/uncached")
+    def uncached():
+        return Response(BODY, media_type="application/json")
+
+    @test_app.get("/small")
+    def small():
+        return Response(b'{"ok": true}', media_type="application/json")
+
+    @test_app.get("/image")
+    def image():
+        return Response(BODY, media_type="image/png")
+
+    @test_app.get("/encoded")
+    def encoded():
+        return Response(BODY, media_type="application/json", headers={"Content-Encoding": "identity"})
+
+    @test_app.get("/not-modified")
+    def not_modified():
+        return Response(status_code=304, headers={"ETag": '"gen-1"'})
+
+    @test_app.get("/stream")
+    def stream():
+        return StreamingResponse(iter([BODY, BODY]), media_type="application/json")
+
+    return TestClient(test_app)
+
+
+class TestNegotiateEncoding:
+    def test_prefers_gzip_without_brotli(self):
+        with patch.object(compression, "brotli", None):
+            assert negotiate_encoding("gzip, deflate, br") == "gzip"
+
+    def test_prefers_brotli_when_available(self):
+        with patch.object(compression, "brotli", FakeBrotli):
+            assert negotiate_encoding("gzip, deflate, br") == "br"
+            assert negotiate_encoding("gzip, br;q=0.5") == "gzip"
+
+    def test_respects_q_values_and_wildcard(self):
+        with patch.object(compression, "brotli", None):
+            assert negotiate_encoding("gzip;q=0") is None
+            assert negotiate_encoding("*") == "gzip"
+            assert negotiate_encoding("*, gzip;q=0") is None
+            assert negotiate_encoding("identity") is None
+            assert negotiate_encoding("") is None
+            assert negotiate_encoding("gzip;q=bogus") is None
+
+
+class TestCompressionMiddleware:
+    def test_compresses_large_json(self, client):
+        response = client.get("/uncached", headers={"Accept-Encoding": "gzip"})
+
+        assert response.headers["content-encoding"] == "gzip"
+        assert int(response.headers["content-length"]) < len(BODY)
+        assert response.headers["vary"] == "Accept-Encoding"
+        assert response.content == BODY
+
+    def test_leaves_small_bodies_uncompressed(self, client):
+        response = client.get("/small", headers={"Accept-Encoding": "gzip"})
+
+        assert "content-encoding" not in response.headers
+        assert response.headers["vary"] == "Accept-Encoding"
+
+    def test_identity_when_client_does_not_accept(self, client):
+        response = client.get("/large", headers={"Accept-Encoding": "identity"})
+
+        assert "content-encoding" not in response.headers
+        assert response.headers["etag"] == '"gen-1"'
+        assert response.headers["vary"] == "Accept-Encoding"
+        assert response.content == BODY
+
+    def test_skips_incompressible_encoded_and_streamed_bodies(self, client):
+        for path in ("/image", "/encoded", "/stream"):
+            response = client.get(path, headers={"Accept-Encoding": "gzip"})
+
+            assert response.headers.get("content-encoding") in (None, "identity")
+            assert "vary" not in response.headers
+
+    def test_reuses_compressed_body_per_etag(self, client, cache):
+        with patch.object(compression.gzip, "compress", wraps=gzip.compress) as compress:
+            first = client.get("/large", headers={"Accept-Encoding": "gzip"})
+            second = client.get("/large", headers={"Accept-Encoding": "gzip"})
+            client.get("/uncached", headers={"Accept-Encoding": "gzip"})
+            client.get("/uncached", headers={"Accept-Encoding": "gzip"})
+
+        assert compress.call_count == 3
+        assert len(cache) == 1
+        assert first.content == second.content == BODY
+        # The compressed bytes differ from the identity representation
+        assert first.headers["etag"] == 'W/"gen-1"'
+
+    def test_caches_each_encoding_separately(self, client, cache):
+        with patch.object(compression, "brotli", FakeBrotli):
+            client.get("/large", headers={"Accept-Encoding": "gzip"})
+            response = client.get("/large", headers={"Accept-Encoding": "br"})
+
+        assert response.headers["content-encoding"] == "br"
+        assert set(cache._entries) == {('"gen-1"', "gzip"), ('"gen-1"', "br")}
+
+    def test_not_modified_matches_compressed_response(self, client):
+        compressed = client.get("/large", headers={"Accept-Encoding": "gzip"})
+        response = client.get("/not-modified", headers={"Accept-Encoding": "gzip"})
+
+        assert response.status_code == 304
+        assert response.headers["etag"] == compressed.headers["etag"] == 'W/"gen-1"'
+        assert response.headers["vary"] == "Accept-Encoding"
+        assert response.content == b""
+
+    def test_not_modified_keeps_strong_etag_for_identity(self, client):
+        response = client.get("/not-modified", headers={"Accept-Encoding": "identity"})
+
+        assert response.headers["etag"] == '"gen-1"'
+        assert response.headers["vary"] == "Accept-Encoding"
+
+    def test_installed_on_app(self):
+        installed = any(m.cls is CompressionMiddleware for m in app.user_middleware)
+
+        assert installed == settings.COMPRESSION_ENABLED
@@ -0,0 +1,108 @@
+import threading
+from unittest.mock import patch
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine, exc, text
+from sqlalchemy.pool import QueuePool
+
+from app.core.config import settings
+from app.core.db import PoolMetrics, _InstrumentedPoolMixin, pool_stats
+from app.core.metrics import Histogram
+from app.main import app
+
+
+class TestHistogram:
+    def test_counts_are_cumulative(self):
+        histogram = Histogram(buckets=(0.1, 1.0))
+        for value in (0.05, 0.1, 0.5, 5.0):
+            histogram.observe(value)
+
+        snapshot = histogram.snapshot()
+
+        assert snapshot["buckets"] == {"0.1": 2, "1.0": 3, "+Inf": 4}
+        assert snapshot["count"] == 4
+        assert snapshot["sum"] == pytest.approx(5.65)
+
+
+class SQLitePool(_InstrumentedPoolMixin, QueuePool):
+    metrics = PoolMetrics()
+
+
+@pytest.fixture
+def sqlite_engine(tmp_path):
+    SQLitePool.metrics = PoolMetrics()
+    engine = create_engine(
+        f"sqlite:///{tmp_path / 'pool.db'}",
+        poolclass=SQLitePool,
+        pool_size=1,
+        max_overflow=0,
+        pool_timeout=0.05,
+    )
+    yield engine
+    engine.dispose()
+
+
+class TestInstrumentedPool:
+    def test_records_checkouts_and_occupancy(self, sqlite_engine):
+        with sqlite_engine.connect() as conn:
+            conn.execute(text("SELECT 1"))
+            stats = pool_stats(sqlite_engine.pool)
+            assert stats["checked_out"] == 1
+            assert stats["overflow"] == 0
+
+        stats = pool_stats(sqlite_engine.pool)
+        assert stats["checked_out"] == 0
+        assert stats["checkout_wait_seconds"]["count"] == 1
+
+    def test_records_checkout_timeouts(self, sqlite_engine):
+        with sqlite_engine.connect():
+            errors = []
+
+            def checkout():
+                try:
+                    sqlite_engine.connect()
+                except exc.TimeoutError as e:
+                    errors.append(e)
+
+            thread = threading.Thread(target=checkout)
+            thread.start()
+            thread.join()
+
+        assert len(errors) == 1
+        stats = pool_stats(sqlite_engine.pool)
+        assert stats["checkout_timeouts"] == 1
+        assert stats["checkout_wait_seconds"]["count"] == 2
+
+    def test_metrics_survive_dispose(self, sqlite_engine):
+        with sqlite_engine.connect():
+            pass
+        sqlite_engine.dispose()
+
+        assert pool_stats(sqlite_engine.pool)["checkout_wait_seconds"]["count"] == 1
+
+
+DB_POOL_URL = f"{settings.API_V1_STR}/internal/db-pool"
+
+
+class TestDbPoolEndpoint:
+    def test_reports_both_engines(self):
+        with patch.object(settings, "INTERNAL_API_TOKEN", "s3cret"):
+            response = TestClient(app).get(DB_POOL_URL, headers={"X-Internal-Token": "s3cret"})
+
+        assert response.status_code == 200
+        body = response.json()
+        for name in ("async", "sync"):
+            assert body[name]["size"] == settings.DB_POOL_SIZE
+            assert "checkout_wait_seconds" in body[name]
+
+    def test_requires_internal_token(self):
+        client = TestClient(app)
+
+        with patch.object(settings, "INTERNAL_API_TOKEN", "s3cret"):
+            anonymous = client.get(DB_POOL_URL)
+            wrong = client.get(DB_POOL_URL, headers={"X-Internal-Token": "guess"})
+        with patch.object(settings, "INTERNAL_API_TOKEN", None):
+            unconfigured = client.get(DB_POOL_URL, headers={"X-Internal-Token": ""})
+
+        assert anonymous.status_code == wrong.status_code == unconfigured.status_code == 403
@@ -1,7 +1,14 @@
+import asyncio
+import time
+
 import pytest
 from unittest.mock import AsyncMock, MagicMock, patch
 
-from app.services.itunes import ITunesArtworkService
+from app.core.ratelimit import TokenBucket
+from sqlalchemy.dialects import postgresql
+
+from app.services.artwork_cache import ArtworkCacheStore, itunes_id_key, title_key
+from app.services.itunes import ITUNES_LOOKUP_BATCH_SIZE, ITunesArtworkService
 
 
 class TestBuildArtworkUrls:
@@ -147,3 +154,205 @@ class TestGetArtworkUrls:
             result = await service.get_artwork_urls(itunes_id="123", title="Test")
 
         assert result is None
+
+
+class TestLookupMany:
+    @pytest.mark.asyncio
+    async def test_maps_results_by_collection_id(self):
+        service = ITunesArtworkService()
+        mock_response = MagicMock()
+        mock_response.status_code = 200
+        mock_response.json.return_value = {
+            "resultCount": 2,
+            "results": [
+                {"collectionId": 222, "artworkUrl100": "https://is1-ssl.mzstatic.com/image/thumb/Podcasts/v4/two/100x100bb.jpg"},
+                {"collectionId": 111, "artworkUrl100": "https://is1-ssl.mzstatic.com/image/thumb/Podcasts/v4/one/100x100bb.jpg"},
+            ],
+        }
+
+        with patch.object(service.client, "get", new_callable=AsyncMock, return_value=mock_response) as mock_get:
+            result = await service.lookup_many(["111", "222", "333"])
+
+        mock_get.assert_called_once()
+        assert mock_get.call_args.kwargs["params"] == {"id": "111,222,333"}
+        assert set(result) == {"111", "222", "333"}
+        assert result["333"] is None
+        assert "one" in result["111"]["sm"]
+        assert "two" in result["222"]["sm"]
+
+    @pytest.mark.asyncio
+    async def test_chunks_ids_into_batches(self):
+        service = ITunesArtworkService()
+        mock_response = MagicMock()
+        mock_response.status_code = 200
+        mock_response.json.return_value = {"resultCount": 0, "results": []}
+        ids = [str(i) for i in range(ITUNES_LOOKUP_BATCH_SIZE * 2 + 1)]
+
+        with patch.object(service.client, "get", new_callable=AsyncMock, return_value=mock_response) as mock_get:
+            await service.lookup_many(ids + ids[:5])
+
+        assert mock_get.call_count == 3
+        sent = [call.kwargs["params"]["id"].split(",") for call in mock_get.call_args_list]
+        assert sorted(i for batch in sent for i in batch) == sorted(ids)
+
+    @pytest.mark.asyncio
+    async def test_returns_empty_on_http_error(self):
+        service = ITunesArtworkService()
+
+        with patch.object(service.client, "get", new_callable=AsyncMock, side_effect=Exception("timeout")):
+            result = await service.lookup_many(["111"])
+
+        assert result == {}
+
+
+class TestGetArtworkUrlsMany:
+    @pytest.mark.asyncio
+    async def test_searches_only_lookup_misses(self):
+        service = ITunesArtworkService()
+        found = {"1": {"sm": "one", "md": "one", "lg": "one"}}
+
+        async def fake_search(title):
+            return {"sm": title, "md": title, "lg": title} if title != "Missing" else None
+
+        with patch.object(service, "lookup_many", return_value=found) as mock_lookup, \
+             patch.object(service, "_search", side_effect=fake_search) as mock_search:
+            results = await service.get_artwork_urls_many(
+                [("1", "First"), ("2", "Second"), (None, "Missing")]
+            )
+
+        assert list(mock_lookup.call_args.args[0]) == ["1", "2"]
+        assert sorted(call.args[0] for call in mock_search.call_args_list) == ["Missing", "Second"]
+        assert [r and r["sm"] for r in results] == ["one", "Second", None]
+
+    @pytest.mark.asyncio
+    async def test_limits_search_concurrency(self):
+        service = ITunesArtworkService(max_concurrency=3)
+        in_flight = 0
+        peak = 0
+
+        async def fake_search(title):
+            nonlocal in_flight, peak
+            in_flight += 1
+            peak = max(peak, in_flight)
+            await asyncio.sleep(0.01)
+            in_flight -= 1
+            return None
+
+        with patch.object(service, "lookup_many", return_value={}), \
+             patch.object(service, "_search", side_effect=fake_search):
+            await service.get_artwork_urls_many([(str(i), f"Pod {i}") for i in range(10)])
+
+        assert peak == 3
+
+    @pytest.mark.asyncio
+    async def test_upstream_requests_are_rate_limited(self):
+        service = ITunesArtworkService(requests_per_second=100.0, max_concurrency=10)
+        service.rate_limiter = TokenBucket(rate=100.0, capacity=1)
+        mock_response = MagicMock()
+        mock_response.status_code = 200
+        mock_response.json.return_value = {"resultCount": 0, "results": []}
+
+        start = time.monotonic()
+        with patch.object(service.client, "get", new_callable=AsyncMock, return_value=mock_response) as mock_get:
+            await service.get_artwork_urls_many([(None, f"Pod {i}") for i in range(5)])
+
+        assert mock_get.call_count == 5
+        assert time.monotonic() - start >= 0.04
+
+
+class FakeArtworkCache:
+    def __init__(self, entries=None):
+        self.entries = dict(entries or {})
+        self.puts = []
+
+    async def get_many(self, keys):
+        return {key: self.entries[key] for key in keys if key in self.entries}
+
+    async def put_many(self, entries):
+        self.puts.append(dict(entries))
+        self.entries.update(entries)
+
+
+class TestArtworkCacheStore:
+    @pytest.mark.asyncio
+    async def test_upserts_in_cache_key_order(self):
+        session = MagicMock()
+        session.exec = AsyncMock()
+        session.commit = AsyncMock()
+        session_factory = MagicMock()
+        session_factory.return_value.__aenter__ = AsyncMock(return_value=session)
+        session_factory.return_value.__aexit__ = AsyncMock(return_value=False)
+        artwork = {"sm": "s", "md": "m", "lg": "l"}
+
+        with patch("app.services.artwork_cache.AsyncSession", session_factory):
+            await ArtworkCacheStore().put_many({
+                title_key("Pod"): None,
+                itunes_id_key("2"): artwork,
+                itunes_id_key("1"): None,
+            })
+
+        params = session.exec.call_args.args[0].compile(dialect=postgresql.dialect()).params
+        assert [params[f"cache_key_m{i}"] for i in range(3)] == [
+            itunes_id_key("1"),
+            itunes_id_key("2"),
+            title_key("Pod"),
+        ]
+        session.commit.assert_awaited_once()
+
+
+class TestArtworkCache:
+    @pytest.mark.asyncio
+    async def test_cached_entries_skip_upstream(self):
+        artwork = {"sm": "s", "md": "m", "lg": "l"}
+        cache = FakeArtworkCache({
+            itunes_id_key("1"): artwork,
+            itunes_id_key("2"): None,
+            title_key("Second Pod"): None,
+        })
+        service = ITunesArtworkService(cache=cache)
+
+        with patch.object(service.client, "get", new_callable=AsyncMock) as mock_get:
+            results = await service.get_artwork_urls_many([("1", "First"), ("2", "Second Pod")])
+
+        mock_get.assert_not_called()
+        assert results == [artwork, None]
+        assert cache.puts == []
+
+    @pytest.mark.asyncio
+    async def test_stores_hits_and_negative_results(self):
+        cache = FakeArtworkCache()
+        service = ITunesArtworkService(cache=cache)
+        artwork = {"sm": "s", "md": "m", "lg": "l"}
+
+        with patch.object(service, "lookup_many", return_value={"1": artwork, "2": None}), \
+             patch.object(service, "_search", return_value=None):
+            results = await service.get_artwork_urls_many([("1", "First"), ("2", "  second   POD ")])
+
+        assert results == [artwork, None]
+        assert cache.entries == {
+            itunes_id_key("1"): artwork,
+            itunes_id_key("2"): None,
+            title_key("Second Pod"): None,
+        }
+
+    @pytest.mark.asyncio
+    async def test_does_not_cache_failed_requests(self):
+        cache = FakeArtworkCache()
+        service = ITunesArtworkService(cache=cache)
+
+        with patch.object(service.client, "get", new_callable=AsyncMock, side_effect=Exception("timeout")):
+            results = await service.get_artwork_urls_many([("1", "First"), (None, "Second")])
+
+        assert results == [None, None]
+        assert cache.entries == {}
+
+    @pytest.mark.asyncio
+    async def test_single_lookup_checks_cache_first(self):
+        artwork = {"sm": "s", "md": "m", "lg": "l"}
+        service = ITunesArtworkService(cache=FakeArtworkCache({title_key("Test"): artwork}))
+
+        with patch.object(service.client, "get", new_callable=AsyncMock) as mock_get:
+            result = await service.get_artwork_urls(itunes_id=None, title="Test")
+
+        mock_get.assert_not_called()
+        assert result == artwork
@@ -0,0 +1,176 @@
+import asyncio
+
+import httpx
+import pytest
+
+from app.core.circuit import CircuitBreaker
+from app.services.listenotes import (
+    LISTENNOTES_API_URL,
+    LISTENNOTES_TEST_API_URL,
+    ListenNotesService,
+)
+
+BEST_PODCASTS = {
+    "podcasts": [
+        {
+            "id": "abc",
+            "title": "Show",
+            "publisher": "Pub",
+            "image": "https://cdn.example.com/abc.jpg",
+            "rss": "Please upgrade to PRO plan to see this field",
+            "total_episodes": 12,
+            "listen_score": "Please upgrade",
+            "genre_ids": [67, 144],
+            "itunes_id": 123,
+        }
+    ]
+}
+
+
+def make_service(handler, breaker=None, **kwargs) -> ListenNotesService:
+    client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+    return ListenNotesService(
+        api_key=kwargs.pop("api_key", "key"),
+        client=client,
+        breaker=breaker or CircuitBreaker(failure_threshold=10, reset_timeout=60),
+        retry_max_wait=0,
+        **kwargs,
+    )
+
+
+class TestFetchBestPodcasts:
+    @pytest.mark.asyncio
+    async def test_parses_podcasts(self):
+        requests = []
+
+        def handler(request):
+            requests.append(request)
+            return httpx.Response(200, json=BEST_PODCASTS)
+
+        service = make_service(handler)
+        podcasts = await service.fetch_best_podcasts(genre_id=67, page=2)
+
+        assert len(podcasts) == 1
+        podcast = podcasts[0]
+        assert podcast.listenotes_id == "abc"
+        assert podcast.genre_ids == "67,144"
+        assert podcast.itunes_id == "123"
+        assert podcast.listen_score is None
+        assert podcast.feed_url is None
+        assert str(requests[0].url).startswith(f"{LISTENNOTES_API_URL}/best_podcasts")
+        assert requests[0].url.params["genre_id"] == "67"
+        assert requests[0].url.params["page"] == "2"
+        assert requests[0].headers["X-ListenAPI-Key"] == "key"
+
+    @pytest.mark.asyncio
+    async def test_uses_mock_server_without_api_key(self):
+        urls = []
+
+        def handler(request):
+            urls.append(str(request.url))
+            return httpx.Response(200, json={"podcasts": []})
+
+        service = make_service(handler, api_key=None)
+        assert await service.fetch_best_podcasts() == []
+        assert urls[0].startswith(LISTENNOTES_TEST_API_URL)
+
+    @pytest.mark.asyncio
+    async def test_retries_transient_errors(self):
+        responses = iter([
+            httpx.ConnectError("refused"),
+            httpx.Response(503),
+            httpx.Response(200, json=BEST_PODCASTS),
+        ])
+
+        def handler(request):
+            response = next(responses)
+            if isinstance(response, Exception):
+                raise response
+            return response
+
+        service = make_service(handler)
+        podcasts = await service.fetch_best_podcasts()
+
+        assert len(podcasts) == 1
+        assert service.breaker.state == "closed"
+
+    @pytest.mark.asyncio
+    async def test_gives_up_after_max_attempts(self):
+        calls = 0
+
+        def handler(request):
+            nonlocal calls
+            calls += 1
+            return httpx.Response(429)
+
+        service = make_service(handler, retry_attempts=3)
+
+        assert await service.fetch_best_podcasts() is None
+        assert calls == 3
+
+    @pytest.mark.asyncio
+    async def test_does_not_retry_client_errors(self):
+        calls = 0
+
+        def handler(request):
+            nonlocal calls
+            calls += 1
+            return httpx.Response(401)
+
+        service = make_service(handler)
+
+        assert await service.fetch_best_podcasts() is None
+        assert calls == 1
+        assert service.breaker.state == "closed"
+
+    @pytest.mark.asyncio
+    async def test_open_circuit_fails_fast(self):
+        calls = 0
+
+        def handler(request):
+            nonlocal calls
+            calls += 1
+            raise httpx.ReadTimeout("timed out")
+
+        breaker = CircuitBreaker(failure_threshold=2, reset_timeout=60)
+        service = make_service(handler, breaker=breaker, retry_attempts=5)
+
+        assert await service.fetch_best_podcasts() is None
+        assert calls == 2
+        assert breaker.state == "open"
+
+        assert await service.fetch_best_podcasts() is None
+        assert calls == 2
+
+    @pytest.mark.asyncio
+    async def test_unexpected_error_releases_half_open_trial(self):
+        def handler(request):
+            raise httpx.DecodingError("bad gzip stream")
+
+        breaker = CircuitBreaker(failure_threshold=1, reset_timeout=0)
+        breaker.record_failure()
+        service = make_service(handler, breaker=breaker, retry_attempts=1)
+
+        assert await service.fetch_best_podcasts() is None
+        # The trial ended, so the next one is let through
+        breaker.before_call()
+
+    @pytest.mark.asyncio
+    async def test_cancelled_trial_releases_half_open_trial(self):
+        started = asyncio.Event()
+
+        async def handler(request):
+            started.set()
+            await asyncio.sleep(10)
+
+        breaker = CircuitBreaker(failure_threshold=1, reset_timeout=0)
+        breaker.record_failure()
+        service = make_service(handler, breaker=breaker)
+
+        task = asyncio.create_task(service.fetch_best_podcasts())
+        await started.wait()
+        task.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await task
+
+        breaker.before_call()
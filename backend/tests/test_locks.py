@@ -0,0 +1,47 @@
+from contextlib import asynccontextmanager
+from unittest.mock import AsyncMock, patch
+
+import pytest
+
+from app.core.locks import advisory_lock
+
+
+def fake_engine(conn: AsyncMock):
+    @asynccontextmanager
+    async def connect():
+        yield conn
+
+    engine = AsyncMock()
+    engine.connect = connect
+    return engine
+
+
+def executed(conn: AsyncMock) -> list[str]:
+    return [str(call.args[0]) for call in conn.execute.call_args_list]
+
+
+class TestAdvisoryLock:
+    @pytest.mark.asyncio
+    async def test_waiting_lifts_statement_timeout_for_the_transaction(self):
+        conn = AsyncMock()
+
+        with patch("app.core.locks.async_engine", fake_engine(conn)):
+            async with advisory_lock("key", wait=True) as acquired:
+                assert acquired
+
+        assert executed(conn) == [
+            "SET LOCAL statement_timeout = 0",
+            "SELECT pg_advisory_lock(:key)",
+            "SELECT pg_advisory_unlock(:key)",
+        ]
+
+    @pytest.mark.asyncio
+    async def test_try_lock_keeps_statement_timeout(self):
+        conn = AsyncMock()
+        conn.execute.return_value.scalar = lambda: False
+
+        with patch("app.core.locks.async_engine", fake_engine(conn)):
+            async with advisory_lock("key") as acquired:
+                assert not acquired
+
+        assert executed(conn) == ["SELECT pg_try_advisory_lock(:key)"]
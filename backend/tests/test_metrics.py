@@ -0,0 +1,157 @@
+import httpx
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from app.core.metrics import (
+    MetricsMiddleware,
+    MetricsRegistry,
+    cache_refreshes,
+    http_request_duration,
+    record_upstream_request,
+    track_refresh,
+    upstream_request_errors,
+)
+from app.main import app
+from app.services.itunes import ITunesArtworkService
+
+
+def request_count(method: str, route: str, status: str) -> int:
+    return http_request_duration.labels(method, route, status).snapshot()["count"]
+
+
+class TestMetricsRegistry:
+    def test_renders_counters_and_histograms(self):
+        registry = MetricsRegistry()
+        requests = registry.counter("requests_total", "Requests.", ("path",))
+        latency = registry.histogram("latency_seconds", "Latency.", buckets=(0.1, 1.0))
+        requests.labels('/a"b').inc()
+        requests.labels('/a"b').inc(2)
+        latency.labels().observe(0.5)
+
+        text = registry.render()
+
+        assert "# TYPE requests_total counter" in text
+        assert 'requests_total{path="/a\\"b"} 3.0' in text
+        assert "# TYPE latency_seconds histogram" in text
+        assert 'latency_seconds_bucket{le="0.1"} 0.0' in text
+        assert 'latency_seconds_bucket{le="+Inf"} 1.0' in text
+        assert "latency_seconds_sum 0.5" in text
+        assert "latency_seconds_count 1.0" in text
+
+    def test_callback_metrics_are_read_at_render_time(self):
+        registry = MetricsRegistry()
+        values = {"idle": 1}
+        registry.callback(
+            "connections", "Connections.", "gauge", ("state",),
+            lambda: (((state,), value) for state, value in values.items()),
+        )
+
+        values["idle"] = 4
+
+        assert 'connections{state="idle"} 4.0' in registry.render()
+
+    def test_rejects_wrong_label_count_and_duplicates(self):
+        registry = MetricsRegistry()
+        family = registry.counter("things_total", "Things.", ("kind",))
+
+        with pytest.raises(ValueError):
+            family.labels("a", "b")
+        with pytest.raises(ValueError):
+            registry.counter("things_total", "Things.")
+
+
+class TestMetricsMiddleware:
+    @pytest.fixture
+    def client(self):
+        test_app = FastAPI()
+        test_app.add_middleware(MetricsMiddleware)
+
+        @test_app.get("/items/{item_id}")
+        async def get_item(item_id: int):
+            return {"id": item_id}
+
+        return TestClient(test_app)
+
+    def test_labels_requests_by_route_template(self, client):
+        before = request_count("GET", "/items/{item_id}", "200")
+
+        client.get("/items/1")
+        client.get("/items/2")
+
+        assert request_count("GET", "/items/{item_id}", "200") == before + 2
+
+    def test_groups_unmatched_paths(self, client):
+        before = request_count("GET", "unmatched", "404")
+
+        client.get("/nope/1")
+        client.get("/nope/2")
+
+        assert request_count("GET", "unmatched", "404") == before + 2
+
+    def test_records_validation_failures_under_route(self, client):
+        before = request_count("GET", "/items/{item_id}", "422")
+
+        client.get("/items/abc")
+
+        assert request_count("GET", "/items/{item_id}", "422") == before + 1
+
+
+class TestUpstreamMetrics:
+    def test_counts_error_statuses_and_exceptions(self):
+        errors_503 = upstream_request_errors.labels("test", "/x", "503")
+        timeouts = upstream_request_errors.labels("test", "/x", "ReadTimeout")
+        before = (errors_503.value, timeouts.value)
+
+        record_upstream_request("test", "/x", 0.0, status_code=200)
+        record_upstream_request("test", "/x", 0.0, status_code=503)
+        record_upstream_request("test", "/x", 0.0, error=httpx.ReadTimeout("slow"))
+
+        assert (errors_503.value, timeouts.value) == (before[0] + 1, before[1] + 1)
+
+    @pytest.mark.asyncio
+    async def test_itunes_requests_are_recorded(self):
+        def handler(request: httpx.Request) -> httpx.Response:
+            return httpx.Response(500)
+
+        service = ITunesArtworkService(requests_per_second=1000)
+        await service.client.aclose()
+        service.client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+        errors = upstream_request_errors.labels("itunes", "/search", "500")
+        before = errors.value
+
+        assert await service.search_podcast("Show") is None
+        await service.close()
+
+        assert errors.value == before + 1
+
+
+class TestTrackRefresh:
+    def test_counts_success_and_failure(self):
+        success = cache_refreshes.labels("test-key", "success")
+        failure = cache_refreshes.labels("test-key", "failure")
+        before = (success.value, failure.value)
+
+        with track_refresh("test-key") as outcome:
+            outcome["ok"] = True
+        with track_refresh("test-key"):
+            pass
+        with pytest.raises(RuntimeError):
+            with track_refresh("test-key") as outcome:
+                raise RuntimeError("boom")
+
+        assert (success.value, failure.value) == (before[0] + 1, before[1] + 2)
+
+
+class TestMetricsEndpoint:
+    def test_exposes_request_and_pool_metrics(self):
+        client = TestClient(app)
+        client.get("/health")
+
+        response = client.get("/metrics")
+
+        assert response.status_code == 200
+        assert response.headers["content-type"].startswith("text/plain")
+        assert 'http_request_duration_seconds_count{method="GET",route="/health",status="200"}' in response.text
+        assert 'db_pool_connections{engine="async",state="size"}' in response.text
+        assert 'db_pool_checkout_wait_seconds_count{engine="sync"}' in response.text
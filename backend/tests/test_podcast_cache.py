@@ -0,0 +1,622 @@
+import asyncio
+import uuid
+from contextlib import asynccontextmanager
+from datetime import datetime, timedelta
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+from sqlalchemy.dialects import postgresql
+
+from app.services.listenotes import PodcastData
+from app.services.podcast_cache import (
+    CACHE_KEY_BEST_PODCASTS,
+    CACHE_KEY_PODCAST_DATA,
+    CacheGenerations,
+    CacheRefreshScheduler,
+    IngestionResult,
+    get_catalog_versions,
+    ingest_catalog,
+    ingest_page,
+    make_description_excerpt,
+    page_cache_key,
+    refresh_best_podcasts_cache,
+    refresh_if_stale,
+    update_cache_timestamp,
+    upsert_podcasts,
+)
+from app.services.typeahead import TypeaheadEntry
+
+
+def make_scheduler(**kwargs) -> CacheRefreshScheduler:
+    defaults = {
+        "max_age": timedelta(hours=24),
+        "refresh_ahead": timedelta(hours=1),
+        "poll_interval": 60.0,
+        "retry_interval": 60.0,
+    }
+    defaults.update(kwargs)
+    return CacheRefreshScheduler(**defaults)
+
+
+def make_session() -> AsyncMock:
+    session = AsyncMock()
+    session.exec.return_value = MagicMock()
+    return session
+
+
+def make_podcast_data(listenotes_id: str, **kwargs) -> PodcastData:
+    defaults = {
+        "listenotes_id": listenotes_id,
+        "title": f"Podcast {listenotes_id}",
+        "publisher": "Publisher",
+        "description": "Description",
+        "cover_url": f"https://cdn.example.com/{listenotes_id}.jpg",
+        "feed_url": f"https://feeds.example.com/{listenotes_id}.xml",
+        "total_episodes": 10,
+        "listen_score": 50,
+        "genre_ids": "67,68",
+        "listenotes_url": f"https://listennotes.com/{listenotes_id}",
+        "itunes_id": None,
+    }
+    defaults.update(kwargs)
+    return PodcastData(**defaults)
+
+
+class TestUpsertPodcasts:
+    @pytest.mark.asyncio
+    async def test_single_statement_for_all_podcasts(self):
+        session = make_session()
+        podcasts = [make_podcast_data(f"{i:02d}") for i in range(25)]
+        artwork = {"03": {"sm": "s", "md": "m", "lg": "l"}}
+
+        await upsert_podcasts(session, podcasts, artwork)
+
+        session.exec.assert_awaited_once()
+        session.commit.assert_not_called()
+        statement = session.exec.call_args.args[0]
+        sql = str(statement.compile(dialect=postgresql.dialect()))
+        assert "ON CONFLICT (listenotes_id) DO UPDATE" in sql
+        params = statement.compile(dialect=postgresql.dialect()).params
+        assert params["cover_url_sm_m3"] == "s"
+        assert params["cover_url_sm_m4"] == "https://cdn.example.com/04.jpg"
+        assert params["genres_m0"] == [67, 68]
+        assert "RETURNING podcast.id, podcast.title" in sql
+
+    @pytest.mark.asyncio
+    async def test_stores_description_excerpt(self):
+        session = make_session()
+        podcasts = [make_podcast_data("a", description="<p>Weekly <b>news</b> &amp; views</p>")]
+
+        await upsert_podcasts(session, podcasts, {})
+
+        statement = session.exec.call_args.args[0]
+        params = statement.compile(dialect=postgresql.dialect()).params
+        assert params["description_excerpt_m0"] == "Weekly news & views"
+        sql = str(statement.compile(dialect=postgresql.dialect()))
+        assert "description_excerpt = excluded.description_excerpt" in sql
+
+    @pytest.mark.asyncio
+    async def test_deduplicates_by_listenotes_id(self):
+        session = make_session()
+        podcasts = [make_podcast_data("a", title="Old"), make_podcast_data("a", title="New")]
+
+        await upsert_podcasts(session, podcasts, {})
+
+        params = session.exec.call_args.args[0].compile(dialect=postgresql.dialect()).params
+        assert params["title_m0"] == "New"
+        assert "title_m1" not in params
+
+    @pytest.mark.asyncio
+    async def test_upserts_in_listenotes_id_order(self):
+        session = make_session()
+        podcasts = [make_podcast_data(listenotes_id) for listenotes_id in ("c", "a", "b")]
+
+        await upsert_podcasts(session, podcasts, {})
+
+        params = session.exec.call_args.args[0].compile(dialect=postgresql.dialect()).params
+        assert [params[f"listenotes_id_m{i}"] for i in range(3)] == ["a", "b", "c"]
+
+    @pytest.mark.asyncio
+    async def test_chunks_large_batches(self):
+        session = make_session()
+        podcasts = [make_podcast_data(str(i)) for i in range(2500)]
+
+        with patch("app.services.podcast_cache.PODCAST_UPSERT_BATCH_SIZE", 1000):
+            await upsert_podcasts(session, podcasts, {})
+
+        assert session.exec.await_count == 3
+
+
+class TestMakeDescriptionExcerpt:
+    def test_strips_html_and_collapses_whitespace(self):
+        description = "<p>Hosted by  <a href='x'>Ann</a>.</p>\n<p>Tom&#39;s &quot;picks&quot;</p>"
+
+        assert make_description_excerpt(description) == "Hosted by Ann . Tom's \"picks\""
+
+    def test_truncates_at_word_boundary(self):
+        excerpt = make_description_excerpt("alpha beta gamma, delta epsilon", max_length=20)
+
+        assert excerpt == "alpha beta gamma…"
+        assert len(excerpt) <= 20
+
+    def test_never_exceeds_max_length(self):
+        excerpt = make_description_excerpt("x" * 500, max_length=200)
+
+        assert len(excerpt) == 200
+        assert excerpt.endswith("…")
+
+    @pytest.mark.parametrize("description", [None, "", "<p> </p>"])
+    def test_empty_descriptions(self, description):
+        assert make_description_excerpt(description) is None
+
+
+class TestUpdateCacheTimestamp:
+    @pytest.mark.asyncio
+    async def test_only_moves_forward_and_returns_stored_value(self):
+        session = make_session()
+        stored = datetime.utcnow()
+        session.exec.return_value.scalar_one.return_value = stored
+
+        result = await update_cache_timestamp(session, CACHE_KEY_PODCAST_DATA)
+
+        statement = session.exec.call_args.args[0].compile(dialect=postgresql.dialect())
+        assert (
+            "SET last_fetched_at = greatest(cachemetadata.last_fetched_at + "
+            in str(statement)
+        )
+        assert "excluded.last_fetched_at)" in str(statement)
+        assert "RETURNING cachemetadata.last_fetched_at" in str(statement)
+        assert timedelta(microseconds=1) in statement.params.values()
+        assert result == stored
+
+
+class TestIngestPage:
+    @pytest.mark.asyncio
+    async def test_upserts_marks_page_fresh_and_bumps_data_version_in_one_transaction(self):
+        session = make_session()
+        listen_notes = AsyncMock()
+        listen_notes.fetch_best_podcasts.return_value = [make_podcast_data("a"), make_podcast_data("b")]
+
+        entry = TypeaheadEntry(uuid.uuid4(), "Podcast a", None, None, 50)
+        session.exec.return_value.all.return_value = [tuple(entry)]
+        stored_version = datetime.utcnow()
+        session.exec.return_value.scalar_one.return_value = stored_version
+
+        generations = CacheGenerations(ttl_seconds=60)
+        with patch("app.services.podcast_cache._fetch_itunes_artwork", return_value={}), \
+             patch("app.services.podcast_cache.typeahead_index") as mock_index, \
+             patch("app.services.podcast_cache.cache_generations", generations):
+            count = await ingest_page(session, listen_notes, MagicMock(), genre_id=67, page=2)
+
+        assert count == 2
+        mock_index.update.assert_called_once_with([entry])
+        listen_notes.fetch_best_podcasts.assert_awaited_once_with(genre_id=67, page=2)
+        assert session.exec.await_count == 3
+        page, version = (
+            call.args[0].compile(dialect=postgresql.dialect()) for call in session.exec.call_args_list[1:]
+        )
+        assert "ON CONFLICT (cache_key) DO UPDATE" in str(page)
+        assert page.params["cache_key"] == page_cache_key(67, 2)
+        assert version.params["cache_key"] == CACHE_KEY_PODCAST_DATA
+        session.commit.assert_awaited_once()
+        # This worker's validators change straight away, to the stored version
+        assert await generations.get(session, CACHE_KEY_PODCAST_DATA) == stored_version
+
+    @pytest.mark.asyncio
+    async def test_returns_none_when_api_fails(self):
+        session = AsyncMock()
+        listen_notes = AsyncMock()
+        listen_notes.fetch_best_podcasts.return_value = None
+
+        count = await ingest_page(session, listen_notes, MagicMock(), genre_id=0, page=1)
+
+        assert count is None
+        session.exec.assert_not_called()
+        session.commit.assert_not_called()
+
+
+@pytest.fixture
+def ingest_env():
+    """Patch out sessions and upstream services used by ingest_catalog."""
+    with patch("app.services.podcast_cache.AsyncSession"), \
+         patch("app.services.podcast_cache.ListenNotesService") as mock_listen_notes, \
+         patch("app.services.podcast_cache.ArtworkCacheStore"), \
+         patch("app.services.podcast_cache.ITunesArtworkService") as mock_itunes, \
+         patch("app.services.podcast_cache.get_cache_age", return_value=None) as mock_age:
+        mock_listen_notes.return_value.close = AsyncMock()
+        mock_itunes.return_value.close = AsyncMock()
+        yield mock_age
+
+
+class TestIngestCatalog:
+    @pytest.mark.asyncio
+    async def test_respects_concurrency_cap(self, ingest_env):
+        in_flight = 0
+        peak = 0
+
+        async def fake_ingest_page(session, listen_notes, itunes, genre_id, page):
+            nonlocal in_flight, peak
+            in_flight += 1
+            peak = max(peak, in_flight)
+            await asyncio.sleep(0.01)
+            in_flight -= 1
+            return 10
+
+        pages = [(genre_id, page) for genre_id in (0, 67, 144) for page in (1, 2, 3, 4)]
+        with patch("app.services.podcast_cache.ingest_page", side_effect=fake_ingest_page):
+            result = await ingest_catalog(pages, concurrency=3)
+
+        assert peak == 3
+        assert result.pages_ingested == 12
+        assert result.podcasts == 120
+        assert result.ok
+
+    @pytest.mark.asyncio
+    async def test_consumes_pages_lazily(self, ingest_env):
+        produced = 0
+
+        def pages():
+            nonlocal produced
+            for page in range(1, 101):
+                produced += 1
+                yield 0, page
+
+        async def fake_ingest_page(session, listen_notes, itunes, genre_id, page):
+            # Workers only pull the next page once they are free
+            assert produced <= page + 2
+            await asyncio.sleep(0)
+            return 1
+
+        with patch("app.services.podcast_cache.ingest_page", side_effect=fake_ingest_page):
+            result = await ingest_catalog(pages(), concurrency=2)
+
+        assert result.pages_ingested == 100
+
+    @pytest.mark.asyncio
+    async def test_skips_fresh_pages(self, ingest_env):
+        ingest_env.side_effect = [timedelta(hours=1), None]
+
+        with patch("app.services.podcast_cache.ingest_page", return_value=5) as mock_ingest:
+            result = await ingest_catalog([(0, 1), (0, 2)], concurrency=1, stale_after=timedelta(hours=23))
+
+        assert result.pages_skipped == 1
+        assert result.pages_ingested == 1
+        assert mock_ingest.call_args.args[3:] == (0, 2)
+
+    @pytest.mark.asyncio
+    async def test_counts_failed_pages_and_continues(self, ingest_env):
+        with patch(
+            "app.services.podcast_cache.ingest_page",
+            side_effect=[None, RuntimeError("boom"), 5],
+        ):
+            result = await ingest_catalog([(0, 1), (0, 2), (0, 3)], concurrency=1)
+
+        assert result.pages_failed == 2
+        assert result.pages_ingested == 1
+        assert not result.ok
+
+
+class TestRefreshBestPodcastsCache:
+    @pytest.mark.asyncio
+    async def test_marks_overall_key_fresh_after_all_pages(self):
+        session = AsyncMock()
+
+        with patch("app.services.podcast_cache.settings.LISTENOTES_API_KEY", "key"), \
+             patch(
+                 "app.services.podcast_cache.ingest_catalog",
+                 return_value=IngestionResult(pages_ingested=3, podcasts=30),
+             ):
+            result = await refresh_best_podcasts_cache(session)
+
+        assert result is True
+        session.exec.assert_awaited_once()
+        metadata = session.exec.call_args.args[0].compile(dialect=postgresql.dialect())
+        assert metadata.params["cache_key"] == CACHE_KEY_BEST_PODCASTS
+        session.commit.assert_awaited_once()
+
+    @pytest.mark.asyncio
+    async def test_returns_false_when_any_page_fails(self):
+        session = AsyncMock()
+
+        with patch("app.services.podcast_cache.settings.LISTENOTES_API_KEY", "key"), \
+             patch(
+                 "app.services.podcast_cache.ingest_catalog",
+                 return_value=IngestionResult(pages_ingested=2, pages_failed=1),
+             ):
+            result = await refresh_best_podcasts_cache(session)
+
+        assert result is False
+        session.exec.assert_not_called()
+        session.commit.assert_not_called()
+
+
+class TestCacheGenerations:
+    @pytest.mark.asyncio
+    async def test_reads_database_once_per_ttl(self):
+        session = AsyncMock()
+        generation = datetime(2026, 1, 1)
+        session.exec.return_value = MagicMock(all=MagicMock(return_value=[("key", generation)]))
+        generations = CacheGenerations(ttl_seconds=60)
+
+        assert await generations.get(session, "key") == generation
+        assert await generations.get(session, "key") == generation
+        session.exec.assert_awaited_once()
+
+    @pytest.mark.asyncio
+    async def test_rereads_after_ttl(self):
+        session = AsyncMock()
+        session.exec.return_value = MagicMock(all=MagicMock(return_value=[]))
+        generations = CacheGenerations(ttl_seconds=0)
+
+        await generations.get(session, "key")
+        await generations.get(session, "key")
+        assert session.exec.await_count == 2
+
+    @pytest.mark.asyncio
+    async def test_set_overrides_cached_value(self):
+        session = AsyncMock()
+        session.exec.return_value = MagicMock(all=MagicMock(return_value=[]))
+        generations = CacheGenerations(ttl_seconds=60)
+        await generations.get(session, "key")
+
+        generation = datetime(2026, 1, 2)
+        generations.set("key", generation)
+
+        assert await generations.get(session, "key") == generation
+        session.exec.assert_awaited_once()
+
+
+    @pytest.mark.asyncio
+    async def test_reads_related_keys_in_one_query(self):
+        session = AsyncMock()
+        generation, version = datetime(2026, 1, 1), datetime(2026, 1, 2)
+        session.exec.return_value = MagicMock(
+            all=MagicMock(return_value=[("overall", generation), ("data", version)])
+        )
+        generations = CacheGenerations(ttl_seconds=60, read_together=("overall", "data"))
+
+        assert await generations.get(session, "overall") == generation
+        assert await generations.get(session, "data") == version
+        session.exec.assert_awaited_once()
+
+
+class TestGetCatalogVersions:
+    @pytest.mark.asyncio
+    async def test_data_version_moves_without_full_refresh(self):
+        generation, version = datetime(2026, 1, 1), datetime(2026, 1, 2)
+        generations = CacheGenerations(ttl_seconds=60)
+        generations.set(CACHE_KEY_BEST_PODCASTS, generation)
+        generations.set(CACHE_KEY_PODCAST_DATA, version)
+
+        with patch("app.services.podcast_cache.cache_generations", generations):
+            assert await get_catalog_versions(AsyncMock()) == (generation, version)
+
+    @pytest.mark.asyncio
+    async def test_falls_back_to_generation_before_first_data_version(self):
+        generation = datetime(2026, 1, 1)
+        generations = CacheGenerations(ttl_seconds=60)
+        generations.set(CACHE_KEY_BEST_PODCASTS, generation)
+        session = AsyncMock()
+        session.exec.return_value = MagicMock(all=MagicMock(return_value=[]))
+
+        with patch("app.services.podcast_cache.cache_generations", generations):
+            assert await get_catalog_versions(session) == (generation, generation)
+
+
+class FakeAdvisoryLocks:
+    """In-memory stand-in for Postgres advisory locks shared by all callers."""
+
+    def __init__(self):
+        self._held: set[str] = set()
+        self._released = asyncio.Condition()
+
+    @asynccontextmanager
+    async def __call__(self, name: str, wait: bool = False):
+        async with self._released:
+            if wait:
+                await self._released.wait_for(lambda: name not in self._held)
+            acquired = name not in self._held
+            if acquired:
+                self._held.add(name)
+        try:
+            yield acquired
+        finally:
+            if acquired:
+                async with self._released:
+                    self._held.discard(name)
+                    self._released.notify_all()
+
+
+class FakeCache:
+    """Shared cache age that becomes fresh once a refresh completes."""
+
+    def __init__(self, age: timedelta | None):
+        self.age = age
+        self.refresh_calls = 0
+
+    async def get_age(self, session, cache_key):
+        await asyncio.sleep(0)  # Yield like a real query would
+        return self.age
+
+    async def refresh(self, session):
+        self.refresh_calls += 1
+        await asyncio.sleep(0.05)  # Simulate slow upstream calls
+        self.age = timedelta(0)
+        return True
+
+
+@pytest.fixture
+def fake_locks():
+    locks = FakeAdvisoryLocks()
+    with patch("app.services.podcast_cache.advisory_lock", new=locks), \
+         patch("app.services.podcast_cache.AsyncSession"):
+        yield locks
+
+
+class TestRefreshIfStale:
+    @pytest.mark.asyncio
+    async def test_refreshes_when_cache_missing(self, fake_locks):
+        cache = FakeCache(age=None)
+
+        with patch("app.services.podcast_cache.get_cache_age", side_effect=cache.get_age):
+            result = await refresh_if_stale("key", cache.refresh, stale_after=timedelta(hours=23))
+
+        assert result is True
+        assert cache.refresh_calls == 1
+
+    @pytest.mark.asyncio
+    async def test_refreshes_ahead_of_expiry(self, fake_locks):
+        cache = FakeCache(age=timedelta(hours=23, minutes=30))
+
+        with patch("app.services.podcast_cache.get_cache_age", side_effect=cache.get_age):
+            await refresh_if_stale("key", cache.refresh, stale_after=timedelta(hours=23))
+
+        assert cache.refresh_calls == 1
+
+    @pytest.mark.asyncio
+    async def test_skips_when_cache_fresh(self, fake_locks):
+        cache = FakeCache(age=timedelta(hours=2))
+
+        with patch("app.services.podcast_cache.get_cache_age", side_effect=cache.get_age):
+            result = await refresh_if_stale("key", cache.refresh, stale_after=timedelta(hours=23))
+
+        assert result is None
+        assert cache.refresh_calls == 0
+
+    @pytest.mark.asyncio
+    async def test_skips_when_lock_held_elsewhere(self, fake_locks):
+        cache = FakeCache(age=None)
+
+        with patch("app.services.podcast_cache.get_cache_age", side_effect=cache.get_age):
+            async with fake_locks("key") as acquired:
+                assert acquired
+                result = await refresh_if_stale("key", cache.refresh, stale_after=timedelta(hours=23))
+
+        assert result is None
+        assert cache.refresh_calls == 0
+
+    @pytest.mark.asyncio
+    async def test_refreshes_in_a_session_without_open_reads(self, fake_locks):
+        cache = FakeCache(age=None)
+        open_sessions, checked_sessions = [], []
+
+        @asynccontextmanager
+        async def fake_session(*args, **kwargs):
+            session = object()
+            open_sessions.append(session)
+            try:
+                yield session
+            finally:
+                open_sessions.remove(session)
+
+        async def get_age(session, cache_key):
+            checked_sessions.append(session)
+            return await cache.get_age(session, cache_key)
+
+        async def refresh(session):
+            # The staleness checks are over and their sessions closed
+            assert open_sessions == [session]
+            assert session not in checked_sessions
+            return await cache.refresh(session)
+
+        with patch("app.services.podcast_cache.AsyncSession", fake_session), \
+             patch("app.services.podcast_cache.get_cache_age", side_effect=get_age):
+            result = await refresh_if_stale("key", refresh, stale_after=timedelta(hours=23))
+
+        assert result is True
+        assert len(checked_sessions) == 2
+        assert open_sessions == []
+
+    @pytest.mark.asyncio
+    @pytest.mark.parametrize("wait", [False, True])
+    async def test_concurrent_stale_readers_refresh_once(self, fake_locks, wait):
+        cache = FakeCache(age=timedelta(hours=30))
+        readers = 16
+
+        with patch("app.services.podcast_cache.get_cache_age", side_effect=cache.get_age):
+            results = await asyncio.gather(
+                *(
+                    refresh_if_stale("key", cache.refresh, stale_after=timedelta(hours=23), wait=wait)
+                    for _ in range(readers)
+                )
+            )
+
+        assert cache.refresh_calls == 1
+        assert results.count(True) == 1
+        assert results.count(None) == readers - 1
+
+
+class TestSchedulerRefreshIfDue:
+    @pytest.mark.asyncio
+    async def test_uses_refresh_ahead_window(self):
+        scheduler = make_scheduler()
+
+        with patch("app.services.podcast_cache.refresh_if_stale", return_value=True) as mock_refresh:
+            result = await scheduler._refresh_if_due()
+
+        assert result is True
+        assert mock_refresh.call_args.kwargs["stale_after"] == timedelta(hours=23)
+
+
+class TestScheduler:
+    @pytest.mark.asyncio
+    async def test_request_refresh_wakes_background_task(self):
+        scheduler = make_scheduler()
+        calls = []
+
+        async def fake_refresh_if_due():
+            calls.append(1)
+            return None
+
+        with patch.object(scheduler, "_refresh_if_due", side_effect=fake_refresh_if_due):
+            await scheduler.start()
+            try:
+                await asyncio.sleep(0.05)
+                assert len(calls) == 1
+
+                scheduler.request_refresh()
+                await asyncio.sleep(0.05)
+                assert len(calls) == 2
+            finally:
+                await scheduler.stop()
+
+        assert not scheduler.running
+
+    @pytest.mark.asyncio
+    async def test_request_refresh_does_not_block(self):
+        scheduler = make_scheduler()
+        release = asyncio.Event()
+        calls, finished = [], []
+
+        async def slow_refresh_if_due():
+            calls.append(1)
+            await release.wait()
+            finished.append(1)
+            return True
+
+        with patch.object(scheduler, "_refresh_if_due", side_effect=slow_refresh_if_due):
+            await scheduler.start()
+            try:
+                await asyncio.sleep(0.01)
+                assert len(calls) == 1
+
+                # Refresh is in flight; asking again returns immediately
+                scheduler.request_refresh()
+                scheduler.request_refresh()
+                assert finished == []
+                await asyncio.sleep(0.01)
+                # ... and does not start a second, concurrent refresh
+                assert len(calls) == 1
+
+                release.set()
+                await asyncio.sleep(0.01)
+                # Requests made while it ran are coalesced into one follow-up
+                assert len(calls) == 2
+            finally:
+                release.set()
+                await scheduler.stop()
+
+    def test_request_refresh_is_noop_when_not_running(self):
+        scheduler = make_scheduler()
+        scheduler.request_refresh()
+        assert not scheduler.running
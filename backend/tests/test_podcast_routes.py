@@ -0,0 +1,383 @@
+import uuid
+from datetime import datetime, timedelta
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy.dialects import postgresql
+
+from app.api.deps import get_async_db
+from app.api.pagination import decode_cursor, encode_cursor
+from app.core.config import settings
+from app.main import app
+from app.models import (
+    PODCAST_CARD_FIELDS,
+    PODCAST_PUBLIC_FIELDS,
+    Podcast,
+    PodcastList,
+    PodcastPublic,
+)
+from app.services.podcast_cache import CACHE_KEY_BEST_PODCASTS, CACHE_KEY_PODCAST_DATA
+from app.services.typeahead import TypeaheadEntry, TypeaheadIndex
+
+POPULAR_URL = f"{settings.API_V1_STR}/podcasts/popular"
+BROWSE_URL = f"{settings.API_V1_STR}/podcasts"
+SEARCH_URL = f"{settings.API_V1_STR}/podcasts/search"
+SUGGEST_URL = f"{settings.API_V1_STR}/podcasts/suggest"
+
+# Well-formed cursors whose values have the wrong JSON types
+WRONG_TYPE_CURSORS = [
+    encode_cursor(80, 123),
+    encode_cursor(80, ["x"]),
+    encode_cursor(80, {"id": "x"}),
+    encode_cursor([80], str(uuid.uuid4())),
+]
+
+
+def make_podcast(**kwargs) -> Podcast:
+    defaults = {"id": uuid.uuid4(), "title": "Test Pod", "is_featured": True, "listen_score": 80}
+    defaults.update(kwargs)
+    return Podcast(**defaults)
+
+
+def as_row(podcast: Podcast, *extra, fields: tuple[str, ...] = PODCAST_PUBLIC_FIELDS) -> tuple:
+    """The row a list query selects for ``podcast``, plus any extra columns."""
+    return (*(getattr(podcast, name) for name in fields), *extra)
+
+
+@pytest.fixture
+def session():
+    session = MagicMock()
+    session.exec = AsyncMock(return_value=MagicMock())
+    session.get = AsyncMock()
+    app.dependency_overrides[get_async_db] = lambda: session
+    yield session
+    app.dependency_overrides.clear()
+
+
+@pytest.fixture
+def client(session):
+    return TestClient(app)
+
+
+@pytest.fixture
+def generation():
+    generation = datetime.utcnow() - timedelta(hours=1)
+    with patch("app.services.podcast_cache.cache_generations.get", return_value=generation):
+        yield generation
+
+
+class TestPopularPodcasts:
+    def test_sets_etag_and_cache_control(self, client, session, generation):
+        session.exec.return_value.all.return_value = [as_row(make_podcast())]
+
+        response = client.get(POPULAR_URL)
+
+        assert response.status_code == 200
+        assert response.json()["count"] == 1
+        assert response.headers["etag"].startswith('"')
+        cache_control = response.headers["cache-control"]
+        assert "public" in cache_control
+        assert f"stale-while-revalidate={24 * 3600}" in cache_control
+        max_age = int(cache_control.split("max-age=")[1].split(",")[0])
+        assert 22 * 3600 < max_age <= 23 * 3600
+
+    def test_returns_304_without_querying_podcasts(self, client, session, generation):
+        session.exec.return_value.all.return_value = [as_row(make_podcast())]
+        etag = client.get(POPULAR_URL).headers["etag"]
+        session.exec.reset_mock()
+
+        response = client.get(POPULAR_URL, headers={"If-None-Match": f'W/{etag}, "other"'})
+
+        assert response.status_code == 304
+        # Weakened by compression negotiation; validators compare weakly
+        assert response.headers["etag"].removeprefix("W/") == etag.removeprefix("W/")
+        assert response.content == b""
+        session.exec.assert_not_called()
+
+    def test_etag_varies_with_limit_and_generation(self, client, session, generation):
+        session.exec.return_value.all.return_value = []
+        first = client.get(POPULAR_URL).headers["etag"]
+        other_limit = client.get(POPULAR_URL, params={"limit": 10}).headers["etag"]
+
+        with patch("app.services.podcast_cache.cache_generations.get", return_value=datetime.utcnow()):
+            next_generation = client.get(POPULAR_URL).headers["etag"]
+
+        assert len({first, other_limit, next_generation}) == 3
+
+    def test_etag_follows_data_version_after_partial_refresh(self, client, session, generation):
+        session.exec.return_value.all.return_value = []
+        first = client.get(POPULAR_URL)
+        versions = {CACHE_KEY_BEST_PODCASTS: generation, CACHE_KEY_PODCAST_DATA: datetime.utcnow()}
+
+        # Some pages were written but the overall refresh did not complete
+        with patch(
+            "app.services.podcast_cache.cache_generations.get",
+            side_effect=lambda session, key: versions[key],
+        ):
+            response = client.get(POPULAR_URL, headers={"If-None-Match": first.headers["etag"]})
+
+        assert response.status_code == 200
+        assert response.headers["etag"] != first.headers["etag"]
+
+    def test_filters_by_genre_with_array_containment(self, client, session, generation):
+        session.exec.return_value.all.return_value = []
+
+        first = client.get(POPULAR_URL).headers["etag"]
+        response = client.get(POPULAR_URL, params={"genre": 67})
+
+        assert response.status_code == 200
+        assert response.headers["etag"] != first
+        statement = session.exec.call_args.args[0]
+        compiled = statement.compile(dialect=postgresql.dialect())
+        assert "podcast.genres @> " in str(compiled)
+        assert compiled.params["genres_1"] == [67]
+
+    def test_rejects_invalid_genre(self, client, session, generation):
+        assert client.get(POPULAR_URL, params={"genre": 0}).status_code == 422
+
+    def test_selects_public_columns_and_matches_response_model(self, client, session, generation):
+        podcast = make_podcast(description="<p>Long</p>", genre_ids="67", cover_url_sm="https://x/sm.jpg")
+        session.exec.return_value.all.return_value = [as_row(podcast)]
+
+        response = client.get(POPULAR_URL)
+
+        expected = PodcastList(podcasts=[PodcastPublic.model_validate(podcast)], count=1)
+        assert response.json() == expected.model_dump(mode="json")
+        sql = str(session.exec.call_args.args[0].compile(dialect=postgresql.dialect()))
+        assert "podcast.description" in sql
+        assert "podcast.genres" not in sql.split(" FROM ")[0]
+
+    def test_stale_cache_requests_background_refresh(self, client, session):
+        session.exec.return_value.all.return_value = []
+        stale = datetime.utcnow() - timedelta(hours=30)
+
+        with patch("app.services.podcast_cache.cache_generations.get", return_value=stale), \
+             patch("app.api.routes.podcasts.refresh_scheduler.request_refresh") as mock_request:
+            response = client.get(POPULAR_URL)
+
+        assert response.status_code == 200
+        mock_request.assert_called_once()
+        assert "max-age=0" in response.headers["cache-control"]
+
+    def test_no_validators_before_first_fetch(self, client, session):
+        session.exec.return_value.all.return_value = []
+
+        with patch("app.services.podcast_cache.cache_generations.get", return_value=None), \
+             patch("app.api.routes.podcasts.refresh_scheduler.request_refresh"):
+            response = client.get(POPULAR_URL)
+
+        assert response.status_code == 200
+        assert "etag" not in response.headers
+
+
+class TestBrowsePodcasts:
+    def test_returns_cursor_when_more_rows_exist(self, client, session, generation):
+        podcasts = [make_podcast(listen_score=score) for score in (90, 80, 70)]
+        session.exec.return_value.all.return_value = [as_row(p, p.listen_score) for p in podcasts]
+
+        response = client.get(BROWSE_URL, params={"limit": 2})
+
+        assert response.status_code == 200
+        body = response.json()
+        assert [p["listen_score"] for p in body["podcasts"]] == [90, 80]
+        assert decode_cursor(body["next_cursor"], int, uuid.UUID) == (80, podcasts[1].id)
+        statement = session.exec.call_args.args[0]
+        assert statement.compile().params["param_1"] == 3  # limit + 1
+
+    def test_lists_whole_catalog_unless_featured_given(self, client, session, generation):
+        session.exec.return_value.all.return_value = []
+
+        client.get(BROWSE_URL)
+        catalog = session.exec.call_args.args[0].compile(dialect=postgresql.dialect())
+        client.get(BROWSE_URL, params={"featured": "false"})
+        not_featured = session.exec.call_args.args[0].compile(dialect=postgresql.dialect())
+
+        assert "WHERE" not in str(catalog)
+        assert "WHERE podcast.is_featured = false" in str(not_featured)
+
+    def test_last_page_has_no_cursor(self, client, session, generation):
+        session.exec.return_value.all.return_value = [as_row(make_podcast(), 80)]
+
+        response = client.get(BROWSE_URL, params={"limit": 2})
+
+        assert response.json()["next_cursor"] is None
+
+    def test_unscored_podcasts_sort_last(self, client, session, generation):
+        podcasts = [make_podcast(listen_score=None), make_podcast(listen_score=None)]
+        session.exec.return_value.all.return_value = [as_row(p, -1) for p in podcasts]
+
+        response = client.get(BROWSE_URL, params={"limit": 1})
+
+        cursor = response.json()["next_cursor"]
+        assert decode_cursor(cursor, int, uuid.UUID) == (-1, podcasts[0].id)
+        sql = str(session.exec.call_args.args[0].compile(dialect=postgresql.dialect()))
+        assert "ORDER BY coalesce(podcast.listen_score, -1) DESC, podcast.id DESC" in sql
+
+    def test_cursor_seeks_past_last_row(self, client, session, generation):
+        session.exec.return_value.all.return_value = []
+        last_id = uuid.uuid4()
+
+        client.get(BROWSE_URL, params={"cursor": encode_cursor(55, last_id)})
+
+        compiled = session.exec.call_args.args[0].compile(dialect=postgresql.dialect())
+        assert "(coalesce(podcast.listen_score, -1), podcast.id) < (" in str(compiled)
+        assert 55 in compiled.params.values()
+        assert last_id in compiled.params.values()
+
+    @pytest.mark.parametrize(
+        "cursor",
+        [
+            "not-a-cursor",
+            encode_cursor(1),
+            encode_cursor("x", "y"),
+            # Infinity does not convert to an int popularity
+            encode_cursor(1e400, str(uuid.uuid4())),
+            *WRONG_TYPE_CURSORS,
+        ],
+    )
+    def test_rejects_invalid_cursor(self, client, session, generation, cursor):
+        response = client.get(BROWSE_URL, params={"cursor": cursor})
+
+        assert response.status_code == 400
+        session.exec.assert_not_called()
+
+
+class TestSparseFieldsets:
+    def test_card_selects_and_returns_only_card_fields(self, client, session, generation):
+        podcast = make_podcast(description="<p>Long</p>", description_excerpt="Long")
+        # Selected in schema order
+        fields = tuple(name for name in PODCAST_PUBLIC_FIELDS if name in PODCAST_CARD_FIELDS)
+        session.exec.return_value.all.return_value = [as_row(podcast, fields=fields)]
+
+        response = client.get(POPULAR_URL, params={"fields": "card"})
+
+        [card] = response.json()["podcasts"]
+        assert set(card) == set(PODCAST_CARD_FIELDS)
+        assert card["description_excerpt"] == "Long"
+        select_list = str(session.exec.call_args.args[0].compile()).split(" FROM ")[0]
+        assert "podcast.description_excerpt" in select_list
+        assert "podcast.description," not in select_list
+        assert "podcast.listenotes_url" not in select_list
+
+    def test_named_fields_always_include_id(self, client, session, generation):
+        podcast = make_podcast()
+        fields = ("title", "listen_score", "id")
+        session.exec.return_value.all.return_value = [as_row(podcast, fields=fields)]
+
+        response = client.get(POPULAR_URL, params={"fields": "title, listen_score"})
+
+        assert response.json()["podcasts"] == [
+            {"title": "Test Pod", "listen_score": 80, "id": str(podcast.id)}
+        ]
+
+    def test_etag_varies_with_fields(self, client, session, generation):
+        session.exec.return_value.all.return_value = []
+
+        full = client.get(POPULAR_URL).headers["etag"]
+        card = client.get(POPULAR_URL, params={"fields": "card"}).headers["etag"]
+
+        assert full != card
+
+    def test_browse_cursor_without_listen_score_field(self, client, session, generation):
+        podcasts = [make_podcast(listen_score=score) for score in (90, 80)]
+        session.exec.return_value.all.return_value = [
+            as_row(p, p.listen_score, fields=("title", "id")) for p in podcasts
+        ]
+
+        response = client.get(BROWSE_URL, params={"limit": 1, "fields": "title"})
+
+        body = response.json()
+        assert body["podcasts"] == [{"title": "Test Pod", "id": str(podcasts[0].id)}]
+        assert decode_cursor(body["next_cursor"], int, uuid.UUID) == (90, podcasts[0].id)
+
+    def test_rejects_unknown_fields(self, client, session, generation):
+        response = client.get(SEARCH_URL, params={"q": "news", "fields": "title,genres"})
+
+        assert response.status_code == 400
+        assert response.json()["detail"] == "Unknown field: genres"
+        session.exec.assert_not_called()
+
+
+class TestSearchPodcasts:
+    def test_ranks_matches_with_weighted_search_vector(self, client, session, generation):
+        session.exec.return_value.all.return_value = [as_row(make_podcast(), 0.6)]
+
+        response = client.get(SEARCH_URL, params={"q": "true crime"})
+
+        assert response.status_code == 200
+        assert response.json()["next_cursor"] is None
+        sql = str(session.exec.call_args.args[0].compile(dialect=postgresql.dialect()))
+        assert "podcast.search_vector @@ websearch_to_tsquery(" in sql
+        assert "ORDER BY ts_rank(podcast.search_vector" in sql
+
+    def test_paginates_on_rank_and_id(self, client, session, generation):
+        podcasts = [make_podcast(), make_podcast(), make_podcast()]
+        session.exec.return_value.all.return_value = [
+            as_row(podcast, rank) for podcast, rank in zip(podcasts, (0.9, 0.45, 0.1))
+        ]
+
+        response = client.get(SEARCH_URL, params={"q": "news", "limit": 2})
+        cursor = response.json()["next_cursor"]
+        assert decode_cursor(cursor, float, uuid.UUID) == (0.45, podcasts[1].id)
+
+        client.get(SEARCH_URL, params={"q": "news", "limit": 2, "cursor": cursor})
+        compiled = session.exec.call_args.args[0].compile(dialect=postgresql.dialect())
+        assert "podcast.id) < (" in str(compiled)
+        assert 0.45 in compiled.params.values()
+
+    @pytest.mark.parametrize("cursor", WRONG_TYPE_CURSORS)
+    def test_rejects_cursor_with_wrong_value_types(self, client, session, generation, cursor):
+        response = client.get(SEARCH_URL, params={"q": "news", "cursor": cursor})
+
+        assert response.status_code == 400
+        session.exec.assert_not_called()
+
+    def test_requires_query(self, client, session, generation):
+        assert client.get(SEARCH_URL).status_code == 422
+        assert client.get(SEARCH_URL, params={"q": ""}).status_code == 422
+
+
+class TestSuggestPodcasts:
+    def test_serves_from_typeahead_index_without_querying(self, client, session, generation):
+        index = TypeaheadIndex()
+        index.replace([TypeaheadEntry(uuid.uuid4(), "Hardcore History", "Dan Carlin", None, 88)])
+        index.generation = generation
+
+        with patch("app.api.routes.podcasts.typeahead_index", index):
+            response = client.get(SUGGEST_URL, params={"q": "hist"})
+
+        assert response.status_code == 200
+        suggestions = response.json()["suggestions"]
+        assert [s["title"] for s in suggestions] == ["Hardcore History"]
+        assert suggestions[0]["listen_score"] == 88
+        session.exec.assert_not_called()
+
+    def test_requests_reload_for_new_generation(self, client, session, generation):
+        with patch("app.api.routes.podcasts.typeahead_index") as mock_index:
+            mock_index.suggest.return_value = []
+            client.get(SUGGEST_URL, params={"q": "a"})
+
+        mock_index.request_reload.assert_called_once_with(generation)
+
+
+class TestGetPodcast:
+    def test_returns_304_without_loading_podcast(self, client, session, generation):
+        podcast = make_podcast()
+        session.get.return_value = podcast
+        url = f"{settings.API_V1_STR}/podcasts/{podcast.id}"
+        etag = client.get(url).headers["etag"]
+        session.get.reset_mock()
+
+        response = client.get(url, headers={"If-None-Match": etag})
+
+        assert response.status_code == 304
+        session.get.assert_not_called()
+
+    def test_not_found_has_no_validators(self, client, session, generation):
+        session.get.return_value = None
+
+        response = client.get(f"{settings.API_V1_STR}/podcasts/{uuid.uuid4()}")
+
+        assert response.status_code == 404
+        assert "etag" not in response.headers
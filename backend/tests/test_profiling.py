@@ -0,0 +1,185 @@
+import threading
+import time
+from unittest.mock import patch
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from app.api.routes import profiles
+from app.core.config import settings
+from app.core.profiling import ProfileStore, ProfilingMiddleware, StackSampler
+from app.main import app
+
+
+def busy_work(seconds: float) -> None:
+    deadline = time.perf_counter() + seconds
+    while time.perf_counter() < deadline:
+        pass
+
+
+@pytest.fixture
+def store(tmp_path):
+    return ProfileStore(tmp_path / "profiles", max_profiles=3)
+
+
+def make_client(store: ProfileStore, **kwargs) -> TestClient:
+    test_app = FastAPI()
+    test_app.add_middleware(ProfilingMiddleware, store=store, interval=0.001, **kwargs)
+
+    @test_app.get("/work/{seconds}")
+    def work(seconds: float):
+        busy_work(seconds)
+        return {}
+
+    return TestClient(test_app)
+
+
+class TestStackSampler:
+    def test_collects_busy_thread_stacks(self):
+        sampler = StackSampler(interval=0.001)
+        sampler.start()
+        busy_work(0.05)
+        sampler.stop()
+
+        assert sampler.samples > 0
+        stacks = sampler.collapsed().splitlines()
+        assert any("busy_work (tests/test_profiling.py)" in line for line in stacks)
+        assert all(line.rsplit(" ", 1)[1].isdigit() for line in stacks)
+
+    def test_skips_idle_worker_threads(self):
+        idle = threading.Event()
+        worker = threading.Thread(target=idle.wait, name="idle-worker")
+        worker.start()
+        sampler = StackSampler(interval=0.001)
+        sampler.start()
+        busy_work(0.02)
+        sampler.stop()
+        idle.set()
+        worker.join()
+
+        assert "idle-worker" not in sampler.collapsed()
+
+
+class TestProfileStore:
+    def test_keeps_only_newest_profiles(self, store):
+        ids = []
+        for i in range(5):
+            profile_id = store.new_id()
+            ids.append(profile_id)
+            store.save(profile_id, f"main;f {i}\n", {"path": f"/{i}"})
+
+        assert [entry["id"] for entry in store.index()] == ids[:1:-1]
+        assert store.load(ids[0]) is None
+        assert store.load(ids[-1]) == "main;f 4\n"
+        assert len(list(store.directory.iterdir())) == 6
+
+    def test_rejects_ids_outside_the_store(self, store):
+        store.save(store.new_id(), "main;f 1\n", {})
+
+        assert store.load("../../etc/passwd") is None
+        assert store.index()[0]["id"]
+
+    def test_empty_before_first_profile(self, store):
+        assert store.index() == []
+
+
+class TestProfilingMiddleware:
+    def test_profiles_requests_with_trusted_token(self, store):
+        client = make_client(store, token="s3cret", sample_rate=0)
+
+        response = client.get("/work/0.03", headers={"X-Profile-Token": "s3cret"})
+
+        profile_id = response.headers["x-profile-id"]
+        [entry] = store.index()
+        assert entry["id"] == profile_id
+        assert entry["route"] == "/work/{seconds}"
+        assert entry["status"] == 200
+        assert entry["samples"] > 0
+        assert "busy_work" in store.load(profile_id)
+
+    def test_ignores_wrong_token_and_unsampled_requests(self, store):
+        client = make_client(store, token="s3cret", sample_rate=0)
+
+        client.get("/work/0", headers={"X-Profile-Token": "guess"})
+        response = client.get("/work/0")
+
+        assert "x-profile-id" not in response.headers
+        assert store.index() == []
+
+    def test_header_is_ignored_without_configured_token(self, store):
+        client = make_client(store, token=None, sample_rate=0)
+
+        client.get("/work/0", headers={"X-Profile-Token": ""})
+
+        assert store.index() == []
+
+    def test_samples_requests_at_configured_rate(self, store):
+        client = make_client(store, token=None, sample_rate=0.5)
+
+        with patch("app.core.profiling.random.random", side_effect=[0.4, 0.6]):
+            client.get("/work/0")
+            client.get("/work/0")
+
+        assert len(store.index()) == 1
+
+    def test_skips_while_another_profile_is_running(self, store):
+        test_app = FastAPI()
+        test_app.get("/")(lambda: {})
+        middleware = ProfilingMiddleware(test_app, store=store, sample_rate=1)
+
+        with middleware._busy:
+            response = TestClient(middleware).get("/")
+
+        assert "x-profile-id" not in response.headers
+        assert store.index() == []
+
+
+PROFILES_URL = "/internal/profiles"
+
+
+class TestProfileEndpoints:
+    @pytest.fixture
+    def client(self, store):
+        test_app = FastAPI()
+        test_app.include_router(profiles.router)
+        with patch("app.api.routes.profiles.profile_store", store), \
+             patch.object(settings, "PROFILING_TOKEN", "s3cret"):
+            yield TestClient(test_app, headers={"X-Profile-Token": "s3cret"})
+
+    def test_lists_and_serves_profiles(self, client, store):
+        profile_id = store.new_id()
+        store.save(profile_id, "main;handler 3\n", {"route": "/x"})
+
+        index = client.get(PROFILES_URL).json()
+        profile = client.get(f"{PROFILES_URL}/{profile_id}")
+        missing = client.get(f"{PROFILES_URL}/1-deadbeef")
+
+        assert index == [{"id": profile_id, "route": "/x"}]
+        assert profile.text == "main;handler 3\n"
+        assert missing.status_code == 404
+
+    def test_requires_profile_token(self, client, store):
+        profile_id = store.new_id()
+        store.save(profile_id, "main;handler 3\n", {"route": "/x"})
+
+        anonymous = client.get(PROFILES_URL, headers={"X-Profile-Token": ""})
+        wrong = client.get(f"{PROFILES_URL}/{profile_id}", headers={"X-Profile-Token": "guess"})
+        with patch.object(settings, "PROFILING_TOKEN", None):
+            unconfigured = client.get(PROFILES_URL)
+
+        assert anonymous.status_code == 403
+        assert wrong.status_code == 403
+        assert unconfigured.status_code == 403
+
+    def test_endpoints_are_only_mounted_when_enabled(self, client):
+        response = TestClient(app, headers=client.headers).get(
+            f"{settings.API_V1_STR}{PROFILES_URL}"
+        )
+
+        assert (response.status_code != 404) == settings.PROFILING_ENABLED
+
+    def test_middleware_is_only_installed_when_enabled(self):
+        installed = any(m.cls is ProfilingMiddleware for m in app.user_middleware)
+
+        assert installed == settings.PROFILING_ENABLED
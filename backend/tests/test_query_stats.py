@@ -0,0 +1,207 @@
+from datetime import datetime, timedelta
+from unittest.mock import MagicMock
+
+import httpx
+import pytest
+import pytest_asyncio
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine, exc, text
+
+from app.api.deps import get_async_db
+from app.core.config import settings
+from app.core.db import async_engine, engine
+from app.core.query_stats import (
+    QueryStats,
+    QueryTimingMiddleware,
+    instrument_engine,
+    parse_server_timing,
+    track_queries,
+)
+from app.main import app
+from app.models import CacheMetadata
+from app.services.podcast_cache import (
+    CACHE_KEY_BEST_PODCASTS,
+    CACHE_KEY_PODCAST_DATA,
+    cache_generations,
+)
+from tests.utils import assert_max_queries, assert_query_budget
+
+POPULAR_URL = f"{settings.API_V1_STR}/podcasts/popular"
+
+
+def postgres_available() -> bool:
+    try:
+        with engine.connect():
+            return True
+    except exc.OperationalError:
+        return False
+
+
+@pytest.fixture
+def sqlite_engine(tmp_path):
+    sqlite_engine = create_engine(f"sqlite:///{tmp_path / 'queries.db'}")
+    instrument_engine(sqlite_engine)
+    yield sqlite_engine
+    sqlite_engine.dispose()
+
+
+class TestTrackQueries:
+    def test_counts_statements_in_block(self, sqlite_engine):
+        with sqlite_engine.connect() as conn:
+            with track_queries() as stats:
+                conn.execute(text("SELECT 1"))
+                conn.execute(text("SELECT 2"))
+            conn.execute(text("SELECT 3"))
+
+        assert stats.count == 2
+        assert stats.duration > 0
+
+    def test_untracked_statements_are_ignored(self, sqlite_engine):
+        with sqlite_engine.connect() as conn:
+            conn.execute(text("SELECT 1"))
+
+            assert "query_start_time" not in conn.info
+
+    def test_assert_max_queries(self, sqlite_engine):
+        with sqlite_engine.connect() as conn:
+            with assert_max_queries(1):
+                conn.execute(text("SELECT 1"))
+            with pytest.raises(AssertionError, match="Issued 2 queries, budget is 1"):
+                with assert_max_queries(1):
+                    conn.execute(text("SELECT 1"))
+                    conn.execute(text("SELECT 2"))
+
+
+class TestServerTiming:
+    def test_round_trips_through_header(self):
+        header = QueryStats(count=3, duration=0.0125).server_timing()
+
+        assert header == 'db;dur=12.5;desc="3 queries"'
+        assert parse_server_timing(f'app;dur=40, {header}') == QueryStats(count=3, duration=0.0125)
+        assert parse_server_timing("app;dur=40") is None
+
+
+class TestQueryTimingMiddleware:
+    @pytest.fixture
+    def client(self, sqlite_engine):
+        test_app = FastAPI()
+        test_app.add_middleware(QueryTimingMiddleware)
+
+        @test_app.get("/sync")
+        def sync_endpoint():
+            with sqlite_engine.connect() as conn:
+                conn.execute(text("SELECT 1"))
+                conn.execute(text("SELECT 2"))
+            return {}
+
+        @test_app.get("/async")
+        async def async_endpoint():
+            with sqlite_engine.connect() as conn:
+                conn.execute(text("SELECT 1"))
+            return {}
+
+        return TestClient(test_app)
+
+    def test_counts_queries_from_threadpool_endpoints(self, client):
+        response = client.get("/sync")
+
+        assert parse_server_timing(response.headers["server-timing"]).count == 2
+
+    def test_counts_are_per_request(self, client):
+        client.get("/sync")
+        response = client.get("/async")
+
+        assert assert_query_budget(response, 1).count == 1
+
+    def test_budget_failure_names_the_endpoint(self, client):
+        response = client.get("/sync")
+
+        with pytest.raises(AssertionError, match="GET /sync issued 2 queries, budget is 1"):
+            assert_query_budget(response, 1)
+
+    def test_installed_outside_production(self):
+        response = TestClient(app).get("/health")
+
+        assert parse_server_timing(response.headers["server-timing"]).count == 0
+
+
+class StandInSession:
+    """
+    Answers the catalog queries of the podcast routes without Postgres.
+
+    Each statement also runs one query on an instrumented engine, so request
+    handlers are counted by QueryTimingMiddleware as they would be against
+    the real database.
+    """
+
+    def __init__(self, engine):
+        self.engine = engine
+        self.generation = datetime.utcnow() - timedelta(hours=1)
+
+    async def exec(self, statement):
+        with self.engine.connect() as conn:
+            conn.execute(text("SELECT 1"))
+        result = MagicMock()
+        if CacheMetadata.__table__ in statement.get_final_froms():
+            result.all.return_value = [
+                (CACHE_KEY_BEST_PODCASTS, self.generation),
+                (CACHE_KEY_PODCAST_DATA, self.generation),
+            ]
+        else:
+            result.all.return_value = []
+        return result
+
+
+class TestPopularQueryBudget:
+    @pytest.fixture
+    def client(self, sqlite_engine):
+        cache_generations.clear()
+        app.dependency_overrides[get_async_db] = lambda: StandInSession(sqlite_engine)
+        yield TestClient(app)
+        app.dependency_overrides.clear()
+        cache_generations.clear()
+
+    def test_fresh_path(self, client):
+        # Catalog versions lookup plus the podcasts query
+        assert assert_query_budget(client.get(POPULAR_URL), 2).count == 2
+        # The versions are now held in memory
+        assert_query_budget(client.get(POPULAR_URL), 1)
+
+    def test_not_modified_skips_podcasts_query(self, client):
+        etag = client.get(POPULAR_URL).headers["etag"]
+
+        response = client.get(POPULAR_URL, headers={"If-None-Match": etag})
+
+        assert response.status_code == 304
+        assert_query_budget(response, 0)
+
+
+@pytest.mark.skipif(not postgres_available(), reason="requires the development Postgres database")
+class TestQueryBudgets:
+    @pytest_asyncio.fixture
+    async def client(self):
+        cache_generations.clear()
+        async with httpx.AsyncClient(
+            transport=httpx.ASGITransport(app=app), base_url="http://test"
+        ) as client:
+            yield client
+        await async_engine.dispose()
+
+    @pytest.mark.asyncio
+    async def test_popular_fresh_path(self, client):
+        # Cache generation lookup plus the podcasts query
+        assert_query_budget(await client.get(POPULAR_URL), 2)
+        # The generation is now held in memory
+        assert_query_budget(await client.get(POPULAR_URL), 1)
+
+    @pytest.mark.asyncio
+    async def test_popular_not_modified_skips_podcasts_query(self, client):
+        etag = (await client.get(POPULAR_URL)).headers.get("etag")
+        if etag is None:
+            pytest.skip("No cache generation recorded yet")
+
+        response = await client.get(POPULAR_URL, headers={"If-None-Match": etag})
+
+        assert response.status_code == 304
+        assert_query_budget(response, 0)
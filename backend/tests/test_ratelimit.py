@@ -0,0 +1,34 @@
+import time
+
+import pytest
+
+from app.core.ratelimit import TokenBucket
+
+
+class TestTokenBucket:
+    @pytest.mark.asyncio
+    async def test_burst_up_to_capacity_is_immediate(self):
+        bucket = TokenBucket(rate=10.0, capacity=5)
+        start = time.monotonic()
+        for _ in range(5):
+            await bucket.acquire()
+        assert time.monotonic() - start < 0.05
+
+    @pytest.mark.asyncio
+    async def test_waits_for_refill_once_empty(self):
+        bucket = TokenBucket(rate=50.0, capacity=1)
+        start = time.monotonic()
+        for _ in range(6):
+            await bucket.acquire()
+        # One token up front, then five refills at 20ms each
+        assert time.monotonic() - start >= 0.09
+
+    @pytest.mark.asyncio
+    async def test_rejects_requests_larger_than_capacity(self):
+        bucket = TokenBucket(rate=1.0, capacity=2)
+        with pytest.raises(ValueError):
+            await bucket.acquire(3)
+
+    def test_rejects_non_positive_rate(self):
+        with pytest.raises(ValueError):
+            TokenBucket(rate=0)
@@ -0,0 +1,154 @@
+import asyncio
+import time
+import uuid
+from datetime import datetime, timedelta
+from unittest.mock import patch
+
+import pytest
+
+from app.services.typeahead import TypeaheadEntry, TypeaheadIndex, normalize_text
+
+
+def make_entry(title: str, publisher: str | None = None, listen_score: int | None = 50) -> TypeaheadEntry:
+    return TypeaheadEntry(uuid.uuid4(), title, publisher, None, listen_score)
+
+
+def titles(entries: list[TypeaheadEntry]) -> list[str]:
+    return [entry.title for entry in entries]
+
+
+class TestNormalizeText:
+    def test_folds_case_accents_and_punctuation(self):
+        assert normalize_text("  Café—Talk: ÉPISODES!! ") == "cafe talk episodes"
+
+
+class TestSuggest:
+    def test_matches_any_word_of_title_or_publisher(self):
+        index = TypeaheadIndex()
+        index.replace([
+            make_entry("True Crime Daily", "Parcast"),
+            make_entry("The Daily", "The New York Times"),
+        ])
+
+        assert titles(index.suggest("crime")) == ["True Crime Daily"]
+        assert titles(index.suggest("new york")) == ["The Daily"]
+        assert index.suggest("rime") == []
+
+    def test_orders_by_listen_score(self):
+        index = TypeaheadIndex()
+        index.replace([
+            make_entry("Science Weekly", listen_score=40),
+            make_entry("Science Vs", listen_score=70),
+            make_entry("Science Friday", listen_score=None),
+        ])
+
+        expected = ["Science Vs", "Science Weekly", "Science Friday"]
+        assert titles(index.suggest("sci")) == expected
+        assert titles(index.suggest("s")) == expected
+        assert titles(index.suggest("sc", limit=1)) == ["Science Vs"]
+
+    def test_returns_each_podcast_once(self):
+        index = TypeaheadIndex()
+        index.replace([make_entry("Radio Lab", "Radio Station")])
+
+        assert len(index.suggest("radio")) == 1
+        assert len(index.suggest("r")) == 1
+
+    def test_blank_query_returns_nothing(self):
+        index = TypeaheadIndex()
+        index.replace([make_entry("Anything")])
+
+        assert index.suggest(" !? ") == []
+
+    def test_long_prefix_ranks_every_match(self):
+        index = TypeaheadIndex()
+        index.replace(
+            [make_entry(f"News aaa {i:04d}", listen_score=i % 50) for i in range(1500)]
+            + [make_entry("News zzz top", listen_score=100)]
+        )
+
+        top = index.suggest("news", 3)
+
+        assert [entry.listen_score for entry in top] == [100, 49, 49]
+        assert top[0].title == "News zzz top"
+
+    def test_long_prefix_matches_brute_force(self):
+        entries = [
+            make_entry(f"Show {i % 7} {i % 11} {i % 13}", listen_score=(i * 37) % 101 or None)
+            for i in range(3000)
+        ]
+        index = TypeaheadIndex()
+        index.replace(entries)
+
+        for query in ("show", "show 3", "show 3 5", "show 6 10 12", "5 1"):
+            matching = [
+                entry
+                for entry in entries
+                if any(term.startswith(query) for term in index._terms[entry.id])
+            ]
+            expected = sorted(matching, key=lambda entry: index._ranks[entry.id])[:8]
+            assert index.suggest(query) == expected
+
+    def test_long_prefix_lookup_is_fast(self):
+        index = TypeaheadIndex()
+        index.replace(make_entry(f"Podcast {i} about topic {i % 100}", listen_score=i % 100) for i in range(20000))
+
+        start = time.perf_counter()
+        for _ in range(100):
+            index.suggest("topic 42")
+            index.suggest("podcast")
+            index.suggest("po")
+        assert (time.perf_counter() - start) / 300 < 0.001
+
+
+class TestUpdate:
+    def test_replaces_existing_entry_terms(self):
+        index = TypeaheadIndex()
+        entry = make_entry("Old Name")
+        index.replace([entry, make_entry("Other")])
+
+        index.update([entry._replace(title="New Name", listen_score=90)])
+
+        assert index.suggest("old") == []
+        assert index.suggest("o") == [index.suggest("other")[0]]
+        assert index.suggest("new")[0].listen_score == 90
+        assert len(index) == 2
+
+    def test_matches_full_rebuild(self):
+        entries = [make_entry(f"Show {i}", listen_score=i) for i in range(50)]
+        incremental = TypeaheadIndex()
+        incremental.replace(entries[:25])
+        incremental.update(entries[25:])
+        rebuilt = TypeaheadIndex()
+        rebuilt.replace(entries)
+
+        for query in ("s", "sh", "show", "show 4"):
+            assert incremental.suggest(query, limit=20) == rebuilt.suggest(query, limit=20)
+
+
+class TestReload:
+    @pytest.mark.asyncio
+    async def test_reloads_once_for_newer_generation(self):
+        index = TypeaheadIndex()
+        index.generation = datetime(2026, 1, 1)
+        calls = 0
+
+        async def fake_load():
+            nonlocal calls
+            calls += 1
+            await asyncio.sleep(0.01)
+
+        with patch.object(index, "load", side_effect=fake_load):
+            index.request_reload(index.generation)
+            index.request_reload(index.generation + timedelta(hours=1))
+            index.request_reload(index.generation + timedelta(hours=1))
+            await asyncio.sleep(0.05)
+
+        assert calls == 1
+
+    def test_mark_current_only_moves_forward(self):
+        index = TypeaheadIndex()
+        index.mark_current(datetime(2026, 1, 2))
+        index.mark_current(datetime(2026, 1, 1))
+
+        assert index.generation == datetime(2026, 1, 2)
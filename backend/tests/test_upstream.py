@@ -0,0 +1,121 @@
+from unittest.mock import AsyncMock, patch
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from app.api.deps import UpstreamClientsDep
+from app.main import app, warm_up
+from app.services import upstream
+from app.services.itunes import ITunesArtworkService
+from app.services.listenotes import ListenNotesService
+from app.services.podcast_cache import ingest_catalog
+from app.services.upstream import UpstreamClients
+
+
+@pytest.fixture
+def clients():
+    return UpstreamClients.create(http2=False)
+
+
+class TestUpstreamClients:
+    def test_falls_back_to_http1_without_h2(self):
+        with patch.object(upstream, "h2", None), \
+             patch("app.services.listenotes.create_client") as listen_notes, \
+             patch("app.services.itunes.create_client") as itunes:
+            UpstreamClients.create(http2=True)
+
+        listen_notes.assert_called_once_with(http2=False)
+        itunes.assert_called_once_with(http2=False)
+
+    @pytest.mark.asyncio
+    async def test_services_leave_shared_clients_open(self, clients):
+        listen_notes = ListenNotesService(api_key=None, client=clients.listen_notes)
+        itunes = ITunesArtworkService(client=clients.itunes)
+
+        await listen_notes.close()
+        await itunes.close()
+
+        assert not clients.listen_notes.is_closed
+        assert not clients.itunes.is_closed
+        await clients.aclose()
+        assert clients.listen_notes.is_closed
+        assert clients.itunes.is_closed
+
+    @pytest.mark.asyncio
+    async def test_services_close_clients_they_opened(self):
+        itunes = ITunesArtworkService()
+
+        await itunes.close()
+
+        assert itunes.client.is_closed
+
+    @pytest.mark.asyncio
+    async def test_ingest_catalog_uses_shared_clients(self, clients):
+        seen = []
+
+        async def fake_ingest_page(session, listen_notes, itunes, genre_id, page):
+            seen.append((listen_notes.client, itunes.client))
+            return 1
+
+        with patch("app.services.podcast_cache.AsyncSession"), \
+             patch("app.services.podcast_cache.ArtworkCacheStore"), \
+             patch("app.services.podcast_cache.get_cache_age", return_value=None), \
+             patch("app.services.podcast_cache.ingest_page", side_effect=fake_ingest_page):
+            result = await ingest_catalog([(0, 1), (0, 2)], concurrency=2, clients=clients)
+
+        assert result.pages_ingested == 2
+        assert seen == [(clients.listen_notes, clients.itunes)] * 2
+        assert not clients.listen_notes.is_closed
+        await clients.aclose()
+
+
+class TestLifespan:
+    def test_owns_clients_and_exposes_them_as_dependency(self):
+        @app.get("/test-upstream-clients")
+        def upstream_clients(clients: UpstreamClientsDep):
+            return {"same": clients is app.state.upstream_clients}
+
+        try:
+            with patch("app.main.warm_up", new=AsyncMock()) as mock_warm_up, \
+                 patch("app.main.typeahead_index.load", new=AsyncMock()), \
+                 patch("app.main.refresh_scheduler") as scheduler:
+                scheduler.start = AsyncMock()
+                scheduler.stop = AsyncMock()
+                with TestClient(app) as client:
+                    clients = app.state.upstream_clients
+                    response = client.get("/test-upstream-clients")
+        finally:
+            app.router.routes.pop()
+
+        assert response.json() == {"same": True}
+        mock_warm_up.assert_awaited_once_with(app)
+        scheduler.start.assert_awaited_once_with(clients)
+        assert clients.listen_notes.is_closed
+
+    def test_startup_survives_failed_warm_up(self):
+        with patch("app.main.warm_up", new=AsyncMock(side_effect=OSError("no database"))), \
+             patch("app.main.typeahead_index.load", new=AsyncMock()), \
+             patch("app.main.refresh_scheduler") as scheduler:
+            scheduler.start = AsyncMock()
+            scheduler.stop = AsyncMock()
+            with TestClient(app) as client:
+                assert client.get("/health").status_code == 200
+
+
+class TestWarmUp:
+    @pytest.mark.asyncio
+    async def test_fills_pools_and_serves_paths_in_process(self):
+        test_app = FastAPI()
+        requests = []
+
+        @test_app.get("/landing")
+        def landing():
+            requests.append(1)
+            return {}
+
+        with patch("app.main.warm_pools", new=AsyncMock()) as mock_warm_pools:
+            await warm_up(test_app, paths=["/landing", "/landing"])
+
+        mock_warm_pools.assert_awaited_once()
+        assert len(requests) == 2
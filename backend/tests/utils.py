@@ -0,0 +1,27 @@
+from collections.abc import Iterator
+from contextlib import contextmanager
+
+import httpx
+
+from app.core.query_stats import QueryStats, parse_server_timing, track_queries
+
+
+def assert_query_budget(response: httpx.Response, max_queries: int) -> QueryStats:
+    """Assert a response issued at most ``max_queries`` SQL statements, per its Server-Timing header."""
+    header = response.headers.get("server-timing")
+    assert header is not None, "Response has no Server-Timing header; is QueryTimingMiddleware installed?"
+    stats = parse_server_timing(header)
+    assert stats is not None, f"No query stats in Server-Timing header: {header}"
+    assert stats.count <= max_queries, (
+        f"{response.request.method} {response.request.url.path} issued {stats.count} queries, "
+        f"budget is {max_queries}"
+    )
+    return stats
+
+
+@contextmanager
+def assert_max_queries(max_queries: int) -> Iterator[QueryStats]:
+    """Assert the block issues at most ``max_queries`` SQL statements."""
+    with track_queries() as stats:
+        yield stats
+    assert stats.count <= max_queries, f"Issued {stats.count} queries, budget is {max_queries}"